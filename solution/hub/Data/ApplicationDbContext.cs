@@ -112,7 +112,9 @@ namespace hub.Data
                 // ndices
                 entity.HasIndex(e => e.Status);
                 entity.HasIndex(e => e.UploadedAt);
-                entity.HasIndex(e => e.UserId);
+                // Archivos de un usuario, filtrados o no por fecha de carga (user_id va primero)
+                entity.HasIndex(e => new { e.UserId, e.UploadedAt })
+                    .IsCreatedConcurrently();
             });
 
             // Configuracin especfica para Link
@@ -170,6 +172,12 @@ namespace hub.Data
                 entity.HasIndex(e => e.Success);
                 entity.HasIndex(e => e.ProcessedDate);
                 entity.HasIndex(e => e.PageExists);
+                // Bsqueda de URLs ya procesadas (reutilizacin y reanudacin): un ndice
+                // hash ocupa menos que un btree sobre URLs largas y no tiene su lmite
+                // de tamao por entrada; solo sirve para igualdad (url = / url IN)
+                entity.HasIndex(e => e.Url)
+                    .HasMethod("hash")
+                    .IsCreatedConcurrently();
             });
         }
     }
@@ -0,0 +1,52 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace hub.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddLookupIndexes : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            // Los índices se crean con CONCURRENTLY (fuera de la transacción de la
+            // migración) para no bloquear las escrituras de los workers sobre
+            // tablas grandes. IX_links_file_id ya existe desde InitialCreate.
+            migrationBuilder.CreateIndex(
+                name: "IX_files_user_id_uploaded_at",
+                table: "files",
+                columns: new[] { "user_id", "uploaded_at" })
+                .Annotation("Npgsql:CreatedConcurrently", true);
+
+            // El índice compuesto cubre las consultas que solo filtran por user_id
+            migrationBuilder.DropIndex(
+                name: "IX_files_user_id",
+                table: "files");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_links_url",
+                table: "links",
+                column: "url")
+                .Annotation("Npgsql:CreatedConcurrently", true)
+                .Annotation("Npgsql:IndexMethod", "hash");
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropIndex(
+                name: "IX_links_url",
+                table: "links");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_files_user_id",
+                table: "files",
+                column: "user_id");
+
+            migrationBuilder.DropIndex(
+                name: "IX_files_user_id_uploaded_at",
+                table: "files");
+        }
+    }
+}
@@ -77,7 +77,9 @@ namespace hub.Migrations
 
                     b.HasIndex("UploadedAt");
 
-                    b.HasIndex("UserId");
+                    b.HasIndex("UserId", "UploadedAt");
+
+                    NpgsqlIndexBuilderExtensions.IsCreatedConcurrently(b.HasIndex("UserId", "UploadedAt"));
 
                     b.ToTable("files", (string)null);
                 });
@@ -141,6 +143,11 @@ namespace hub.Migrations
 
                     b.HasIndex("Success");
 
+                    b.HasIndex("Url");
+
+                    NpgsqlIndexBuilderExtensions.HasMethod(b.HasIndex("Url"), "hash");
+                    NpgsqlIndexBuilderExtensions.IsCreatedConcurrently(b.HasIndex("Url"));
+
                     b.ToTable("links", (string)null);
                 });
 
@@ -0,0 +1,119 @@
+-- Particionado declarativo opcional de la tabla links por rangos de file_id
+--
+-- No forma parte de las migraciones de EF: se aplica a mano (psql -f) sobre una
+-- base ya migrada cuando links crece a decenas de millones de filas. Todas las
+-- consultas del hub y del scraper por archivo (links de un archivo, URLs ya
+-- procesadas al reanudar) filtran por file_id y leen una sola partición; borrar
+-- un archivo o un rango antiguo de archivos se puede hacer con DETACH/DROP.
+--
+-- Costos:
+--   * La clave primaria pasa a ser (id, file_id): PostgreSQL exige que incluya la
+--     clave de partición. id pasa a tomar su valor de una secuencia (PostgreSQL 14
+--     no admite columnas identity en tablas particionadas), que sigue desde el máximo.
+--   * La búsqueda de resultados reutilizables (url IN (...) sin file_id) consulta el
+--     índice hash de cada partición: conviene pocas particiones grandes
+--     (links_partition_size() archivos por partición).
+--   * La copia bloquea links durante la migración (ACCESS EXCLUSIVE): detener los
+--     workers antes de aplicarla.
+--
+-- Variante por tiempo: PARTITION BY RANGE (processed_date) con particiones mensuales
+-- sirve para la retención (DROP de los meses viejos), pero las consultas por file_id
+-- recorren todas las particiones, por eso aquí se particiona por archivo.
+--
+-- Para revertir: crear links como tabla normal con los índices de las migraciones,
+-- copiar las filas desde la tabla particionada y borrarla.
+
+BEGIN;
+
+LOCK TABLE links IN ACCESS EXCLUSIVE MODE;
+
+ALTER TABLE links RENAME TO links_unpartitioned;
+
+CREATE SEQUENCE links_partitioned_id_seq AS integer;
+
+CREATE TABLE links (
+    id integer NOT NULL DEFAULT nextval('links_partitioned_id_seq'),
+    file_id integer NOT NULL,
+    url character varying(2000) NOT NULL,
+    title character varying(500),
+    post_date timestamp with time zone,
+    content text,
+    page_exists boolean NOT NULL,
+    success boolean NOT NULL,
+    error_description character varying(1000),
+    processed_date timestamp with time zone
+) PARTITION BY RANGE (file_id);
+
+ALTER SEQUENCE links_partitioned_id_seq OWNED BY links.id;
+
+-- Archivos por partición
+CREATE OR REPLACE FUNCTION links_partition_size() RETURNS integer AS $$
+    SELECT 1000;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Crea (si no existe) la partición del rango de archivos al que pertenece file_id
+CREATE OR REPLACE FUNCTION links_create_partition(p_file_id integer) RETURNS void AS $$
+DECLARE
+    partition_size constant integer := links_partition_size();
+    lower_bound integer := (p_file_id / partition_size) * partition_size;
+    partition_name text := format('links_p%s', lower_bound / partition_size);
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF links FOR VALUES FROM (%s) TO (%s)',
+            partition_name, lower_bound, lower_bound + partition_size
+        );
+    END IF;
+EXCEPTION
+    -- Otra transacción creó la misma partición al mismo tiempo
+    WHEN duplicate_table THEN NULL;
+    -- links_default ya tiene filas del rango: quedan ahí hasta moverlas a mano
+    WHEN check_violation THEN
+        RAISE WARNING 'links_default tiene filas del rango de file_id %', p_file_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Particiones para los archivos existentes
+SELECT links_create_partition(bucket * links_partition_size())
+FROM generate_series(0, (SELECT COALESCE(max(id), 0) FROM files) / links_partition_size()) AS bucket;
+
+-- Red de seguridad para filas fuera de los rangos creados; debería quedar vacía,
+-- porque no se puede crear la partición de un rango que ya tiene filas en DEFAULT
+CREATE TABLE links_default PARTITION OF links DEFAULT;
+
+INSERT INTO links
+SELECT id, file_id, url, title, post_date, content, page_exists, success, error_description, processed_date
+FROM links_unpartitioned;
+
+SELECT setval(pg_get_serial_sequence('links', 'id'), COALESCE(max(id), 0) + 1, false) FROM links;
+
+DROP TABLE links_unpartitioned;
+
+-- Restricciones e índices después de la copia (más rápido que mantenerlos fila a fila).
+-- Los índices del padre se crean en cada partición, también en las futuras.
+ALTER TABLE links ADD CONSTRAINT "PK_links" PRIMARY KEY (id, file_id);
+ALTER TABLE links ADD CONSTRAINT "FK_links_files_file_id"
+    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE;
+CREATE INDEX "IX_links_file_id" ON links (file_id);
+CREATE INDEX "IX_links_page_exists" ON links (page_exists);
+CREATE INDEX "IX_links_processed_date" ON links (processed_date);
+CREATE INDEX "IX_links_success" ON links (success);
+CREATE INDEX "IX_links_url" ON links USING hash (url);
+
+-- Al registrar un archivo se crean su partición y la siguiente, para que el
+-- bloqueo de CREATE TABLE ... PARTITION OF no coincida con la carga de sus links
+CREATE OR REPLACE FUNCTION links_partition_for_new_file() RETURNS trigger AS $$
+BEGIN
+    PERFORM links_create_partition(NEW.id);
+    PERFORM links_create_partition(NEW.id + links_partition_size());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER files_links_partition
+    AFTER INSERT ON files
+    FOR EACH ROW EXECUTE FUNCTION links_partition_for_new_file();
+
+ANALYZE links;
+
+COMMIT;
@@ -0,0 +1,69 @@
+"""
+Benchmark de la normalización de fechas de publicación
+
+Compara el bloque de parseo que usaban las tareas (fromisoformat si hay una
+"T", dateutil en cualquier otro caso) con DateNormalizer.normalize_many sobre
+los valores de <time datetime> de las páginas de ejemplo de la Comunidad
+Andina (tests/fixtures/pages/).
+
+Uso (desde solution/scraper):
+    python -m benchmarks.bench_dates [--urls 20000] [--repeat 5]
+"""
+import argparse
+import re
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+from dateutil import parser as dateutil_parser
+
+from src.apps.dates import DateNormalizer
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+CAN_URL = "https://www.comunidadandina.org/notas-de-prensa/{}"
+
+def legacy_parse(date_str):
+    """Parseo anterior de build_link_row y process_single_url_task"""
+    try:
+        if 'T' in date_str:
+            if date_str.endswith('Z'):
+                date_str = date_str.replace('Z', '+00:00')
+            return datetime.fromisoformat(date_str)
+        return dateutil_parser.parse(date_str)
+    except Exception:
+        return None
+
+def load_dates():
+    """Valores de <time datetime> de las páginas de ejemplo, ya sin espacios como los entrega el scraper"""
+    values = []
+    for page in sorted(PAGES_DIR.glob("*.html")):
+        values.extend(match.strip() for match in re.findall(r'datetime="([^"]+)"', page.read_text(errors="ignore")))
+    return values
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=20000, help="Cantidad de páginas simuladas")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada medición")
+    args = parser.parse_args()
+
+    dates = load_dates()
+    # Cada página tiene una fecha distinta, con los formatos que aparecen en las páginas de ejemplo
+    items = []
+    for i in range(args.urls):
+        template = dates[i % len(dates)]
+        day = 1 + i % 28
+        items.append((re.sub(r"(\d{4}-\d{2}-)\d{2}", lambda m: f"{m.group(1)}{day:02d}", template, count=1), CAN_URL.format(i)))
+
+    legacy = min(timeit.repeat(lambda: [legacy_parse(raw) for raw, _ in items], number=1, repeat=args.repeat))
+    normalizer = DateNormalizer()
+    batch = min(timeit.repeat(lambda: normalizer.normalize_many(items), number=1, repeat=args.repeat))
+
+    assert normalizer.normalize_many(items) == [legacy_parse(raw) for raw, _ in items]
+    print(f"Formatos de ejemplo: {sorted(set(dates))}")
+    print(f"Páginas: {args.urls}")
+    print(f"Parseo anterior:     {legacy * 1000:8.1f} ms ({legacy / args.urls * 1e6:.2f} µs/fecha)")
+    print(f"DateNormalizer:      {batch * 1000:8.1f} ms ({batch / args.urls * 1e6:.2f} µs/fecha)")
+    print(f"Aceleración:         {legacy / batch:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark de punta a punta del procesamiento de archivos
+
+Levanta el sitio de prueba local (benchmarks/fixture_site.py) y ejecuta
+process_file_task con Celery en modo eager sobre archivos de 100, 1.000 y
+10.000 URLs, con una base de datos SQLite temporal o la indicada con
+--db-url (usar una base de datos de pruebas: se crean tablas y registros).
+
+Cada tamaño se ejecuta en un proceso nuevo para medir su pico de memoria
+(RSS) por separado. Reporta URLs/s, latencia por URL (p50/p95) y pico de RSS.
+
+Uso (desde solution/scraper):
+    python -m benchmarks.bench_e2e [--sizes 100,1000,10000] [--latency 0.05]
+        [--error-rate 0.02] [--not-found-rate 0.05] [--concurrency 10]
+        [--db-url postgresql://...] [--output resultados.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from .fixture_site import FixtureSite, SiteBehavior
+
+# Configuración del worker durante el benchmark: sin límite por host, caché
+# condicional ni reutilización, para medir descargas y escrituras reales.
+# Se pueden reemplazar con variables de entorno.
+BENCHMARK_ENV = {
+    "RATE_LIMIT_ENABLED": "false",
+    "HTTP_CACHE_ENABLED": "false",
+    "REUSE_FRESHNESS_HOURS": "0",
+    "PAGE_ARCHIVE_ENABLED": "false",
+}
+
+def run_size(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Procesa un archivo de `size` URLs en el proceso actual
+
+    Se ejecuta en un proceso hijo: configura el entorno antes de importar src.
+
+    Returns:
+        Dict[str, Any]: Métricas de la ejecución
+    """
+    for name, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(name, value)
+    os.environ["SCRAPER_CONCURRENCY"] = str(options["concurrency"])
+
+    import logging
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src import tasks
+    from src.settings import Base
+    from src.models import File
+    from src.apps.async_scraper import AsyncWebScraper
+
+    if not options["keep_logs"]:
+        logging.disable(logging.ERROR)
+
+    engine = create_engine(options["db_url"])
+    Base.metadata.create_all(engine)
+    tasks.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    tasks.app.conf.update(task_always_eager=True, task_eager_propagates=True, result_backend="cache+memory://")
+
+    # Medir la latencia de cada URL (descarga, reintentos y extracción)
+    latencies = []
+    scrape_website = AsyncWebScraper.scrape_website
+
+    async def timed_scrape_website(self, client, url):
+        start = time.perf_counter()
+        try:
+            return await scrape_website(self, client, url)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    AsyncWebScraper.scrape_website = timed_scrape_website
+
+    size = options["size"]
+    file_path = os.path.join(options["workdir"], f"urls-{size}.txt")
+    with open(file_path, "w") as urls_file:
+        for number in range(options["first_number"], options["first_number"] + size):
+            urls_file.write(f"{options['base_url']}/notas-de-prensa/{number}\n")
+
+    db = tasks.SessionLocal()
+    file_record = File(
+        total_links=size, file_path=file_path, file_name=os.path.basename(file_path),
+        total_processed=0, total_failed=0, status="PENDING", uploaded_at=datetime.utcnow(), user_id=1
+    )
+    db.add(file_record)
+    db.commit()
+    file_id = file_record.id
+
+    start = time.perf_counter()
+    task_result = tasks.process_file_task.delay(file_id, "benchmark@example.com").get()
+    elapsed = time.perf_counter() - start
+
+    db.expire_all()
+    file_record = db.query(File).filter(File.id == file_id).first()
+    db.close()
+
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        p50, p95 = percentiles[49], percentiles[94]
+    else:
+        p50 = p95 = latencies[0] if latencies else 0.0
+
+    return {
+        "size": size,
+        "status": file_record.status,
+        "task_success": bool(task_result.get("success")) if isinstance(task_result, dict) else None,
+        "processed": file_record.total_processed,
+        "failed": file_record.total_failed,
+        "seconds": round(elapsed, 3),
+        "urls_per_second": round(size / elapsed, 2),
+        "latency_p50_ms": round(p50 * 1000, 1),
+        "latency_p95_ms": round(p95 * 1000, 1),
+        # ru_maxrss está en KB en Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="Tamaños de archivo separados por coma")
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos de demora por respuesta")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Segundos aleatorios adicionales")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Proporción de respuestas 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.05, help="Proporción de páginas no encontradas")
+    parser.add_argument("--page-kb", type=int, default=60, help="Tamaño aproximado de cada nota")
+    parser.add_argument("--concurrency", type=int, default=10, help="SCRAPER_CONCURRENCY del worker")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy (por defecto SQLite temporal)")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--keep-logs", action="store_true", help="Conservar los logs del worker")
+    args = parser.parse_args()
+
+    behavior = SiteBehavior(args.latency, args.jitter, args.error_rate, args.not_found_rate, args.page_kb)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="bench-e2e-") as workdir, FixtureSite(behavior) as site:
+        print(f"Sitio de prueba: {site.base_url} (latencia {args.latency} s, errores {args.error_rate:.0%}, "
+              f"no encontradas {args.not_found_rate:.0%}, {args.page_kb} KB)")
+        print(f"{'URLs':>7} {'URLs/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>8} {'ok':>7} {'error':>7} {'seg':>8}")
+
+        context = multiprocessing.get_context("spawn")
+        for index, size in enumerate(sizes):
+            options = {
+                "size": size,
+                # URLs distintas en cada tamaño
+                "first_number": index * 1_000_000,
+                "base_url": site.base_url,
+                "workdir": workdir,
+                "db_url": args.db_url or f"sqlite:///{os.path.join(workdir, f'bench-{size}.db')}",
+                "concurrency": args.concurrency,
+                "keep_logs": args.keep_logs,
+            }
+            with context.Pool(1) as pool:
+                result = pool.apply(run_size, (options,))
+            results.append(result)
+            print(f"{result['size']:>7} {result['urls_per_second']:>9} {result['latency_p50_ms']:>8} "
+                  f"{result['latency_p95_ms']:>8} {result['peak_rss_mb']:>8} {result['processed']:>7} "
+                  f"{result['failed']:>7} {result['seconds']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({
+                "benchmark": "e2e",
+                "timestamp": datetime.utcnow().isoformat(),
+                "parameters": vars(args),
+                "results": results
+            }, output, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmarks de la extracción de WebScraper sobre el corpus guardado
+
+Mide cada helper de extracción y el paso completo de parseo (parse_response)
+con cada backend de parseo y cada página de benchmarks/corpus/, sin red.
+Los resultados de un mismo helper y página se agrupan para comparar backends.
+
+Uso (desde solution/scraper):
+    python -m pytest benchmarks/bench_extraction.py --benchmark-json=extraction.json
+    python -m pytest benchmarks/bench_extraction.py --benchmark-autosave --benchmark-compare
+"""
+import pytest
+from pathlib import Path
+
+from src.apps.parsers import PARSER_BACKENDS, get_parser
+from src.apps.scraper import WebScraper
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+PAGES = sorted(CORPUS_DIR.glob("*.html"))
+BACKENDS = sorted(PARSER_BACKENDS)
+HELPERS = ("_check_page_exists", "_get_title", "_get_date", "_get_content", "_get_meta_description")
+PAGE_URL = "https://www.comunidadandina.org/notas-de-prensa/benchmark"
+
+
+def setup_benchmark(benchmark, name, backend, page):
+    """Agrupa el resultado por operación y página, y registra backend y tamaño"""
+    benchmark.group = f"{name} - {page.name}"
+    benchmark.extra_info.update({"backend": backend, "page": page.name, "page_bytes": page.stat().st_size})
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", PAGES, ids=lambda page: page.name)
+class TestExtractionBenchmarks:
+    """Benchmarks de parseo y extracción por backend y página"""
+
+    def test_parse_response(self, benchmark, backend, page):
+        """Benchmark del paso completo: parseo, verificación de existencia y extracción"""
+        scraper = WebScraper(parser=get_parser(backend))
+        content = page.read_bytes()
+        setup_benchmark(benchmark, "parse_response", backend, page)
+
+        result = benchmark(scraper.parse_response, PAGE_URL, 200, content)
+
+        assert result["url"] == PAGE_URL
+
+    def test_parse(self, benchmark, backend, page):
+        """Benchmark del parseo del documento"""
+        parser = get_parser(backend)
+        content = page.read_bytes()
+        setup_benchmark(benchmark, "parse", backend, page)
+
+        benchmark(parser.parse, content)
+
+    @pytest.mark.parametrize("helper", HELPERS)
+    def test_helper(self, benchmark, backend, page, helper):
+        """Benchmark de un helper de extracción sobre un documento ya parseado"""
+        scraper = WebScraper(parser=get_parser(backend))
+        document = scraper.parser.parse(page.read_bytes())
+        setup_benchmark(benchmark, helper, backend, page)
+
+        benchmark(getattr(scraper, helper), document)
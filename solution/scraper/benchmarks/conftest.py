@@ -0,0 +1,11 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def silence_logging():
+    """Desactiva los logs del scraper para medir solo el parseo y la extracción"""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
@@ -0,0 +1,212 @@
+"""
+Sitio HTTP local que imita las notas de prensa de la Comunidad Andina
+
+Sirve /notas-de-prensa/<n> con páginas de tamaño y estructura similares a
+las reales (menú extenso, artículo, noticias relacionadas y scripts). El
+comportamiento de cada URL es determinista según <n> y la semilla: una parte
+responde 503, otra es una página "Recurso no encontrado" y el resto es una
+nota válida. Cada respuesta se demora `latency` segundos (más un jitter).
+
+Uso independiente (desde solution/scraper):
+    python -m benchmarks.fixture_site --port 8081 --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+PATH_PREFIX = "/notas-de-prensa/"
+
+MONTHS = ("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+          "agosto", "septiembre", "octubre", "noviembre", "diciembre")
+COUNTRIES = ("Bolivia", "Colombia", "Ecuador", "Perú")
+TOPICS = ("comercio intrarregional", "integración energética", "movilidad humana",
+          "telecomunicaciones", "propiedad intelectual", "sanidad agropecuaria")
+
+NOT_FOUND_PAGE = (
+    "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\"><title>Comunidad Andina</title></head>"
+    "<body><main><div class=\"alert\"><h2>Recurso no encontrado</h2>"
+    "<p>El recurso solicitado no existe o fue movido.</p></div></main></body></html>"
+).encode("utf-8")
+
+@dataclass
+class SiteBehavior:
+    """
+    Comportamiento del sitio de prueba
+
+    Attributes:
+        latency (float): Segundos de demora de cada respuesta
+        jitter (float): Segundos aleatorios adicionales (0 a jitter)
+        error_rate (float): Proporción de URLs que responden 503
+        not_found_rate (float): Proporción de URLs que son "Recurso no encontrado"
+        page_kb (int): Tamaño aproximado de cada nota en KB
+        seed (int): Semilla que decide qué URLs fallan
+    """
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.02
+    not_found_rate: float = 0.05
+    page_kb: int = 60
+    seed: int = 1
+
+    def kind(self, number: int) -> str:
+        """Tipo de respuesta de la nota <number>: ok, error o not_found"""
+        draw = (zlib.crc32(f"{self.seed}:{number}".encode()) % 10_000) / 10_000
+        if draw < self.error_rate:
+            return "error"
+        if draw < self.error_rate + self.not_found_rate:
+            return "not_found"
+        return "ok"
+
+def render_press_release(number: int, page_kb: int = 60) -> bytes:
+    """
+    Genera la nota de prensa <number> con el marcado de las páginas de la CAN
+
+    Args:
+        number (int): Número de la nota
+        page_kb (int): Tamaño aproximado de la página en KB
+
+    Returns:
+        bytes: HTML en UTF-8
+    """
+    rng = random.Random(number)
+    country = COUNTRIES[number % len(COUNTRIES)]
+    topic = TOPICS[number % len(TOPICS)]
+    month = 1 + number % 12
+    day = 1 + number % 28
+
+    menu = []
+    for i in range(12):
+        submenu = "".join(f'<li><a href="/seccion/{i}/{j}">Subsección {i}.{j}</a></li>' for j in range(8))
+        menu.append(f'<li class="nav-item"><a class="nav-link" href="/seccion/{i}">Sección {i}</a><ul>{submenu}</ul></li>')
+    menu = "".join(menu)
+    head = (
+        "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"
+        f"<meta name=\"description\" content=\"La Secretaría General de la CAN informa sobre {topic} en {country}.\">"
+        f"<title>Comunidad Andina - Nota de prensa {number}</title>"
+        "<link rel=\"stylesheet\" href=\"/css/site.css\">"
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>"
+        "</head><body class=\"page nota\">"
+        f"<header><nav class=\"navbar\"><ul class=\"navbar-nav\">{menu}</ul></nav></header>"
+    )
+    article = (
+        "<main><article>"
+        f"<h1>Reunión sobre {topic} en {country} (nota {number})</h1>"
+        "<div class=\"meta\"><span>Publicado:</span>"
+        f"<time datetime=\"2024-{month:02d}-{day:02d}T10:30:00-05:00\">{day} de {MONTHS[month - 1]} de 2024</time></div>"
+        "<div class=\"col-md-8 article-content text-justify\">"
+        f"<p>La <strong>Secretaría General</strong> de la Comunidad Andina (CAN) informó que los representantes "
+        f"de {country} acordaron una agenda común sobre {topic} &amp; su seguimiento.</p>"
+        + "".join(
+            f"<p>Párrafo {i} de la nota {number}: los países miembros revisaron los avances en {TOPICS[(number + i) % len(TOPICS)]}.</p>"
+            for i in range(rng.randint(4, 10))
+        )
+        + "</div></article>"
+    )
+    related = []
+    size = len(head) + len(article)
+    i = 0
+    while size < page_kb * 1024:
+        item = (
+            f"<div class=\"card\"><a href=\"{PATH_PREFIX}{number + i + 1}\"><img src=\"/img/{i}.jpg\" alt=\"\">"
+            f"<h3>Nota relacionada {number + i + 1}</h3></a><p>Resumen de la nota sobre {TOPICS[i % len(TOPICS)]}.</p></div>"
+        )
+        related.append(item)
+        size += len(item)
+        i += 1
+    tail = (
+        f"<aside class=\"related\">{''.join(related)}</aside></main>"
+        "<footer><p>&copy; Comunidad Andina</p></footer><script src=\"/js/site.js\"></script></body></html>"
+    )
+    return (head + article + tail).encode("utf-8")
+
+class FixtureSiteHandler(BaseHTTPRequestHandler):
+    """Atiende las peticiones según el SiteBehavior del servidor"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        behavior: SiteBehavior = self.server.behavior
+        time.sleep(behavior.latency + random.uniform(0, behavior.jitter))
+
+        number = self.path[len(PATH_PREFIX):] if self.path.startswith(PATH_PREFIX) else ""
+        if not number.isdigit():
+            self._send(404, b"")
+            return
+
+        kind = behavior.kind(int(number))
+        if kind == "error":
+            self._send(503, b"Servicio no disponible")
+        elif kind == "not_found":
+            self._send(200, NOT_FOUND_PAGE)
+        else:
+            self._send(200, render_press_release(int(number), behavior.page_kb))
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sin un log por petición, distorsionaría las mediciones
+        pass
+
+class FixtureSite:
+    """
+    Servidor del sitio de prueba en un hilo de fondo
+
+    Se usa como context manager; `url(n)` retorna la URL de la nota n.
+    """
+
+    def __init__(self, behavior: Optional[SiteBehavior] = None, host: str = "127.0.0.1", port: int = 0):
+        self.behavior = behavior or SiteBehavior()
+        self.server = ThreadingHTTPServer((host, port), FixtureSiteHandler)
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 128
+        self.server.behavior = self.behavior
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, number: int) -> str:
+        return f"{self.base_url}{PATH_PREFIX}{number}"
+
+    def __enter__(self) -> "FixtureSite":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos de demora por respuesta")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Segundos aleatorios adicionales")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Proporción de respuestas 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.05, help="Proporción de páginas no encontradas")
+    parser.add_argument("--page-kb", type=int, default=60, help="Tamaño aproximado de cada nota")
+    args = parser.parse_args()
+
+    behavior = SiteBehavior(args.latency, args.jitter, args.error_rate, args.not_found_rate, args.page_kb)
+    with FixtureSite(behavior, args.host, args.port) as site:
+        print(f"Sitio de prueba en {site.base_url}{PATH_PREFIX}<n> (Ctrl+C para terminar)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import gzip
+import json
+import os
+import sqlite3
+import struct
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import logging
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+from ..settings import (
+    PAGE_ARCHIVE_ENABLED, PAGE_ARCHIVE_DIR, PAGE_ARCHIVE_COMPRESSION, PAGE_ARCHIVE_SEGMENT_MB,
+    PAGE_ARCHIVE_INDEX_BATCH
+)
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cabecera de cada registro: largo (4 bytes) del JSON de metadatos
+RECORD_HEADER = struct.Struct(">I")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pages_url_fetched_at ON pages (url, fetched_at);
+"""
+
+@dataclass
+class ArchivedPage:
+    """Respuesta HTTP guardada en el archivo de páginas"""
+    url: str
+    fetched_at: datetime
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+
+class PageArchive:
+    """
+    Archivo comprimido de las respuestas HTTP descargadas
+
+    Cada proceso escribe sus propios segmentos (el PID forma parte del nombre)
+    y abre uno nuevo al superar `segment_max_bytes`. Cada registro se comprime
+    como un frame independiente (zstd o gzip), por lo que se puede leer solo
+    ese registro conociendo su offset; los frames concatenados siguen siendo un
+    archivo .zst/.gz válido. El índice (url, fetched_at) -> (segmento, offset)
+    se guarda en una base SQLite dentro del mismo directorio.
+
+    Las filas del índice se confirman por lotes de `index_batch_size` páginas,
+    al consultar el índice, con flush() al terminar cada tarea y con close().
+    Antes de cada confirmación se sincroniza el segmento a disco, de modo que
+    una fila del índice nunca apunta a datos que no están escritos. Si el
+    proceso muere, las páginas del último lote quedan en el segmento sin fila.
+    """
+
+    INDEX_NAME = "index.sqlite"
+
+    def __init__(self, directory: str, compression: str = "zstd", segment_max_bytes: int = 256 * 1024 * 1024,
+                 index_batch_size: int = 100):
+        if compression == "zstd" and zstandard is None:
+            logger.warning("El paquete zstandard no está instalado, el archivo de páginas usará gzip")
+            compression = "gzip"
+        if compression not in ("zstd", "gzip"):
+            raise ValueError(f"Compresión no soportada para el archivo de páginas: {compression}")
+
+        self.directory = directory
+        self.compression = compression
+        self.segment_max_bytes = segment_max_bytes
+        self.index_batch_size = max(1, index_batch_size)
+        self._lock = threading.Lock()
+        self._segment_name: Optional[str] = None
+        self._segment_file = None
+        self._segment_count = 0
+        self._pid = os.getpid()
+        self._index: Optional[sqlite3.Connection] = None
+        self._readers: Dict[str, Any] = {}
+        self._pending_rows: List[Tuple[str, str, str, int, int]] = []
+        os.makedirs(directory, exist_ok=True)
+
+    # ---- Índice ----
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión al índice, reabierta si el proceso fue bifurcado"""
+        if self._index is None or self._pid != os.getpid():
+            self._reset_after_fork()
+            self._index = sqlite3.connect(os.path.join(self.directory, self.INDEX_NAME), timeout=30,
+                                          check_same_thread=False)
+            self._index.execute("PRAGMA journal_mode=WAL")
+            self._index.execute("PRAGMA synchronous=NORMAL")
+            self._index.executescript(INDEX_SCHEMA)
+        return self._index
+
+    def _reset_after_fork(self):
+        # Los descriptores heredados del proceso padre no se comparten entre hijos
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._segment_name = None
+            self._segment_file = None
+            self._index = None
+            self._readers = {}
+            self._pending_rows = []
+
+    # ---- Escritura ----
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def _current_segment(self):
+        """Segmento abierto para escritura, rotando si superó el tamaño máximo"""
+        if self._segment_file is not None and self._segment_file.tell() >= self.segment_max_bytes:
+            # Las filas pendientes apuntan al segmento que se cierra
+            self._commit_index()
+            self._segment_file.close()
+            self._segment_file = None
+
+        if self._segment_file is None:
+            extension = "zst" if self.compression == "zstd" else "gz"
+            self._segment_count += 1
+            timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+            self._segment_name = f"segment-{timestamp}-{self._pid}-{self._segment_count}.{extension}"
+            # Sin buffer: cada registro llega al sistema operativo al escribirse
+            self._segment_file = open(os.path.join(self.directory, self._segment_name), "ab", buffering=0)
+            logger.info(f"Nuevo segmento del archivo de páginas: {self._segment_name}")
+        return self._segment_name, self._segment_file
+
+    def _commit_index(self):
+        """
+        Confirma en el índice las filas pendientes (con el lock tomado)
+
+        El segmento se sincroniza a disco antes del commit. Si falla, las filas
+        se descartan: sus registros siguen en el segmento pero sin índice.
+        """
+        if not self._pending_rows:
+            return
+        rows, self._pending_rows = self._pending_rows, []
+        if self._segment_file is not None:
+            os.fsync(self._segment_file.fileno())
+        connection = self._connection()
+        connection.executemany(
+            "INSERT INTO pages (url, fetched_at, segment, offset, length) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        connection.commit()
+
+    def flush(self) -> bool:
+        """
+        Confirma en el índice las páginas agregadas desde el último lote
+
+        Returns:
+            bool: False si no se pudo escribir el índice
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return True
+            try:
+                self._commit_index()
+                return True
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"No se pudo confirmar el índice del archivo de páginas: {str(e)}")
+                return False
+
+    def append(self, url: str, status_code: int, headers: Mapping[str, str], content: bytes,
+               fetched_at: Optional[datetime] = None) -> bool:
+        """
+        Agrega una respuesta al archivo y la registra en el índice
+
+        La fila del índice se confirma con el lote (ver index_batch_size). Los
+        errores de disco no interrumpen el scraping: se registran y se retorna
+        False.
+
+        Args:
+            url (str): URL descargada
+            status_code (int): Código de estado HTTP
+            headers (Mapping[str, str]): Headers de la respuesta
+            content (bytes): Cuerpo de la respuesta
+            fetched_at (datetime, optional): Momento de la descarga (por defecto ahora, UTC)
+
+        Returns:
+            bool: True si la respuesta quedó archivada
+        """
+        fetched_at = fetched_at or datetime.utcnow()
+        metadata = json.dumps({
+            "url": url,
+            "fetched_at": fetched_at.isoformat(),
+            "status_code": status_code,
+            "headers": dict(headers)
+        }).encode("utf-8")
+        frame = self._compress(RECORD_HEADER.pack(len(metadata)) + metadata + content)
+
+        try:
+            with self._lock:
+                self._reset_after_fork()
+                segment, segment_file = self._current_segment()
+                offset = segment_file.tell()
+                segment_file.write(frame)
+                self._pending_rows.append((url, fetched_at.isoformat(), segment, offset, len(frame)))
+                if len(self._pending_rows) >= self.index_batch_size:
+                    self._commit_index()
+            return True
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"No se pudo archivar la respuesta de {url}: {str(e)}")
+            return False
+
+    # ---- Lectura ----
+
+    def _decompress(self, frame: bytes) -> bytes:
+        if self.compression == "zstd" and frame[:4] == b"\x28\xb5\x2f\xfd":
+            return zstandard.ZstdDecompressor().decompress(frame)
+        if frame[:2] == b"\x1f\x8b":
+            return gzip.decompress(frame)
+        if zstandard is None:
+            raise ValueError("El registro está comprimido con zstd y el paquete zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(frame)
+
+    def read(self, segment: str, offset: int, length: int) -> ArchivedPage:
+        """Lee un registro a partir de su ubicación en el índice"""
+        with self._lock:
+            self._reset_after_fork()
+            reader = self._readers.get(segment)
+            if reader is None:
+                reader = open(os.path.join(self.directory, segment), "rb")
+                self._readers[segment] = reader
+            reader.seek(offset)
+            frame = reader.read(length)
+
+        data = self._decompress(frame)
+        (metadata_length,) = RECORD_HEADER.unpack_from(data)
+        metadata = json.loads(data[RECORD_HEADER.size:RECORD_HEADER.size + metadata_length])
+        return ArchivedPage(
+            url=metadata["url"],
+            fetched_at=datetime.fromisoformat(metadata["fetched_at"]),
+            status_code=metadata["status_code"],
+            headers=metadata["headers"],
+            content=data[RECORD_HEADER.size + metadata_length:]
+        )
+
+    def locate_latest(self, urls: Iterable[str], before: Optional[datetime] = None) -> Dict[str, Tuple[str, int, int]]:
+        """
+        Busca en el índice la última descarga archivada de cada URL
+
+        Args:
+            urls (Iterable[str]): URLs a buscar
+            before (datetime, optional): Considerar solo descargas hasta este momento
+
+        Returns:
+            Dict[str, Tuple[str, int, int]]: URL -> (segmento, offset, largo)
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+
+        locations: Dict[str, Tuple[str, int, int]] = {}
+        with self._lock:
+            self._reset_after_fork()
+            # Incluir las páginas de este proceso que aún no se confirmaron
+            self._commit_index()
+            connection = self._connection()
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                query = f"SELECT url, segment, offset, length FROM pages WHERE url IN ({placeholders})"
+                params: List[Any] = list(batch)
+                if before is not None:
+                    query += " AND fetched_at <= ?"
+                    params.append(before.isoformat())
+                # Ordenar por fecha para quedarse con la última descarga de cada URL
+                for url, segment, offset, length in connection.execute(query + " ORDER BY fetched_at", params):
+                    locations[url] = (segment, offset, length)
+        return locations
+
+    def get_latest(self, url: str, before: Optional[datetime] = None) -> Optional[ArchivedPage]:
+        """Retorna la última descarga archivada de una URL, o None si no hay"""
+        location = self.locate_latest([url], before).get(url)
+        return self.read(*location) if location else None
+
+    def iter_latest(self, urls: Iterable[str], before: Optional[datetime] = None) -> Iterator[ArchivedPage]:
+        """
+        Entrega la última descarga archivada de cada URL
+
+        Los registros se leen ordenados por segmento y offset para que la
+        lectura del disco sea secuencial. Las URLs sin descarga se omiten.
+        """
+        locations = sorted(self.locate_latest(urls, before).values())
+        for segment, offset, length in locations:
+            yield self.read(segment, offset, length)
+
+    def close(self):
+        """Cierra los segmentos y el índice abiertos por el proceso"""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            try:
+                self._commit_index()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"No se pudo confirmar el índice del archivo de páginas: {str(e)}")
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+_page_archive: Optional[PageArchive] = None
+
+def get_page_archive() -> Optional[PageArchive]:
+    """
+    Retorna el archivo de páginas del proceso configurado en settings
+
+    Returns:
+        Optional[PageArchive]: Archivo de páginas, o None si está deshabilitado
+    """
+    global _page_archive
+
+    if not PAGE_ARCHIVE_ENABLED:
+        return None
+    if _page_archive is None:
+        _page_archive = PageArchive(
+            PAGE_ARCHIVE_DIR,
+            compression=PAGE_ARCHIVE_COMPRESSION,
+            segment_max_bytes=PAGE_ARCHIVE_SEGMENT_MB * 1024 * 1024,
+            index_batch_size=PAGE_ARCHIVE_INDEX_BATCH
+        )
+    return _page_archive
+
+def flush_page_archive():
+    """Confirma el índice del archivo de páginas del proceso, si se abrió"""
+    if _page_archive is not None:
+        _page_archive.flush()
+
+def close_page_archive():
+    """Cierra el archivo de páginas del proceso, si se abrió"""
+    if _page_archive is not None:
+        _page_archive.close()
@@ -0,0 +1,310 @@
+import asyncio
+import dataclasses
+import queue
+import threading
+import httpx
+from contextlib import asynccontextmanager, nullcontext
+from typing import Dict, Any, AsyncIterator, Iterable, Iterator, Optional, Set, Tuple
+import logging
+
+from .scraper import WebScraper
+from .transport import create_async_client, get_transport
+from .rate_limiter import HostRateLimiter
+from .http_cache import ValidatorCache
+from .archive import PageArchive
+from .download import (
+    CHUNK_SIZE, ERROR_HTTP_STATUS, ERROR_NETWORK, ERROR_UNEXPECTED,
+    BodyReader, DownloadLimits, DownloadRejected, DownloadTimeout
+)
+from .resilience import RETRY_STATUSES, CircuitBreaker, RetryPolicy
+from ..metrics import track_request
+from ..tracing import httpx_trace_hook, start_span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marca que deja el thread del event loop en la cola de scrape_iter al terminar
+_ENGINE_DONE = object()
+
+# Errores de httpx que se consideran transitorios y se reintentan
+TRANSIENT_HTTPX_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+class AsyncWebScraper:
+    """
+    Contraparte asíncrona de WebScraper basada en httpx y asyncio
+
+    Mantiene hasta `concurrency` peticiones en vuelo a la vez, de modo que el
+    tiempo total de un archivo depende de la latencia de la red y no de la
+    cantidad de URLs. La extracción de campos se delega en WebScraper para que
+    ambos motores produzcan exactamente el mismo resultado.
+    """
+
+    def __init__(self, concurrency: int = 10, timeout: Optional[float] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 cache: Optional[ValidatorCache] = None,
+                 html_content_mode: Optional[str] = None,
+                 archive: Optional[PageArchive] = None,
+                 download_limits: Optional[DownloadLimits] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.transport = transport
+        self.shared = get_transport()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.archive = archive
+        # El extractor comparte la caché, el archivo, los límites y la política de
+        # reintentos para reutilizar handle_response, circuit_rejection y retry_delay
+        self.extractor = WebScraper(
+            cache=cache, archive=archive,
+            html_content_mode=html_content_mode, download_limits=download_limits,
+            retry_policy=retry_policy, circuit_breaker=circuit_breaker
+        )
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Crea un cliente HTTP asíncrono propio (transporte alternativo o timeout explícito)"""
+        config = self.shared.config
+        if self.timeout is not None:
+            config = dataclasses.replace(config, read_timeout=self.timeout)
+        return create_async_client(config, max_connections=self.concurrency, transport=self.transport)
+
+    @asynccontextmanager
+    async def _client_scope(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Entrega el cliente a usar en scrape_many
+
+        Por defecto es el cliente compartido del proceso, que no se cierra al
+        terminar para conservar sus conexiones; con un transporte o timeout
+        propios se crea un cliente que se cierra al salir.
+        """
+        if self.transport is None and self.timeout is None:
+            yield self.shared.async_client()
+        else:
+            async with self._create_client() as client:
+                yield client
+
+    async def scrape_website(self, client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+        """
+        Realiza el scraping de una página web de forma asíncrona
+
+        Aplica los mismos reintentos y circuit breaker que WebScraper; la espera
+        entre intentos no bloquea las demás descargas en vuelo.
+
+        Args:
+            client (httpx.AsyncClient): Cliente HTTP a utilizar
+            url (str): URL de la página web a scrapear
+
+        Returns:
+            Dict[str, Any]: Diccionario con los datos extraídos y metadatos
+        """
+        with start_span("scrape.url", url=url) as span:
+            attempt = 0
+            while True:
+                rejected = self.extractor.circuit_rejection(url)
+                if rejected:
+                    return rejected
+
+                result, retry_reason, retry_after = await self._fetch(client, url)
+                delay = self.extractor.retry_delay(url, attempt, retry_reason, retry_after)
+                if delay is None:
+                    span.set_attribute("scrape.attempts", attempt + 1)
+                    return result
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """
+        Realiza un único intento de descarga y extracción de la URL
+
+        Returns:
+            Tuple: Resultado, motivo de reintento (None si es definitivo) y header Retry-After
+        """
+        try:
+            logger.info(f"Iniciando scraping de: {url}")
+
+            # Enviar los validadores guardados para evitar descargar páginas sin cambios
+            cache_entry, conditional_headers = None, {}
+            if self.cache:
+                cache_entry, conditional_headers = self.cache.conditional_headers(url)
+
+            # Descargar en streaming respetando el límite del host compartido entre workers
+            async with self.rate_limiter.limit_async(url) if self.rate_limiter else nullcontext():
+                with track_request("httpx"), start_span("http.get", url=url, engine="httpx") as span:
+                    # Con tracing, httpx reporta la conexión (DNS y TCP), TLS y la espera de la respuesta
+                    trace_hook = httpx_trace_hook()
+                    extensions = {"trace": trace_hook} if trace_hook else None
+                    # El tiempo total se limita aparte del timeout de lectura, que solo
+                    # cubre la espera entre bytes y no corta un cuerpo enviado de a poco
+                    max_seconds = self.extractor.download_limits.max_seconds
+                    try:
+                        response, reader = await asyncio.wait_for(
+                            self._download(client, url, conditional_headers, extensions, cache_entry is not None, span),
+                            max_seconds or None
+                        )
+                    except asyncio.TimeoutError:
+                        raise DownloadTimeout(f"más de {max_seconds:g} s")
+
+            if reader is None:
+                return self.cache.cached_result(url, cache_entry), None, None
+            return self.extractor.handle_response(url, response.status_code, response.headers, reader), None, None
+
+        except DownloadRejected as e:
+            logger.warning(f"Descarga de {url} cortada: {e.description}")
+            return self.extractor._create_error_response(url, e.description, e.category), None, None
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Error HTTP al acceder a {url}: {str(e)}")
+            status_code = e.response.status_code
+            result = self.extractor._create_error_response(
+                url, f"Error de red (HTTP {status_code}): {str(e)}", ERROR_HTTP_STATUS
+            )
+            if status_code in RETRY_STATUSES:
+                return result, f"http_{status_code}", e.response.headers.get("Retry-After")
+            return result, None, None
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error de red al acceder a {url}: {str(e)}")
+            result = self.extractor._create_error_response(url, f"Error de red: {str(e)}", ERROR_NETWORK)
+            return result, "network" if isinstance(e, TRANSIENT_HTTPX_ERRORS) else None, None
+
+        except Exception as e:
+            logger.error(f"Error inesperado al procesar {url}: {str(e)}")
+            return self.extractor._create_error_response(url, f"Error inesperado: {str(e)}", ERROR_UNEXPECTED), None, None
+
+    async def _download(self, client: httpx.AsyncClient, url: str, conditional_headers: Dict[str, str],
+                        extensions: Optional[Dict[str, Any]], cached: bool, span) -> Tuple[httpx.Response, Optional[BodyReader]]:
+        """
+        Descarga el cuerpo de la URL en streaming aplicando los límites de descarga
+
+        Args:
+            client (httpx.AsyncClient): Cliente HTTP a utilizar
+            url (str): URL a descargar
+            conditional_headers (Dict[str, str]): Validadores de la caché
+            extensions (Dict[str, Any], optional): Extensiones de httpx (tracing)
+            cached (bool): True si hay una entrada en caché para aceptar un 304
+            span: Span de la petición en el que se registra el status
+
+        Returns:
+            Tuple: Respuesta y BodyReader con el cuerpo, o None si el servidor
+                respondió 304 y hay una entrada en caché
+        """
+        async with client.stream("GET", url, headers=conditional_headers, extensions=extensions) as response:
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code == 304 and cached:
+                return response, None
+            response.raise_for_status()
+
+            reader = self.extractor.body_reader(url, response.headers)
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                if reader.feed(chunk):
+                    break
+        return response, reader
+
+    async def _scrape_pair(self, client: httpx.AsyncClient, url: str) -> Tuple[str, Dict[str, Any]]:
+        """Devuelve la URL junto a su resultado para poder asociarlos al completar"""
+        return url, await self.scrape_website(client, url)
+
+    async def scrape_many(self, urls: Iterable[str]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Scrapea un conjunto de URLs manteniendo `concurrency` peticiones en vuelo
+
+        Las URLs se consumen de forma perezosa y los resultados se entregan en
+        orden de finalización, no en el orden de entrada.
+
+        Args:
+            urls (Iterable[str]): URLs a scrapear
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: URL y resultado del scraping
+        """
+        pending: Set[asyncio.Task] = set()
+        async with self._client_scope() as client:
+            try:
+                for url in urls:
+                    pending.add(asyncio.ensure_future(self._scrape_pair(client, url)))
+                    if len(pending) >= self.concurrency:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                # Si el consumidor se detiene antes de tiempo, cancelar lo que quede en vuelo
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+    def scrape_iter(self, urls: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Versión síncrona de scrape_many para usarla desde tareas de Celery
+
+        El event loop compartido del proceso corre en un thread propio durante
+        todo el recorrido de `urls` y deja los resultados en una cola; el
+        consumidor los toma en su thread, de modo que el código que escribe en
+        la base de datos puede seguir siendo síncrono sin frenar las descargas
+        en vuelo mientras escribe. Se acumulan a lo sumo `concurrency`
+        resultados sin consumir. El loop no se cierra al terminar: el cliente
+        compartido mantiene en él sus conexiones para la próxima tarea.
+
+        Args:
+            urls (Iterable[str]): URLs a scrapear (se leen desde el thread del loop)
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: URL y resultado del scraping
+        """
+        loop = self.shared.loop()
+        results: "queue.Queue" = queue.Queue()
+        slots = asyncio.Semaphore(self.concurrency)
+        # La tarea se crea en este thread para que herede su contexto (spans de tracing)
+        producer = loop.create_task(self._produce(urls, results, slots))
+        engine = threading.Thread(
+            target=self._run_engine, args=(loop, producer, results), name="scraper-engine", daemon=True
+        )
+        engine.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _ENGINE_DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                loop.call_soon_threadsafe(slots.release)
+                yield item
+        finally:
+            # Si el consumidor se detiene antes de tiempo, cancelar las descargas en vuelo
+            loop.call_soon_threadsafe(producer.cancel)
+            engine.join()
+
+    @staticmethod
+    def _run_engine(loop: asyncio.AbstractEventLoop, producer: asyncio.Task, results: "queue.Queue"):
+        """
+        Corre el event loop hasta que termina `producer` (thread de scrape_iter)
+
+        Al terminar deja _ENGINE_DONE en la cola, precedido por la excepción si
+        la hubo, para que el consumidor nunca quede esperando.
+        """
+        try:
+            loop.run_until_complete(producer)
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(_ENGINE_DONE)
+
+    async def _produce(self, urls: Iterable[str], results: "queue.Queue", slots: asyncio.Semaphore):
+        """Recorre scrape_many dejando cada resultado en la cola cuando hay lugar en `slots`"""
+        pairs = self.scrape_many(urls)
+        try:
+            async for pair in pairs:
+                await slots.acquire()
+                results.put(pair)
+        finally:
+            await pairs.aclose()
@@ -0,0 +1,192 @@
+import time
+import redis
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional, Set
+import logging
+
+from ..models import Link
+from ..settings import REDIS_HOST, REDIS_PORT, FILE_LEASE_SECONDS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FileCheckpoint:
+    """
+    Checkpoint del procesamiento de un archivo guardado en Redis
+
+    Por cada bloque (identificado por el offset donde comienza) guarda el
+    offset de la última URL cuyo lote ya está confirmado en la base de datos.
+    Al reanudar, la lectura salta directamente a ese offset. Las URLs ya
+    guardadas a partir de ahí se descartan con find_done_urls, por lo que un
+    checkpoint perdido solo cuesta releer el bloque, nunca duplicar links.
+    """
+
+    KEY_PREFIX = "scraper:checkpoint"
+    # Campo del hash con el ID del chord que ya se despachó para el archivo
+    CHORD_FIELD = "chord"
+
+    def __init__(self, redis_client: redis.Redis, file_id: int, ttl_seconds: int = 7 * 24 * 3600):
+        self.redis = redis_client
+        self.file_id = file_id
+        self.ttl_seconds = ttl_seconds
+        self.key = f"{self.KEY_PREFIX}:{file_id}"
+
+    def get(self, chunk_start: int) -> Optional[int]:
+        """Retorna el último offset confirmado del bloque, o None si no hay checkpoint"""
+        try:
+            offset = self.redis.hget(self.key, str(chunk_start))
+            return int(offset) if offset is not None else None
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo leer el checkpoint del archivo {self.file_id}: {str(e)}")
+            return None
+
+    def save(self, chunk_start: int, offset: int):
+        """Guarda el último offset confirmado del bloque"""
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.hset(self.key, str(chunk_start), offset)
+            pipeline.expire(self.key, self.ttl_seconds)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar el checkpoint del archivo {self.file_id}: {str(e)}")
+
+    def exists(self) -> bool:
+        """Indica si el archivo tiene algún checkpoint o un chord despachado"""
+        try:
+            return bool(self.redis.exists(self.key))
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo leer el checkpoint del archivo {self.file_id}: {str(e)}")
+            return False
+
+    def get_chord(self) -> Optional[str]:
+        """Retorna el ID de la tarea final del chord ya despachado, o None si no hay"""
+        try:
+            return self.redis.hget(self.key, self.CHORD_FIELD)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo leer el checkpoint del archivo {self.file_id}: {str(e)}")
+            return None
+
+    def save_chord(self, callback_id: str):
+        """Guarda el ID de la tarea final del chord despachado para el archivo"""
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.hset(self.key, self.CHORD_FIELD, callback_id)
+            pipeline.expire(self.key, self.ttl_seconds)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar el checkpoint del archivo {self.file_id}: {str(e)}")
+
+    def clear(self):
+        """Elimina los checkpoints del archivo"""
+        try:
+            self.redis.delete(self.key)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo eliminar el checkpoint del archivo {self.file_id}: {str(e)}")
+
+class FileLease:
+    """
+    Lease en Redis de la tarea que está procesando un archivo
+
+    Se toma con SET NX PX guardando el ID de la tarea dueña, que lo renueva
+    mientras trabaja (heartbeat). Si el worker muere deja de renovarse y vence
+    a los ttl_seconds; recién entonces otra tarea puede tomarlo. Una reentrega
+    o un reintento conservan el ID de la tarea, por lo que recuperan su lease.
+    Los errores de Redis solo se registran y no impiden procesar el archivo.
+    """
+
+    KEY_PREFIX = "scraper:lease"
+
+    def __init__(self, redis_client: redis.Redis, file_id: int, ttl_seconds: float = FILE_LEASE_SECONDS):
+        self.redis = redis_client
+        self.file_id = file_id
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.key = f"{self.KEY_PREFIX}:{file_id}"
+        self._last_renewal: Optional[float] = None
+
+    def acquire(self, owner: str) -> bool:
+        """
+        Toma el lease para `owner`, o lo renueva si ya era suyo
+
+        Returns:
+            bool: False si otra tarea tiene el lease vigente
+        """
+        try:
+            if self.redis.set(self.key, owner, nx=True, px=self.ttl_ms):
+                self._last_renewal = time.monotonic()
+                return True
+            return self.renew(owner)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo tomar el lease del archivo {self.file_id}: {str(e)}")
+            return True
+
+    def renew(self, owner: str) -> bool:
+        """Extiende el lease si sigue siendo de `owner`"""
+        try:
+            if self.redis.get(self.key) != owner:
+                return False
+            self.redis.pexpire(self.key, self.ttl_ms)
+            self._last_renewal = time.monotonic()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo renovar el lease del archivo {self.file_id}: {str(e)}")
+            return True
+
+    def heartbeat(self, owner: str):
+        """Renueva el lease como máximo una vez por tercio de su duración"""
+        if self._last_renewal is not None and time.monotonic() - self._last_renewal < self.ttl_ms / 3000:
+            return
+        if not self.renew(owner):
+            logger.warning(f"El lease del archivo {self.file_id} ya no pertenece a la tarea {owner}")
+
+    def is_held(self) -> bool:
+        """Indica si alguna tarea tiene el lease vigente"""
+        try:
+            return bool(self.redis.exists(self.key))
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo leer el lease del archivo {self.file_id}: {str(e)}")
+            return False
+
+    def release(self, owner: Optional[str] = None):
+        """Libera el lease al terminar el archivo (PROCESSED o ERROR), si es de `owner` o sin dueño indicado"""
+        try:
+            if owner is None or self.redis.get(self.key) in (owner, None):
+                self.redis.delete(self.key)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo liberar el lease del archivo {self.file_id}: {str(e)}")
+
+def find_done_urls(db: Session, file_id: int, urls: Iterable[str]) -> Set[str]:
+    """
+    Retorna las URLs que ya tienen un registro Link para el archivo
+
+    Args:
+        db (Session): Sesión de base de datos
+        file_id (int): ID del archivo
+        urls (Iterable[str]): URLs a verificar
+
+    Returns:
+        Set[str]: URLs ya procesadas
+    """
+    urls = list(urls)
+    if not urls:
+        return set()
+    rows = db.query(Link.url).filter(Link.file_id == file_id, Link.url.in_(urls)).all()
+    return {row.url for row in rows}
+
+_redis_client: Optional[redis.Redis] = None
+
+def _get_redis_client() -> redis.Redis:
+    """Cliente Redis del proceso para checkpoints y leases"""
+    global _redis_client
+
+    if _redis_client is None:
+        _redis_client = redis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True)
+    return _redis_client
+
+def get_checkpoint(file_id: int) -> FileCheckpoint:
+    """Retorna el checkpoint de un archivo usando el cliente Redis del proceso"""
+    return FileCheckpoint(_get_redis_client(), file_id)
+
+def get_file_lease(file_id: int) -> FileLease:
+    """Retorna el lease de un archivo usando el cliente Redis del proceso"""
+    return FileLease(_get_redis_client(), file_id)
@@ -0,0 +1,181 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from dateutil import parser as dateutil_parser
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Meses en español para las fechas legibles ("15 de marzo de 2024")
+SPANISH_MONTHS = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
+}
+
+# Máximo de hosts cuyo formato se recuerda
+MAX_CACHED_HOSTS = 4096
+
+@dataclass(frozen=True)
+class DateFormat:
+    """
+    Formato de fecha reconocible sin dateutil
+
+    Attributes:
+        name (str): Nombre del formato (para los logs y las estadísticas)
+        parse (Callable[[str], Optional[datetime]]): Convierte el texto, o
+            retorna None si el texto no tiene este formato
+    """
+    name: str
+    parse: Callable[[str], Optional[datetime]]
+
+# Host de una URL; más barato que urlsplit, que dominaba el tiempo de normalize_many
+HOST_PATTERN = re.compile(r"[a-z][a-z0-9+.-]*://(?:[^@/?#]*@)?([^:/?#]*)", re.IGNORECASE)
+
+def _host(url: Optional[str]) -> str:
+    match = HOST_PATTERN.match(url) if url else None
+    return match.group(1).lower() if match else ""
+
+def _parse_iso(value: str) -> Optional[datetime]:
+    # datetime.fromisoformat de Python 3.10 no acepta el sufijo Z
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def _regex_format(pattern: str, build: Callable[[re.Match], datetime]) -> Callable[[str], Optional[datetime]]:
+    compiled = re.compile(pattern, re.IGNORECASE)
+
+    def parse(value: str) -> Optional[datetime]:
+        match = compiled.fullmatch(value)
+        if match is None:
+            return None
+        try:
+            return build(match)
+        except (ValueError, KeyError):
+            return None
+    return parse
+
+# Formatos probados en orden antes de recurrir a dateutil. Solo se incluyen
+# formatos cuyo resultado coincide con el de dateutil (que interpreta
+# "01/02/2024" como mes/día), más el formato en español que dateutil no reconoce.
+DATE_FORMATS: Tuple[DateFormat, ...] = (
+    DateFormat("iso", _parse_iso),
+    DateFormat("iso_fraccion", _regex_format(
+        r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})\.(\d{1,6})",
+        lambda m: datetime(*map(int, m.groups()[:6]), int(m.group(7).ljust(6, "0")))
+    )),
+    DateFormat("anio_mes_dia", _regex_format(
+        r"(\d{4})/(\d{1,2})/(\d{1,2})",
+        lambda m: datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    )),
+    DateFormat("mes_dia_anio", _regex_format(
+        r"(\d{1,2})/(\d{1,2})/(\d{4})",
+        lambda m: datetime(int(m.group(3)), int(m.group(1)), int(m.group(2)))
+    )),
+    DateFormat("texto_es", _regex_format(
+        r"(\d{1,2})\s+de\s+([a-záéíóú]+)(?:\s+de)?\s+(\d{4})",
+        lambda m: datetime(int(m.group(3)), SPANISH_MONTHS[m.group(2).lower()], int(m.group(1)))
+    )),
+)
+
+class DateNormalizer:
+    """
+    Convierte los valores de <time datetime> en datetime
+
+    Prueba formatos precompilados (DATE_FORMATS) antes del parser genérico de
+    dateutil, que es mucho más lento. Para cada host recuerda el último
+    formato que funcionó y lo prueba primero, ya que las páginas de un mismo
+    sitio usan casi siempre el mismo formato.
+    """
+
+    def __init__(self, formats: Tuple[DateFormat, ...] = DATE_FORMATS, max_hosts: int = MAX_CACHED_HOSTS):
+        self.formats = formats
+        self.max_hosts = max_hosts
+        self._host_formats: Dict[str, DateFormat] = {}
+
+    def normalize(self, raw: Optional[str], url: Optional[str] = None) -> Optional[datetime]:
+        """
+        Convierte una fecha en texto en datetime
+
+        Args:
+            raw (str, optional): Valor del atributo datetime
+            url (str, optional): URL de la página, para usar el formato recordado del host
+
+        Returns:
+            Optional[datetime]: Fecha, o None si no hay valor o no se pudo interpretar
+        """
+        return self._normalize(raw, _host(url))
+
+    def _normalize(self, raw: Optional[str], host: str) -> Optional[datetime]:
+        if not raw:
+            return None
+        value = raw.strip()
+
+        cached = self._host_formats.get(host)
+        if cached is not None:
+            parsed = cached.parse(value)
+            if parsed is not None:
+                return parsed
+
+        for date_format in self.formats:
+            if date_format is cached:
+                continue
+            parsed = date_format.parse(value)
+            if parsed is not None:
+                self._remember(host, date_format)
+                return parsed
+
+        # Último recurso: el parser genérico de dateutil
+        try:
+            return dateutil_parser.parse(value)
+        except (ValueError, OverflowError) as date_error:
+            logger.warning(f"Error al parsear fecha '{raw}': {date_error}")
+            return None
+
+    def normalize_many(self, items: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[Optional[datetime]]:
+        """
+        Convierte muchas fechas a la vez
+
+        Los textos repetidos del mismo host se interpretan una sola vez.
+
+        Args:
+            items (Iterable[Tuple[str, str]]): Pares (fecha en texto, URL de la página)
+
+        Returns:
+            List[Optional[datetime]]: Fechas en el mismo orden que la entrada
+        """
+        seen: Dict[Tuple[Optional[str], str], Optional[datetime]] = {}
+        results = []
+        for raw, url in items:
+            key = (raw, _host(url))
+            if key not in seen:
+                seen[key] = self._normalize(*key)
+            results.append(seen[key])
+        return results
+
+    def _remember(self, host: str, date_format: DateFormat):
+        if host not in self._host_formats and len(self._host_formats) >= self.max_hosts:
+            self._host_formats.clear()
+        self._host_formats[host] = date_format
+
+# Instancia compartida por el proceso
+date_normalizer = DateNormalizer()
+
+def parse_post_date(raw: Optional[str], url: Optional[str] = None) -> Optional[datetime]:
+    """
+    Convierte el valor de <time datetime> de una página en la fecha de publicación
+
+    Args:
+        raw (str, optional): Fecha extraída por el scraper
+        url (str, optional): URL de la página
+
+    Returns:
+        Optional[datetime]: Fecha de publicación, o None si no se pudo interpretar
+    """
+    return date_normalizer.normalize(raw, url)
@@ -0,0 +1,119 @@
+import time
+from typing import Any, Dict
+import logging
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from ..metrics import DB_POOL_CAPACITY, DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class _CheckoutTimingMixin:
+    """
+    Mide cuánto tarda cada checkout del pool (espera por una conexión libre,
+    pre-ping y conexión nueva) y cuenta los que agotan pool_timeout
+
+    La clase se conserva al recrear el pool (engine.dispose), por eso el
+    nombre del pool en las métricas es un atributo de clase.
+    """
+
+    metrics_name = "sync"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool del motor síncrono (workers de Celery)"""
+    metrics_name = "sync"
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """Pool del motor asíncrono de la API"""
+    metrics_name = "async"
+
+def engine_options(pool_size: int, max_overflow: int, pool_timeout: float, pool_recycle: int,
+                   pre_ping: bool, pgbouncer: bool, async_driver: bool = False) -> Dict[str, Any]:
+    """
+    Argumentos de create_engine / create_async_engine para el pool configurado
+
+    Detrás de PgBouncer (modo transacción) el pool lo hace PgBouncer: se usa
+    NullPool y, con asyncpg, se deshabilitan los prepared statements, que no
+    sobreviven al cambio de conexión del servidor entre transacciones.
+
+    Args:
+        pool_size (int): Conexiones que el pool mantiene abiertas por proceso
+        max_overflow (int): Conexiones adicionales temporales por proceso
+        pool_timeout (float): Segundos de espera por una conexión libre
+        pool_recycle (int): Segundos tras los que se reemplaza una conexión (-1 = nunca)
+        pre_ping (bool): Verificar cada conexión antes de entregarla
+        pgbouncer (bool): Conexión a través de PgBouncer
+        async_driver (bool): Opciones para el motor asíncrono (asyncpg)
+
+    Returns:
+        Dict[str, Any]: Argumentos del motor
+    """
+    if pgbouncer:
+        options: Dict[str, Any] = {"poolclass": NullPool, "pool_pre_ping": pre_ping}
+        if async_driver:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pre_ping,
+        # Reutilizar las conexiones más recientes deja cerrar por recycle las que sobran
+        "pool_use_lifo": True,
+    }
+
+# Capacidad de cada pool instrumentado del proceso, por nombre
+_capacities: Dict[str, int] = {}
+
+def instrument_engine(engine: Engine, name: str, capacity: int = 0):
+    """
+    Registra en las métricas las conexiones en uso del pool de un motor
+
+    Args:
+        engine (Engine): Motor síncrono (para el asíncrono, async_engine.sync_engine)
+        name (str): Nombre del pool en las métricas (sync, async)
+        capacity (int): pool_size + max_overflow (0 si no tiene límite, como NullPool)
+    """
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    if capacity:
+        _capacities[name] = capacity
+        DB_POOL_CAPACITY.labels(name).set(capacity)
+
+    @event.listens_for(engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def count_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+def dispose_after_fork(engine: Engine):
+    """
+    Descarta en un proceso hijo las conexiones heredadas del proceso padre
+
+    Con close=False los sockets del padre no se cierran (los sigue usando él);
+    el hijo abre sus propias conexiones en el primer checkout. También se
+    vuelve a publicar la capacidad de los pools: en modo multiproceso las
+    métricas de cada proceso empiezan vacías.
+    """
+    engine.dispose(close=False)
+    for name, capacity in _capacities.items():
+        DB_POOL_CAPACITY.labels(name).set(capacity)
+    logger.info("Pool de conexiones reiniciado en el proceso hijo del worker")
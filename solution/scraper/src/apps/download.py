@@ -0,0 +1,183 @@
+import time
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Tuple
+import logging
+
+from .parsers import IncrementalFeeder
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Categorías de error de un scraping. Cada una se reconoce en
+# Link.error_description por el prefijo del mensaje:
+ERROR_NETWORK = "network"            # "Error de red: ..."
+ERROR_HTTP_STATUS = "http_status"    # "Error de red (HTTP 500): ..."
+ERROR_TOO_LARGE = "too_large"        # "Respuesta demasiado grande: ..."
+ERROR_CONTENT_TYPE = "content_type"  # "Tipo de contenido no soportado: ..."
+ERROR_DEADLINE = "deadline"          # "Descarga demasiado lenta: ..."
+ERROR_NOT_FOUND = "not_found"        # "La página no existe - ..."
+ERROR_CIRCUIT_OPEN = "circuit_open"  # "Host no disponible (circuito abierto): ..."
+ERROR_UNEXPECTED = "unexpected"      # "Error inesperado: ..."
+
+# Tamaño de cada fragmento leído del cuerpo de la respuesta
+CHUNK_SIZE = 64 * 1024
+
+class DownloadRejected(Exception):
+    """Descarga cortada por no cumplir los límites configurados"""
+
+    category = ERROR_UNEXPECTED
+    prefix = "Error inesperado"
+
+    @property
+    def description(self) -> str:
+        """Mensaje para Link.error_description"""
+        return f"{self.prefix}: {self}"
+
+class ResponseTooLarge(DownloadRejected):
+    """El cuerpo supera el tamaño máximo permitido"""
+
+    category = ERROR_TOO_LARGE
+    prefix = "Respuesta demasiado grande"
+
+class UnsupportedContentType(DownloadRejected):
+    """El Content-Type de la respuesta no es HTML"""
+
+    category = ERROR_CONTENT_TYPE
+    prefix = "Tipo de contenido no soportado"
+
+class DownloadTimeout(DownloadRejected):
+    """La descarga superó el tiempo total máximo"""
+
+    category = ERROR_DEADLINE
+    prefix = "Descarga demasiado lenta"
+
+@dataclass
+class DownloadLimits:
+    """
+    Límites aplicados a cada descarga
+
+    Attributes:
+        max_bytes (int): Tamaño máximo del cuerpo (0 = sin límite)
+        allowed_content_types (Tuple[str, ...]): Tipos MIME aceptados; una
+            respuesta sin Content-Type se acepta (vacío = todos)
+        max_seconds (float): Tiempo total máximo de la descarga (0 = sin límite);
+            el timeout de lectura solo limita la espera entre bytes, así que un
+            servidor que envía el cuerpo de a poco no lo dispara
+        stop_buffering_after_fields (bool): Dejar de guardar el cuerpo cuando ya
+            se vieron todos los campos; la descarga no se acorta (ver BodyReader).
+            Requiere un backend con parseo incremental (single_pass)
+    """
+    max_bytes: int = 5 * 1024 * 1024
+    allowed_content_types: Tuple[str, ...] = ("text/html", "application/xhtml+xml")
+    max_seconds: float = 60.0
+    stop_buffering_after_fields: bool = True
+
+    @classmethod
+    def from_settings(cls) -> "DownloadLimits":
+        """Crea los límites configurados en settings"""
+        from ..settings import (
+            MAX_RESPONSE_BYTES, ALLOWED_CONTENT_TYPES, DOWNLOAD_MAX_SECONDS, STOP_BUFFERING_AFTER_FIELDS
+        )
+        return cls(
+            max_bytes=MAX_RESPONSE_BYTES,
+            allowed_content_types=tuple(ALLOWED_CONTENT_TYPES),
+            max_seconds=DOWNLOAD_MAX_SECONDS,
+            stop_buffering_after_fields=STOP_BUFFERING_AFTER_FIELDS
+        )
+
+    def check_headers(self, headers: Mapping[str, str]):
+        """
+        Valida los headers antes de leer el cuerpo
+
+        Raises:
+            UnsupportedContentType: Si el Content-Type no está permitido
+            ResponseTooLarge: Si el Content-Length declarado supera el máximo
+        """
+        content_type = (headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type and self.allowed_content_types and content_type not in self.allowed_content_types:
+            raise UnsupportedContentType(content_type)
+
+        content_length = headers.get("Content-Length")
+        if self.max_bytes and content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise ResponseTooLarge(f"{content_length} bytes declarados (máximo {self.max_bytes})")
+
+class BodyReader:
+    """
+    Acumula el cuerpo de una descarga en streaming aplicando DownloadLimits
+
+    Se usa igual con requests (iter_content) y con httpx (aiter_bytes):
+    por cada fragmento se llama a feed() y se deja de leer cuando retorna True;
+    al terminar se llama a close().
+
+    Con stop_buffering_after_fields, una vez que el feeder vio todos los
+    campos el resto del cuerpo ya no se guarda ni se vuelve a parsear, pero se
+    sigue leyendo para buscar el mensaje de página no encontrada, que puede
+    estar en cualquier parte: ahorra memoria y parseo, no tiempo de descarga.
+    La lectura solo se corta antes si aparece ese mensaje. Sin feeder (backends
+    sin incremental() o respuestas que se archivan) se guarda todo el cuerpo.
+
+    feed() también controla el tiempo total desde `started`; como solo se
+    revisa al recibir un fragmento, quien lee debe devolver los bytes a
+    medida que llegan (ver WebScraper) o imponer el límite por su cuenta
+    (AsyncWebScraper).
+    """
+
+    def __init__(self, limits: DownloadLimits, feeder: Optional[IncrementalFeeder] = None,
+                 started: Optional[float] = None):
+        self.limits = limits
+        self.feeder = feeder if limits.stop_buffering_after_fields else None
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.truncated = False
+        self.started = time.monotonic() if started is None else started
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Agrega un fragmento del cuerpo
+
+        Returns:
+            bool: True si se puede cortar la descarga
+
+        Raises:
+            ResponseTooLarge: Si el cuerpo supera el tamaño máximo
+            DownloadTimeout: Si la descarga superó el tiempo total máximo
+        """
+        self.check_deadline()
+        self.size += len(chunk)
+        if self.limits.max_bytes and self.size > self.limits.max_bytes:
+            raise ResponseTooLarge(f"más de {self.limits.max_bytes} bytes")
+        if not self.truncated:
+            self.chunks.append(chunk)
+        if not self.feeder:
+            return False
+
+        if self.feeder.feed(chunk):
+            self.truncated = True
+        return self.feeder.not_found
+
+    def check_deadline(self):
+        """
+        Corta la descarga si superó limits.max_seconds
+
+        Raises:
+            DownloadTimeout: Si se superó el tiempo total máximo
+        """
+        max_seconds = self.limits.max_seconds
+        if max_seconds and time.monotonic() - self.started > max_seconds:
+            raise DownloadTimeout(f"más de {max_seconds:g} s")
+
+    def close(self):
+        """Termina la lectura del cuerpo"""
+        if self.feeder:
+            self.feeder.close()
+
+    @property
+    def not_found(self) -> bool:
+        """True si el feeder vio el mensaje de página no encontrada"""
+        return bool(self.feeder and self.feeder.not_found)
+
+    @property
+    def content(self) -> bytes:
+        """Cuerpo recibido (completo, o hasta que se vieron todos los campos)"""
+        return b"".join(self.chunks)
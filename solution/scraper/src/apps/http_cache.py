@@ -0,0 +1,119 @@
+import hashlib
+import json
+import redis
+from datetime import datetime
+from typing import Dict, Any, Mapping, Optional, Tuple
+import logging
+
+from ..settings import REDIS_HOST, REDIS_PORT, HTTP_CACHE_ENABLED, HTTP_CACHE_TTL_DAYS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Campos extraídos que se guardan junto a los validadores HTTP
+CACHED_FIELDS = ("title", "date", "content", "meta_description", "content_length")
+
+class ValidatorCache:
+    """
+    Caché persistente de validadores HTTP (ETag / Last-Modified) por URL
+
+    Guarda en Redis los validadores de la última respuesta exitosa junto con
+    los campos ya extraídos. Las siguientes descargas envían If-None-Match /
+    If-Modified-Since y, si el servidor responde 304, se reutiliza la
+    extracción guardada sin descargar ni parsear de nuevo la página.
+    """
+
+    KEY_PREFIX = "scraper:httpcache"
+
+    def __init__(self, redis_client: redis.Redis, ttl_seconds: int = 30 * 24 * 3600):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, url: str) -> str:
+        return f"{self.KEY_PREFIX}:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Retorna la entrada guardada para la URL, o None si no existe"""
+        try:
+            raw = self.redis.get(self._key(url))
+            return json.loads(raw) if raw else None
+        except (redis.RedisError, ValueError) as e:
+            logger.warning(f"No se pudo leer la caché HTTP de {url}: {str(e)}")
+            return None
+
+    def conditional_headers(self, url: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """
+        Prepara las cabeceras condicionales para una petición
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Dict[str, str]]: Entrada de caché
+                (o None) y cabeceras If-None-Match / If-Modified-Since
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return entry, headers
+
+    def cached_result(self, url: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Construye el resultado de scraping a partir de una entrada revalidada (304)"""
+        logger.info(f"Página sin cambios (304), se reutiliza la extracción guardada: {url}")
+        result = {field: entry.get(field) for field in CACHED_FIELDS}
+        result.update({
+            "url": url,
+            "status_code": 304,
+            "html_content": None,
+            "page_exists": True,
+            "success": True,
+            "error": None,
+            "error_category": None
+        })
+        return result
+
+    def store(self, url: str, response_headers: Mapping[str, str], result: Dict[str, Any]):
+        """
+        Guarda los validadores y la extracción de una respuesta exitosa
+
+        Si la respuesta no trae ETag ni Last-Modified no se guarda nada, ya que
+        no habría forma de revalidarla.
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not result.get("success") or not (etag or last_modified):
+            return
+
+        entry = {field: result.get(field) for field in CACHED_FIELDS}
+        entry.update({
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.utcnow().isoformat()
+        })
+        try:
+            self.redis.set(self._key(url), json.dumps(entry), ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar la caché HTTP de {url}: {str(e)}")
+
+_validator_cache: Optional[ValidatorCache] = None
+
+def get_validator_cache() -> Optional[ValidatorCache]:
+    """
+    Retorna la caché de validadores del proceso configurada desde settings
+
+    Returns:
+        Optional[ValidatorCache]: Caché, o None si está deshabilitada
+    """
+    global _validator_cache
+
+    if not HTTP_CACHE_ENABLED:
+        return None
+
+    if _validator_cache is None:
+        _validator_cache = ValidatorCache(
+            redis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True),
+            ttl_seconds=HTTP_CACHE_TTL_DAYS * 24 * 3600
+        )
+    return _validator_cache
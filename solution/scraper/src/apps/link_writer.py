@@ -0,0 +1,130 @@
+import time
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import logging
+
+from ..models import File, Link
+from ..metrics import DB_WRITE_SECONDS
+from ..tracing import start_span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def increment_file_counters(db: Session, file_id: int, processed: int, failed: int) -> Optional[Tuple[int, int]]:
+    """
+    Incrementa los contadores del archivo directamente en la base de datos
+
+    Se usa un UPDATE atómico (total = total + n) para que varias tareas que
+    procesan partes del mismo archivo no se pisen los contadores.
+
+    Returns:
+        Optional[Tuple[int, int]]: Procesadas y fallidas del archivo después del
+            UPDATE (incluyen las de los otros bloques), o None si no hubo cambios
+    """
+    if not processed and not failed:
+        return None
+    row = db.execute(
+        update(File)
+        .where(File.id == file_id)
+        .values(total_processed=File.total_processed + processed, total_failed=File.total_failed + failed)
+        .returning(File.total_processed, File.total_failed)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return (row.total_processed, row.total_failed) if row else None
+
+class LinkBatchWriter:
+    """
+    Acumula registros de la tabla links y los guarda por lotes
+
+    Cada lote se escribe con un único INSERT de múltiples filas (el dialecto
+    psycopg2 de SQLAlchemy 2.0 agrupa el executemany en INSERT ... VALUES
+    (...), (...)) en lugar de un INSERT por fila a través del unit of work del
+    ORM. Los contadores del archivo se actualizan en la misma transacción.
+
+    El lote se guarda al alcanzar `max_rows` filas o cuando pasaron
+    `max_seconds` desde el último guardado, lo que ocurra primero.
+    """
+
+    def __init__(self, db: Session, file_id: int, max_rows: int = 100, max_seconds: float = 5.0,
+                 on_flush: Optional[Callable[[int, int, int], None]] = None):
+        self.db = db
+        self.file_id = file_id
+        self.max_rows = max(1, max_rows)
+        self.max_seconds = max_seconds
+        self.on_flush = on_flush
+        self.rows: List[Dict[str, Any]] = []
+        self.pending_processed = 0
+        self.pending_failed = 0
+        self.written = 0
+        self.processed = 0
+        self.failed = 0
+        # Contadores del archivo según el último guardado (None antes del primero)
+        self.file_totals: Optional[Tuple[int, int]] = None
+        self._last_flush = time.monotonic()
+
+    def add(self, row: Dict[str, Any]):
+        """
+        Agrega un registro al lote y lo guarda si se cumple alguno de los límites
+
+        Args:
+            row (Dict[str, Any]): Columnas del Link (sin file_id)
+        """
+        row["file_id"] = self.file_id
+        self.rows.append(row)
+        if row.get("success"):
+            self.pending_processed += 1
+        else:
+            self.pending_failed += 1
+
+        if len(self.rows) >= self.max_rows or time.monotonic() - self._last_flush >= self.max_seconds:
+            self.flush()
+
+    def flush(self):
+        """Guarda el lote pendiente y los contadores del archivo en una sola transacción"""
+        if not self.rows:
+            return
+
+        start = time.perf_counter()
+        with start_span("db.flush", file_id=self.file_id, rows=len(self.rows)):
+            try:
+                self.db.execute(insert(Link), self.rows)
+                totals = increment_file_counters(self.db, self.file_id, self.pending_processed, self.pending_failed)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+        # Tiempo de escritura repartido entre las URLs del lote
+        per_url = (time.perf_counter() - start) / len(self.rows)
+        for _ in self.rows:
+            DB_WRITE_SECONDS.observe(per_url)
+
+        self.written += len(self.rows)
+        self.file_totals = totals or self.file_totals
+        self.processed += self.pending_processed
+        self.failed += self.pending_failed
+        logger.info(f"Lote de {len(self.rows)} links guardado para el archivo {self.file_id} ({self.written} en total)")
+
+        self.rows = []
+        self.pending_processed = 0
+        self.pending_failed = 0
+        self._last_flush = time.monotonic()
+
+        if self.on_flush:
+            self.on_flush(self.written, self.processed, self.failed)
+
+    def file_counts(self) -> Tuple[int, int]:
+        """
+        Procesadas y fallidas del archivo, incluyendo el lote todavía no guardado
+
+        Después del primer guardado parten de los contadores que devolvió la base
+        de datos, que también incluyen los de los otros bloques del archivo;
+        antes, de los de esta ejecución.
+
+        Returns:
+            Tuple[int, int]: URLs procesadas y fallidas
+        """
+        processed, failed = self.file_totals or (self.processed, self.failed)
+        return processed + self.pending_processed, failed + self.pending_failed
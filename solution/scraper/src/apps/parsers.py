@@ -0,0 +1,665 @@
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+from html.parser import HTMLParser
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+import codecs
+import logging
+import re
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Etiquetas cuyo texto BeautifulSoup no incluye en get_text()
+NON_TEXT_TAGS = ('script', 'style')
+# BeautifulSoup tampoco incluye el texto de ningún descendiente de <template>,
+# aunque find() sí encuentra las etiquetas que contiene
+TEMPLATE_TAG = 'template'
+
+# Mensaje que indica que la página solicitada no existe
+NOT_FOUND_TEXT = "Recurso no encontrado"
+
+def decode_html(content: Union[bytes, str]) -> str:
+    """
+    Decodifica el cuerpo de una respuesta con la misma prioridad que BeautifulSoup
+
+    Se respeta el BOM y el charset declarado en el documento; si no hay, se
+    intenta UTF-8 y finalmente windows-1252. Los backends basados en C reciben
+    el texto ya decodificado para que todos interpreten igual los bytes.
+
+    Args:
+        content (Union[bytes, str]): Cuerpo de la respuesta
+
+    Returns:
+        str: HTML decodificado
+    """
+    if isinstance(content, str):
+        return content
+
+    content, sniffed = EncodingDetector.strip_byte_order_mark(content)
+    declared = EncodingDetector.find_declared_encoding(content, is_html=True)
+    for encoding in (sniffed, declared, 'utf-8'):
+        if not encoding:
+            continue
+        try:
+            return codecs.decode(content, encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return content.decode('windows-1252', errors='replace')
+
+# Etiquetas sin cierre: html.parser (y BeautifulSoup) no las deja abiertas
+VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+))
+
+# Etiquetas que cierran un <p> abierto en libxml2 y lexbor (HTML5) pero no en html.parser
+P_CLOSING_START = re.compile(
+    r'<(?:p|div|h[1-6]|ul|ol|li|dl|dd|dt|table|pre|listing|xmp|plaintext|form|blockquote|section|article'
+    r'|aside|header|footer|nav|main|address|fieldset|figure|figcaption|hr|menu|dir|details|summary'
+    r'|center|hgroup|dialog|search|noframes|head|body|html)[\s/>]',
+    re.IGNORECASE
+)
+DIV_START = re.compile(r'<div\b[^>]*>', re.IGNORECASE)
+CLASS_ATTRIBUTE = re.compile(r'\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+P_START = re.compile(r'<p[\s/>]', re.IGNORECASE)
+P_END = re.compile(r'</p\s*>', re.IGNORECASE)
+
+class _ParagraphDone(Exception):
+    """Corta el recorrido de _HtmlParserParagraph cuando ya se cerró el párrafo"""
+
+class _HtmlParserParagraph(HTMLParser):
+    """
+    Busca el primer <p> de article-content abriendo y cerrando las etiquetas
+    como BeautifulSoup con html.parser: un cierre saca de la pila hasta la
+    última etiqueta con ese nombre, y ninguna apertura cierra un <p>
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[str] = []
+        self.found_div = False
+        self.parts: Optional[List[str]] = None
+        self._div_depth: Optional[int] = None
+        self._paragraph_depth: Optional[int] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if tag == 'div' and not self.found_div and 'article-content' in (dict(attrs).get('class') or '').split():
+            self.found_div = True
+            self._div_depth = len(self.stack)
+        elif tag == 'p' and self._div_depth is not None and self.parts is None:
+            self.parts = []
+            self._paragraph_depth = len(self.stack)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag not in self.stack:
+            return
+        del self.stack[len(self.stack) - 1 - self.stack[::-1].index(tag):]
+        depth = len(self.stack)
+        if self._paragraph_depth is not None and depth < self._paragraph_depth:
+            raise _ParagraphDone()
+        if self._div_depth is not None and depth < self._div_depth:
+            raise _ParagraphDone()
+
+    def handle_data(self, data: str):
+        if (self._paragraph_depth is not None and self.stack[-1] not in NON_TEXT_TAGS
+                and TEMPLATE_TAG not in self.stack and data.strip()):
+            self.parts.append(data.strip())
+
+def nested_article_paragraph(html: str) -> Optional[Tuple[bool, Optional[str]]]:
+    """
+    Primer <p> de article-content tal como lo ve BeautifulSoup, si el de un
+    árbol HTML5 puede ser distinto
+
+    libxml2 y lexbor cierran un <p> abierto al encontrar otro <p> o un bloque
+    (<div>, <ul>...), mientras que html.parser lo deja abierto hasta su </p>.
+    Se revisa el HTML crudo entre el primer <p> de article-content y su
+    primer </p>; solo si ahí aparece una de esas etiquetas se recorre el
+    documento con html.parser (el caso habitual no paga ese recorrido).
+
+    Args:
+        html (str): HTML decodificado
+
+    Returns:
+        Optional[Tuple[bool, Optional[str]]]: (se_encontró_el_div, texto_del_párrafo),
+            o None si el árbol del backend ya da el mismo párrafo
+    """
+    for div in DIV_START.finditer(html):
+        classes = CLASS_ATTRIBUTE.search(div.group(0))
+        if classes and 'article-content' in ''.join(group or '' for group in classes.groups()).split():
+            break
+    else:
+        return None
+    paragraph = P_START.search(html, div.end())
+    if not paragraph:
+        return None
+    paragraph_end = P_END.search(html, paragraph.end())
+    if not P_CLOSING_START.search(html, paragraph.end(), paragraph_end.start() if paragraph_end else len(html)):
+        return None
+
+    parser = _HtmlParserParagraph()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _ParagraphDone:
+        pass
+    if not parser.found_div:
+        return False, None
+    return True, ''.join(parser.parts) if parser.parts is not None else None
+
+class ParsedDocument(NamedTuple):
+    """Árbol de un backend junto con el HTML decodificado del que se obtuvo"""
+    tree: Any
+    html: str
+
+class ParserBackend:
+    """
+    Interfaz de los backends de parseo HTML usados por WebScraper
+
+    Cada backend parsea el documento una sola vez y expone las consultas que
+    necesita la extracción. Todos deben retornar exactamente los mismos valores
+    que la implementación original con BeautifulSoup.
+    """
+
+    name = ""
+
+    def parse(self, content: Union[bytes, str]) -> Any:
+        """Parsea el HTML y retorna el documento propio del backend"""
+        raise NotImplementedError
+
+    def title(self, document: Any) -> Optional[str]:
+        """Texto del primer <title>, sin espacios al inicio ni al final"""
+        raise NotImplementedError
+
+    def time_datetime(self, document: Any) -> Optional[str]:
+        """Valor del atributo datetime del primer <time> que lo tenga"""
+        raise NotImplementedError
+
+    def article_paragraph(self, document: Any) -> Tuple[bool, Optional[str]]:
+        """
+        Busca el primer <p> dentro del primer <div class="article-content">
+
+        Returns:
+            Tuple[bool, Optional[str]]: (se_encontró_el_div, texto_del_párrafo)
+        """
+        raise NotImplementedError
+
+    def meta_description(self, document: Any) -> Optional[str]:
+        """Atributo content del primer <meta name="description">"""
+        raise NotImplementedError
+
+    def text(self, document: Any) -> str:
+        """Texto de todo el documento, sin scripts, estilos ni comentarios"""
+        raise NotImplementedError
+
+    def page_not_found(self, document: Any) -> bool:
+        """Indica si el texto del documento contiene NOT_FOUND_TEXT (sin distinguir mayúsculas)"""
+        return NOT_FOUND_TEXT.lower() in self.text(document).lower()
+
+    def serialize(self, document: Any) -> str:
+        """Serializa el documento parseado a HTML"""
+        raise NotImplementedError
+
+    def incremental(self) -> Optional["IncrementalFeeder"]:
+        """
+        Retorna un parser incremental para detectar, mientras se descarga el
+        cuerpo, que ya se vieron todos los campos; None si el backend no lo soporta
+        """
+        return None
+
+class BeautifulSoupBackend(ParserBackend):
+    """Backend original: BeautifulSoup con el parser html.parser de Python"""
+
+    name = "bs4"
+
+    def parse(self, content: Union[bytes, str]) -> BeautifulSoup:
+        return BeautifulSoup(content, 'html.parser')
+
+    def title(self, document: BeautifulSoup) -> Optional[str]:
+        title_tag = document.find('title')
+        return title_tag.text.strip() if title_tag else None
+
+    def time_datetime(self, document: BeautifulSoup) -> Optional[str]:
+        time_tag = document.find('time', attrs={'datetime': True})
+        return time_tag.get('datetime') if time_tag else None
+
+    def article_paragraph(self, document: BeautifulSoup) -> Tuple[bool, Optional[str]]:
+        article_content_div = document.find('div', class_='article-content')
+        if not article_content_div:
+            return False, None
+        first_paragraph = article_content_div.find('p')
+        return True, first_paragraph.get_text(strip=True) if first_paragraph else None
+
+    def meta_description(self, document: BeautifulSoup) -> Optional[str]:
+        meta_desc = document.find('meta', attrs={'name': 'description'})
+        return meta_desc.get('content') if meta_desc else None
+
+    def text(self, document: BeautifulSoup) -> str:
+        return document.get_text()
+
+    def serialize(self, document: BeautifulSoup) -> str:
+        return str(document)
+
+# Nodos de texto que BeautifulSoup incluye en get_text()
+LXML_TEXT_XPATH = './/text()[not(parent::script) and not(parent::style) and not(ancestor::template)]'
+
+class LxmlBackend(ParserBackend):
+    """Backend basado en lxml.html (libxml2)"""
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._html = lxml.html
+
+    def parse(self, content: Union[bytes, str]) -> ParsedDocument:
+        html = decode_html(content)
+        try:
+            tree = self._html.document_fromstring(html)
+        except self._html.etree.ParserError:
+            # Cuerpo vacío (o solo comentarios): BeautifulSoup lo parsea como un documento sin contenido
+            tree = self._html.Element('html')
+        return ParsedDocument(tree, html)
+
+    @staticmethod
+    def _stripped_text(element) -> str:
+        # Equivalente a get_text(strip=True) de BeautifulSoup
+        return ''.join(
+            text.strip()
+            for text in element.xpath(LXML_TEXT_XPATH)
+            if text.strip()
+        )
+
+    def title(self, document) -> Optional[str]:
+        titles = document.tree.xpath('//title')
+        return ''.join(titles[0].xpath(LXML_TEXT_XPATH)).strip() if titles else None
+
+    def time_datetime(self, document) -> Optional[str]:
+        times = document.tree.xpath('//time[@datetime]')
+        return times[0].get('datetime') if times else None
+
+    def article_paragraph(self, document) -> Tuple[bool, Optional[str]]:
+        divs = document.tree.xpath('//div[contains(concat(" ", normalize-space(@class), " "), " article-content ")]')
+        if not divs:
+            return False, None
+        paragraphs = divs[0].xpath('.//p')
+        if not paragraphs:
+            return True, None
+        return nested_article_paragraph(document.html) or (True, self._stripped_text(paragraphs[0]))
+
+    def meta_description(self, document) -> Optional[str]:
+        metas = document.tree.xpath('//meta[@name="description"]')
+        return metas[0].get('content') if metas else None
+
+    def text(self, document) -> str:
+        return ''.join(document.tree.xpath(LXML_TEXT_XPATH))
+
+    def serialize(self, document) -> str:
+        return self._html.tostring(document.tree, encoding='unicode')
+
+class SelectolaxBackend(ParserBackend):
+    """
+    Backend basado en selectolax (motor lexbor)
+
+    lexbor deja el contenido de <template> fuera del árbol: su texto no se
+    incluye, como en BeautifulSoup, pero las etiquetas que contiene tampoco se
+    encuentran. Si una página tiene el <title> o el primer <p> de
+    article-content dentro de un <template>, BeautifulSoup los toma (con
+    texto vacío) y este backend toma los siguientes.
+    """
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, content: Union[bytes, str]) -> ParsedDocument:
+        html = decode_html(content)
+        return ParsedDocument(self._parser(html), html)
+
+    @staticmethod
+    def _text_nodes(node):
+        for child in node.traverse(include_text=True):
+            if child.tag == '-text' and child.parent is not None and child.parent.tag not in NON_TEXT_TAGS:
+                yield child.text_content or ''
+
+    def title(self, document) -> Optional[str]:
+        title_tag = document.tree.css_first('title')
+        return title_tag.text().strip() if title_tag else None
+
+    def time_datetime(self, document) -> Optional[str]:
+        time_tag = document.tree.css_first('time[datetime]')
+        return time_tag.attributes.get('datetime') if time_tag else None
+
+    def article_paragraph(self, document) -> Tuple[bool, Optional[str]]:
+        article_content_div = document.tree.css_first('div.article-content')
+        if not article_content_div:
+            return False, None
+        first_paragraph = article_content_div.css_first('p')
+        if not first_paragraph:
+            return True, None
+        return nested_article_paragraph(document.html) or (
+            True, ''.join(text.strip() for text in self._text_nodes(first_paragraph) if text.strip())
+        )
+
+    def meta_description(self, document) -> Optional[str]:
+        meta_desc = document.tree.css_first('meta[name="description"]')
+        return meta_desc.attributes.get('content') if meta_desc else None
+
+    def text(self, document) -> str:
+        return ''.join(self._text_nodes(document.tree.root)) if document.tree.root else ''
+
+    def serialize(self, document) -> str:
+        return document.tree.html or ''
+
+class SinglePassDocument:
+    """Campos extraídos por SinglePassBackend en una sola pasada"""
+
+    def __init__(self, html: str, track_text: bool, watch_not_found: bool = False):
+        self.html = html
+        self.title: Optional[str] = None
+        self.time_datetime: Optional[str] = None
+        self.meta_description: Optional[str] = None
+        self.article_found = False
+        self.article_paragraph: Optional[str] = None
+        self.text_parts: Optional[List[str]] = [] if track_text else None
+        self._stack: List[str] = []
+        self._title_parts: Optional[List[str]] = None
+        self._time_done = False
+        self._meta_done = False
+        self._article_depth: Optional[int] = None
+        self._paragraph_depth: Optional[int] = None
+        self._paragraph_parts: Optional[List[str]] = None
+        self._pending_text: List[str] = []
+        self._template_depth = 0
+        # Sin acumular el texto, solo se conserva el final necesario para ver
+        # NOT_FOUND_TEXT aunque quede partido entre dos nodos de texto
+        self.not_found = False
+        self._not_found_tail: Optional[str] = '' if watch_not_found else None
+
+    @property
+    def complete(self) -> bool:
+        """True cuando ya no queda nada por buscar en el resto del documento"""
+        return (
+            self.text_parts is None
+            and self.title is not None
+            and self._time_done
+            and self._meta_done
+            and self.article_found
+            and self._article_depth is None
+        )
+
+    # Interfaz "target" del parser de lxml: recibe los eventos sin construir el árbol
+    def start(self, tag: str, attrib: Dict[str, str]):
+        self._flush_text()
+        self._stack.append(tag)
+        if tag == TEMPLATE_TAG:
+            self._template_depth += 1
+        if tag == 'title' and self.title is None and self._title_parts is None:
+            self._title_parts = []
+        elif tag == 'time' and not self._time_done and 'datetime' in attrib:
+            self.time_datetime = attrib['datetime']
+            self._time_done = True
+        elif tag == 'meta' and not self._meta_done and attrib.get('name') == 'description':
+            self.meta_description = attrib.get('content')
+            self._meta_done = True
+        elif tag == 'div' and not self.article_found and 'article-content' in (attrib.get('class') or '').split():
+            self.article_found = True
+            self._article_depth = len(self._stack)
+        elif tag == 'p' and self._article_depth is not None and self._paragraph_parts is None:
+            self._paragraph_parts = []
+            self._paragraph_depth = len(self._stack)
+
+    def end(self, tag: str):
+        self._flush_text()
+        depth = len(self._stack)
+        if self._title_parts is not None and tag == 'title':
+            self.title = ''.join(self._title_parts).strip()
+            self._title_parts = None
+        if self._paragraph_depth == depth:
+            self.article_paragraph = ''.join(self._paragraph_parts)
+            self._paragraph_depth = None
+            self._article_depth = None
+        elif self._article_depth == depth:
+            self._article_depth = None
+        if self._stack.pop() == TEMPLATE_TAG:
+            self._template_depth -= 1
+
+    def data(self, data: str):
+        # libxml2 entrega un mismo nodo de texto en varios fragmentos (por ejemplo
+        # alrededor de cada entidad); se unen antes de procesarlo como un nodo
+        self._pending_text.append(data)
+
+    def _flush_text(self):
+        if not self._pending_text:
+            return
+        text = ''.join(self._pending_text)
+        self._pending_text = []
+        if self._template_depth or (self._stack and self._stack[-1] in NON_TEXT_TAGS):
+            return
+        if self._title_parts is not None:
+            self._title_parts.append(text)
+        if self._paragraph_depth is not None and text.strip():
+            self._paragraph_parts.append(text.strip())
+        if self.text_parts is not None:
+            self.text_parts.append(text)
+        if self._not_found_tail is not None and not self.not_found:
+            window = self._not_found_tail + text.lower()
+            self.not_found = NOT_FOUND_TEXT.lower() in window
+            self._not_found_tail = window[-(len(NOT_FOUND_TEXT) - 1):]
+
+    def close(self) -> "SinglePassDocument":
+        self._flush_text()
+        return self
+
+class SinglePassBackend(ParserBackend):
+    """
+    Extracción en una sola pasada sin construir el árbol del documento
+
+    Usa el parser HTML de lxml (libxml2) en modo "target": los campos se
+    capturan a medida que llegan los eventos de apertura, cierre y texto.
+    Antes de parsear se busca el mensaje de página no encontrada sobre el
+    texto crudo; si no aparece (el caso habitual) no se acumula el texto del
+    documento y el parseo se detiene en cuanto se encontraron todos los campos.
+    """
+
+    name = "single_pass"
+    feed_size = 16 * 1024
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    @staticmethod
+    def _may_contain_not_found(html: str) -> bool:
+        # Las palabras del mensaje pueden estar separadas por etiquetas, por lo que se
+        # busca la última palabra; con referencias numéricas (&#...;) no se puede descartar
+        lowered = html.lower()
+        return NOT_FOUND_TEXT.split()[-1].lower() in lowered or '&#' in lowered
+
+    def parse(self, content: Union[bytes, str]) -> SinglePassDocument:
+        html = decode_html(content)
+        document = SinglePassDocument(html, track_text=self._may_contain_not_found(html))
+        if not html.strip():
+            return document
+
+        parser = self._etree.HTMLParser(target=document)
+        for position in range(0, len(html), self.feed_size):
+            parser.feed(html[position:position + self.feed_size])
+            if document.complete:
+                return document
+        parser.close()
+        return document
+
+    def title(self, document: SinglePassDocument) -> Optional[str]:
+        return document.title
+
+    def time_datetime(self, document: SinglePassDocument) -> Optional[str]:
+        return document.time_datetime
+
+    def article_paragraph(self, document: SinglePassDocument) -> Tuple[bool, Optional[str]]:
+        if document.article_paragraph is None:
+            return document.article_found, None
+        return nested_article_paragraph(document.html) or (True, document.article_paragraph)
+
+    def meta_description(self, document: SinglePassDocument) -> Optional[str]:
+        return document.meta_description
+
+    def text(self, document: SinglePassDocument) -> str:
+        return ''.join(document.text_parts or [])
+
+    def page_not_found(self, document: SinglePassDocument) -> bool:
+        if document.text_parts is None:
+            return False
+        return super().page_not_found(document)
+
+    def serialize(self, document: SinglePassDocument) -> str:
+        return document.html
+
+    def incremental(self) -> "IncrementalFeeder":
+        return IncrementalFeeder(self._etree)
+
+class IncrementalFeeder:
+    """
+    Parser incremental de los fragmentos de una descarga en curso
+
+    Recibe los bytes a medida que llegan y reporta cuando el título, la fecha,
+    el párrafo de article-content y la meta descripción ya aparecieron. Sigue
+    revisando el texto del resto de los fragmentos en busca de NOT_FOUND_TEXT,
+    que puede aparecer en cualquier parte de la página. La codificación se
+    decide con el primer fragmento (BOM, charset declarado o UTF-8); si luego
+    los bytes no son válidos en esa codificación el feeder se desactiva y la
+    descarga continúa completa.
+    """
+
+    def __init__(self, etree):
+        self._etree = etree
+        self._decoder = None
+        self._parser = None
+        self.document = SinglePassDocument("", track_text=False, watch_not_found=True)
+        self.disabled = False
+
+    @property
+    def not_found(self) -> bool:
+        """True si el texto recibido hasta ahora contiene NOT_FOUND_TEXT"""
+        return self.document.not_found
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Alimenta el parser con un fragmento del cuerpo
+
+        Returns:
+            bool: True si ya se vieron todos los campos y el resto del cuerpo
+                solo hace falta para buscar NOT_FOUND_TEXT
+        """
+        if self.disabled or not chunk:
+            return False
+        try:
+            if self._decoder is None:
+                chunk, sniffed = EncodingDetector.strip_byte_order_mark(chunk)
+                encoding = sniffed or EncodingDetector.find_declared_encoding(chunk, is_html=True) or 'utf-8'
+                self._decoder = codecs.getincrementaldecoder(encoding)()
+                self._parser = self._etree.HTMLParser(target=self.document)
+            try:
+                text = self._decoder.decode(chunk)
+            except UnicodeDecodeError:
+                if not self.document.complete:
+                    raise
+                # Los campos ya están extraídos; para buscar el mensaje alcanza con reemplazar los bytes inválidos
+                self._decoder.errors = 'replace'
+                text = self._decoder.decode(chunk)
+            if text:
+                self._parser.feed(text)
+        except (UnicodeDecodeError, LookupError, self._etree.Error):
+            self.disabled = True
+            return False
+        return self.document.complete
+
+    def close(self):
+        """Procesa el texto pendiente al terminar el cuerpo"""
+        if self.disabled or self._parser is None:
+            return
+        try:
+            text = self._decoder.decode(b"", final=True)
+            if text:
+                self._parser.feed(text)
+            self._parser.close()
+        except (UnicodeDecodeError, self._etree.Error):
+            self.disabled = True
+
+class LazyHtml:
+    """
+    Vista del HTML de una página que se serializa solo cuando se usa
+
+    Conserva el documento parseado y lo serializa con el backend la primera
+    vez que se convierte a texto; si nadie lo lee, no se paga la serialización.
+    """
+
+    def __init__(self, backend: ParserBackend, document: Any):
+        self._backend = backend
+        self._document = document
+        self._html: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._html is None:
+            self._html = self._backend.serialize(self._document)
+            self._document = None
+        return self._html
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyHtml):
+            other = str(other)
+        return str(self) == other
+
+    def __repr__(self) -> str:
+        state = "serializado" if self._html is not None else "pendiente"
+        return f"<LazyHtml {state}>"
+
+PARSER_BACKENDS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+    SinglePassBackend.name: SinglePassBackend,
+}
+
+_backends: Dict[str, ParserBackend] = {}
+
+def get_parser(name: Optional[str] = None) -> ParserBackend:
+    """
+    Retorna el backend de parseo configurado (una instancia por proceso)
+
+    Si la librería del backend no está instalada se usa BeautifulSoup.
+
+    Args:
+        name (str, optional): Nombre del backend; por defecto HTML_PARSER_BACKEND
+
+    Returns:
+        ParserBackend: Backend de parseo
+    """
+    if name is None:
+        from ..settings import HTML_PARSER_BACKEND
+        name = HTML_PARSER_BACKEND
+
+    if name not in _backends:
+        backend_class = PARSER_BACKENDS.get(name)
+        if backend_class is None:
+            logger.warning(f"Backend de parseo desconocido '{name}', se usa {BeautifulSoupBackend.name}")
+            backend_class = BeautifulSoupBackend
+        try:
+            _backends[name] = backend_class()
+        except ImportError as e:
+            logger.warning(f"No se pudo cargar el backend de parseo '{name}' ({str(e)}), se usa {BeautifulSoupBackend.name}")
+            _backends[name] = BeautifulSoupBackend()
+    return _backends[name]
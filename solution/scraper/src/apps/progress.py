@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+import logging
+
+import redis
+
+from ..settings import REDIS_HOST, REDIS_PORT, PROGRESS_INTERVAL_SECONDS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Estados del archivo con los que termina el stream de progreso
+FINAL_STATUSES = ("PROCESSED", "ERROR")
+
+# Eventos pendientes por cliente del stream; si un cliente no los consume se descartan los más viejos
+SUBSCRIBER_QUEUE_SIZE = 100
+
+def progress_channel(file_id: int) -> str:
+    """Canal de Redis con los eventos de progreso de un archivo"""
+    return f"file_progress:{file_id}"
+
+def progress_event(file_id: int, status: str, total: Optional[int] = None, processed: int = 0,
+                   failed: int = 0, **data) -> Dict[str, Any]:
+    """
+    Evento de progreso de un archivo, con el mismo formato para los publicados
+    por los workers y para el estado inicial que envía la API
+
+    Args:
+        file_id (int): ID del archivo
+        status (str): Estado del archivo (PROCESSING, PROCESSED, ERROR...)
+        total (int, optional): Total de URLs del archivo
+        processed (int): URLs procesadas
+        failed (int): URLs fallidas
+        **data: Campos adicionales (error, chunks...)
+
+    Returns:
+        Dict[str, Any]: Evento
+    """
+    current = processed + failed
+    return {
+        "file_id": file_id,
+        "status": status,
+        "total": total,
+        "current": current,
+        "processed": processed,
+        "failed": failed,
+        "progress": min(100, int(current * 100 / total)) if total else 0,
+        "timestamp": datetime.utcnow().isoformat(),
+        **data,
+    }
+
+class ProgressPublisher:
+    """
+    Publica el progreso de un archivo en Redis (pub/sub) para el stream de la API
+
+    Los eventos de avance se limitan a uno cada `min_interval` segundos por
+    tarea, sin importar cuántas URLs se procesen; los de inicio y fin se
+    publican siempre. PUBLISH no guarda nada en Redis si no hay clientes
+    escuchando, y sus errores solo se registran: el progreso nunca detiene el
+    procesamiento.
+    """
+
+    def __init__(self, client: redis.Redis, file_id: int, total: Optional[int] = None,
+                 min_interval: float = PROGRESS_INTERVAL_SECONDS):
+        self.client = client
+        self.file_id = file_id
+        self.total = total
+        self.min_interval = min_interval
+        self._last_report: Optional[float] = None
+
+    def publish(self, status: str, processed: int = 0, failed: int = 0, **data) -> bool:
+        """
+        Publica un evento del archivo
+
+        Returns:
+            bool: True si se publicó
+        """
+        try:
+            event = progress_event(self.file_id, status, self.total, processed, failed, **data)
+            self.client.publish(progress_channel(self.file_id), json.dumps(event))
+            return True
+        except (redis.RedisError, TypeError, ValueError) as e:
+            logger.warning(f"No se pudo publicar el progreso del archivo {self.file_id}: {str(e)}")
+            return False
+
+    def report(self, processed: int, failed: int):
+        """Publica el avance del archivo si pasaron min_interval segundos desde el anterior"""
+        now = time.monotonic()
+        if self._last_report is not None and now - self._last_report < self.min_interval:
+            return
+        self._last_report = now
+        self.publish("PROCESSING", processed, failed)
+
+_redis_client: Optional[redis.Redis] = None
+
+def get_progress_publisher(file_id: int, total: Optional[int] = None) -> ProgressPublisher:
+    """Retorna un publicador de progreso del archivo usando el cliente Redis del proceso"""
+    global _redis_client
+
+    if _redis_client is None:
+        _redis_client = redis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True)
+    return ProgressPublisher(_redis_client, file_id, total)
+
+class ProgressBroker:
+    """
+    Reparte los eventos de progreso de Redis entre los clientes del stream
+
+    Cada proceso de la API mantiene una sola conexión pub/sub, suscrita solo a
+    los canales de los archivos que algún cliente está mirando: la cantidad de
+    clientes no cambia la carga sobre Redis. Una tarea de fondo lee los
+    mensajes y los copia en la cola de cada cliente del archivo.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any]):
+        self.client_factory = client_factory
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._client = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _reset_for_loop(self):
+        """Recrea la conexión si cambió el event loop (los objetos asyncio son de un solo loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._queues = {}
+            self._client = self._pubsub = self._reader = None
+
+    @asynccontextmanager
+    async def subscribe(self, file_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Suscribe un cliente a los eventos de un archivo mientras dure el contexto
+
+        Args:
+            file_id (int): ID del archivo
+
+        Yields:
+            asyncio.Queue: Cola con los eventos (dict) del archivo
+        """
+        self._reset_for_loop()
+        channel = progress_channel(file_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        async with self._lock:
+            if self._pubsub is None:
+                self._client = self.client_factory()
+                self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            if channel not in self._queues:
+                await self._pubsub.subscribe(channel)
+                self._queues[channel] = set()
+            self._queues[channel].add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                queues = self._queues.get(channel, set())
+                queues.discard(queue)
+                if not queues and channel in self._queues:
+                    del self._queues[channel]
+                    try:
+                        await self._pubsub.unsubscribe(channel)
+                    except Exception as e:
+                        logger.warning(f"No se pudo cancelar la suscripción a {channel}: {str(e)}")
+
+    def subscribers(self, file_id: int) -> int:
+        """Clientes del proceso que están mirando un archivo"""
+        return len(self._queues.get(progress_channel(file_id), ()))
+
+    async def _read(self):
+        """Lee los mensajes de Redis y los entrega a las colas de cada canal"""
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # El cliente de Redis vuelve a suscribir los canales al reconectar
+                logger.warning(f"Error leyendo los eventos de progreso de Redis: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            try:
+                event = json.loads(message["data"])
+            except ValueError:
+                continue
+            for queue in list(self._queues.get(message["channel"], ())):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def close(self):
+        """Detiene la lectura y cierra la conexión pub/sub"""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = self._pubsub = self._reader = None
+        self._queues = {}
@@ -0,0 +1,324 @@
+import asyncio
+import time
+import uuid
+import redis
+import redis.asyncio as aioredis
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+
+from ..settings import (
+    REDIS_HOST, REDIS_PORT, RATE_LIMIT_ENABLED, RATE_LIMIT_DEFAULT_RATE,
+    RATE_LIMIT_DEFAULT_BURST, RATE_LIMIT_DEFAULT_CONCURRENCY, RATE_LIMIT_HOSTS
+)
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Token bucket atómico. Usa el reloj de Redis para que todos los workers
+# compartan la misma referencia de tiempo.
+# KEYS[1]: clave del bucket; ARGV[1]: tokens por segundo; ARGV[2]: ráfaga máxima
+# Retorna los segundos a esperar (0 si se concedió el token)
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+# Slots de concurrencia con expiración, para que un worker caído no retenga
+# su slot para siempre.
+# KEYS[1]: sorted set de slots; ARGV[1]: límite; ARGV[2]: token; ARGV[3]: ttl
+# Retorna 1 si se obtuvo el slot, 0 en caso contrario
+ACQUIRE_SLOT_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+    return 1
+end
+return 0
+"""
+
+@dataclass
+class HostLimit:
+    """Límites aplicados a un host"""
+    rate: float
+    burst: int
+    max_concurrent: int = 0
+
+def parse_host_limits(spec: str, default: HostLimit) -> Dict[str, HostLimit]:
+    """
+    Interpreta la configuración de límites por host
+
+    Args:
+        spec (str): Texto con el formato "host=rate:burst:concurrency,host2=rate".
+            Los valores omitidos toman el valor por defecto.
+        default (HostLimit): Límites por defecto
+
+    Returns:
+        Dict[str, HostLimit]: Límites por host
+    """
+    limits = {}
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry or '=' not in entry:
+            continue
+        host, values = entry.split('=', 1)
+        parts = values.split(':')
+        limits[host.strip().lower()] = HostLimit(
+            rate=float(parts[0]) if len(parts) > 0 and parts[0] else default.rate,
+            burst=int(parts[1]) if len(parts) > 1 and parts[1] else default.burst,
+            max_concurrent=int(parts[2]) if len(parts) > 2 and parts[2] else default.max_concurrent
+        )
+    return limits
+
+class HostRateLimiter:
+    """
+    Limitador de peticiones por host compartido entre todos los workers
+
+    Combina un token bucket (peticiones por segundo) con slots de concurrencia
+    (peticiones simultáneas), ambos almacenados en Redis. Si Redis no está
+    disponible el limitador deja pasar las peticiones para no detener el scraping.
+
+    limit_async usa un cliente de redis.asyncio creado con async_client_factory
+    para no bloquear el event loop con llamadas síncronas a Redis; sin factory,
+    las llamadas síncronas se hacen en un thread aparte.
+    """
+
+    KEY_PREFIX = "scraper:ratelimit"
+
+    def __init__(self, redis_client: redis.Redis, default: HostLimit,
+                 host_limits: Optional[Dict[str, HostLimit]] = None,
+                 slot_ttl: int = 60, poll_interval: float = 0.05,
+                 async_client_factory: Optional[Callable[[], Any]] = None):
+        self.redis = redis_client
+        self.default = default
+        self.host_limits = host_limits or {}
+        self.slot_ttl = slot_ttl
+        self.poll_interval = poll_interval
+        self.async_client_factory = async_client_factory
+        self._token_bucket = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._acquire_slot_script = self.redis.register_script(ACQUIRE_SLOT_SCRIPT)
+        self._async_client = None
+        self._async_scripts: Optional[Tuple[Any, Any]] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bucket_key(self, host: str) -> str:
+        """Clave del token bucket del host"""
+        return f"{self.KEY_PREFIX}:{host.lower()}:bucket"
+
+    def _slots_key(self, host: str) -> str:
+        """Clave del sorted set de slots del host"""
+        return f"{self.KEY_PREFIX}:{host.lower()}:slots"
+
+    def _async_redis(self) -> Tuple[Any, Any, Any]:
+        """
+        Cliente asíncrono y scripts para el event loop en ejecución
+
+        Un cliente de redis.asyncio solo puede usarse desde el loop en el que
+        abrió sus conexiones, por lo que si cambió el loop se crea uno nuevo.
+
+        Returns:
+            Tuple: Cliente, script del token bucket y script de slots
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = self.async_client_factory()
+            self._async_scripts = (
+                self._async_client.register_script(TOKEN_BUCKET_SCRIPT),
+                self._async_client.register_script(ACQUIRE_SLOT_SCRIPT)
+            )
+            self._async_loop = loop
+        return (self._async_client,) + self._async_scripts
+
+    def get_limit(self, host: str) -> HostLimit:
+        """Retorna los límites configurados para un host"""
+        return self.host_limits.get(host.lower(), self.default)
+
+    def acquire(self, host: str) -> float:
+        """
+        Intenta consumir un token del bucket del host sin bloquear
+
+        Returns:
+            float: Segundos a esperar antes de reintentar (0 si se concedió)
+        """
+        limit = self.get_limit(host)
+        if limit.rate <= 0:
+            return 0.0
+        try:
+            wait = self._token_bucket(
+                keys=[self._bucket_key(host)],
+                args=[limit.rate, limit.burst]
+            )
+            return float(wait)
+        except redis.RedisError as e:
+            logger.warning(f"Limitador no disponible para {host}, se continúa sin límite: {str(e)}")
+            return 0.0
+
+    def acquire_slot(self, host: str, token: str) -> bool:
+        """
+        Intenta ocupar un slot de concurrencia del host sin bloquear
+
+        Returns:
+            bool: True si se obtuvo el slot
+        """
+        limit = self.get_limit(host)
+        if limit.max_concurrent <= 0:
+            return True
+        try:
+            return bool(self._acquire_slot_script(
+                keys=[self._slots_key(host)],
+                args=[limit.max_concurrent, token, self.slot_ttl]
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Limitador no disponible para {host}, se continúa sin límite: {str(e)}")
+            return True
+
+    def release_slot(self, host: str, token: str):
+        """Libera un slot de concurrencia del host"""
+        if self.get_limit(host).max_concurrent <= 0:
+            return
+        try:
+            self.redis.zrem(self._slots_key(host), token)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo liberar el slot de {host}: {str(e)}")
+
+    async def acquire_async(self, host: str) -> float:
+        """Versión asíncrona de acquire"""
+        limit = self.get_limit(host)
+        if limit.rate <= 0:
+            return 0.0
+        if self.async_client_factory is None:
+            return await asyncio.to_thread(self.acquire, host)
+        try:
+            _, token_bucket, _ = self._async_redis()
+            wait = await token_bucket(keys=[self._bucket_key(host)], args=[limit.rate, limit.burst])
+            return float(wait)
+        except redis.RedisError as e:
+            logger.warning(f"Limitador no disponible para {host}, se continúa sin límite: {str(e)}")
+            return 0.0
+
+    async def acquire_slot_async(self, host: str, token: str) -> bool:
+        """Versión asíncrona de acquire_slot"""
+        limit = self.get_limit(host)
+        if limit.max_concurrent <= 0:
+            return True
+        if self.async_client_factory is None:
+            return await asyncio.to_thread(self.acquire_slot, host, token)
+        try:
+            _, _, acquire_slot_script = self._async_redis()
+            return bool(await acquire_slot_script(
+                keys=[self._slots_key(host)],
+                args=[limit.max_concurrent, token, self.slot_ttl]
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Limitador no disponible para {host}, se continúa sin límite: {str(e)}")
+            return True
+
+    async def release_slot_async(self, host: str, token: str):
+        """Versión asíncrona de release_slot"""
+        if self.get_limit(host).max_concurrent <= 0:
+            return
+        if self.async_client_factory is None:
+            await asyncio.to_thread(self.release_slot, host, token)
+            return
+        try:
+            client, _, _ = self._async_redis()
+            await client.zrem(self._slots_key(host), token)
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo liberar el slot de {host}: {str(e)}")
+
+    def wait(self, host: str):
+        """Bloquea hasta que el host admite una nueva petición"""
+        while True:
+            delay = self.acquire(host)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    async def wait_async(self, host: str):
+        """Versión asíncrona de wait: cede el event loop mientras espera"""
+        while True:
+            delay = await self.acquire_async(host)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    @contextmanager
+    def limit(self, url: str):
+        """
+        Contexto que envuelve una petición HTTP respetando los límites del host
+
+        Args:
+            url (str): URL que se va a descargar
+        """
+        host = urlsplit(url).hostname or ""
+        token = uuid.uuid4().hex
+        while not self.acquire_slot(host, token):
+            time.sleep(self.poll_interval)
+        try:
+            self.wait(host)
+            yield
+        finally:
+            self.release_slot(host, token)
+
+    @asynccontextmanager
+    async def limit_async(self, url: str):
+        """Versión asíncrona de limit"""
+        host = urlsplit(url).hostname or ""
+        token = uuid.uuid4().hex
+        while not await self.acquire_slot_async(host, token):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            await self.wait_async(host)
+            yield
+        finally:
+            await self.release_slot_async(host, token)
+
+_rate_limiter: Optional[HostRateLimiter] = None
+
+def get_rate_limiter() -> Optional[HostRateLimiter]:
+    """
+    Retorna el limitador del proceso configurado desde settings
+
+    Returns:
+        Optional[HostRateLimiter]: Limitador, o None si está deshabilitado
+    """
+    global _rate_limiter
+    if not RATE_LIMIT_ENABLED:
+        return None
+
+    if _rate_limiter is None:
+        default = HostLimit(
+            rate=RATE_LIMIT_DEFAULT_RATE,
+            burst=RATE_LIMIT_DEFAULT_BURST,
+            max_concurrent=RATE_LIMIT_DEFAULT_CONCURRENCY
+        )
+        _rate_limiter = HostRateLimiter(
+            redis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True),
+            default=default,
+            host_limits=parse_host_limits(RATE_LIMIT_HOSTS, default),
+            async_client_factory=lambda: aioredis.Redis(
+                host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True
+            )
+        )
+    return _rate_limiter
@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+import logging
+
+from ..metrics import RESILIENCE_EVENTS
+from ..settings import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    CIRCUIT_BREAKER_ENABLED, CIRCUIT_WINDOW, CIRCUIT_MIN_REQUESTS, CIRCUIT_FAILURE_RATIO, CIRCUIT_OPEN_SECONDS
+)
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP que indican un fallo transitorio del servidor
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class ResilienceCounters:
+    """
+    Contadores de reintentos y del circuit breaker del proceso
+
+    Las claves tienen la forma "evento.detalle", por ejemplo "retry.http_503",
+    "retry.network", "circuit.opened" o "circuit.rejected". Con `metric`
+    cada evento también se cuenta en Prometheus con la etiqueta "event".
+    """
+
+    def __init__(self, metric=None):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self.metric = metric
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+        if self.metric is not None:
+            self.metric.labels(name).inc(amount)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copia de los contadores actuales"""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+resilience_counters = ResilienceCounters(RESILIENCE_EVENTS)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Convierte el header Retry-After (segundos o fecha HTTP) en segundos de espera
+
+    Returns:
+        Optional[float]: Segundos a esperar, o None si el header no existe o es inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+@dataclass
+class RetryPolicy:
+    """
+    Reintentos con backoff exponencial y jitter para fallos transitorios
+
+    Se reintentan los errores de conexión, los timeouts y las respuestas
+    RETRY_STATUSES. La espera antes del intento n (desde 0) es un valor
+    aleatorio entre 0 y min(max_delay, base_delay * 2^n) ("full jitter"), o el
+    Retry-After del servidor si lo envía, también limitado por max_delay.
+
+    Attributes:
+        max_attempts (int): Intentos totales por URL (1 = sin reintentos)
+        base_delay (float): Segundos base del backoff
+        max_delay (float): Segundos máximos de espera entre intentos
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def should_retry(self, attempt: int) -> bool:
+        """Indica si queda otro intento después del intento `attempt` (desde 0)"""
+        return attempt + 1 < self.max_attempts
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Segundos a esperar antes del siguiente intento"""
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(self.max_delay, server_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+@dataclass
+class _HostCircuit:
+    """Estado del circuito de un host"""
+    outcomes: Deque[bool]
+    state: str = "closed"
+    opened_at: float = 0.0
+    probing: bool = False
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host basado en la tasa de errores reciente
+
+    Con al menos `min_requests` resultados entre los últimos `window_size` y
+    una proporción de fallos transitorios >= `failure_ratio`, el circuito del
+    host se abre: durante `open_seconds` las URLs de ese host fallan de
+    inmediato sin hacer la petición. Luego se deja pasar una única petición de
+    prueba (semiabierto); si funciona el circuito se cierra y si falla se
+    vuelve a abrir. El estado es local a cada proceso worker.
+    """
+
+    def __init__(self, window_size: int = 20, min_requests: int = 5, failure_ratio: float = 0.5,
+                 open_seconds: float = 30.0, counters: ResilienceCounters = resilience_counters):
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostCircuit] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def _circuit(self, host: str) -> _HostCircuit:
+        circuit = self._hosts.get(host)
+        if circuit is None:
+            circuit = _HostCircuit(outcomes=deque(maxlen=self.window_size))
+            self._hosts[host] = circuit
+        return circuit
+
+    def allow(self, url: str) -> bool:
+        """
+        Indica si se puede hacer una petición al host de la URL
+
+        Returns:
+            bool: False si el circuito está abierto (la URL debe fallar de inmediato)
+        """
+        host = self.host(url)
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "open":
+                if time.monotonic() - circuit.opened_at < self.open_seconds:
+                    self.counters.increment("circuit.rejected")
+                    return False
+                circuit.state = "half_open"
+                circuit.probing = False
+            if circuit.state == "half_open":
+                # Solo una petición de prueba a la vez
+                if circuit.probing:
+                    self.counters.increment("circuit.rejected")
+                    return False
+                circuit.probing = True
+            return True
+
+    def record(self, url: str, failed: bool):
+        """
+        Registra el resultado de una petición al host
+
+        Args:
+            url (str): URL solicitada
+            failed (bool): True si fue un fallo transitorio (red, timeout, 5xx, 429)
+        """
+        host = self.host(url)
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "half_open":
+                circuit.probing = False
+                if failed:
+                    self._open(host, circuit)
+                else:
+                    circuit.state = "closed"
+                    circuit.outcomes.clear()
+                    logger.info(f"Circuito cerrado para el host {host}")
+                return
+
+            circuit.outcomes.append(failed)
+            failures = sum(circuit.outcomes)
+            if (circuit.state == "closed" and len(circuit.outcomes) >= self.min_requests
+                    and failures / len(circuit.outcomes) >= self.failure_ratio):
+                self._open(host, circuit)
+
+    def _open(self, host: str, circuit: _HostCircuit):
+        circuit.state = "open"
+        circuit.opened_at = time.monotonic()
+        circuit.outcomes.clear()
+        self.counters.increment("circuit.opened")
+        logger.warning(f"Circuito abierto para el host {host} durante {self.open_seconds} s por exceso de errores")
+
+    def state(self, url: str) -> str:
+        """Estado del circuito del host: closed, open o half_open"""
+        with self._lock:
+            return self._circuit(self.host(url)).state
+
+_retry_policy: Optional[RetryPolicy] = None
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+def get_retry_policy() -> Optional[RetryPolicy]:
+    """
+    Retorna la política de reintentos configurada en settings
+
+    Returns:
+        Optional[RetryPolicy]: Política, o None si RETRY_MAX_ATTEMPTS es 1 o menos
+    """
+    global _retry_policy
+
+    if RETRY_MAX_ATTEMPTS <= 1:
+        return None
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    return _retry_policy
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """
+    Retorna el circuit breaker del proceso configurado en settings
+
+    Returns:
+        Optional[CircuitBreaker]: Circuit breaker, o None si está deshabilitado
+    """
+    global _circuit_breaker
+
+    if not CIRCUIT_BREAKER_ENABLED:
+        return None
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            window_size=CIRCUIT_WINDOW,
+            min_requests=CIRCUIT_MIN_REQUESTS,
+            failure_ratio=CIRCUIT_FAILURE_RATIO,
+            open_seconds=CIRCUIT_OPEN_SECONDS
+        )
+    return _circuit_breaker
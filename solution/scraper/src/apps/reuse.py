@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Iterable, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import logging
+
+from ..models import Link
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Puertos por defecto que no cambian el recurso al omitirse
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Parámetros de seguimiento que no cambian el contenido de la página
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+# Cantidad máxima de valores por consulta IN
+LOOKUP_BATCH_SIZE = 500
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliza una URL para identificar el mismo recurso escrito de distintas formas
+
+    Pasa a minúsculas el esquema y el host, quita el puerto por defecto, el
+    fragmento, la barra final y los parámetros de seguimiento, y ordena el
+    resto de parámetros de la query.
+
+    Args:
+        url (str): URL original
+
+    Returns:
+        str: URL normalizada
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+def _lookup_candidates(url: str) -> List[str]:
+    """Formas en que una URL equivalente puede estar guardada en la tabla links"""
+    normalized = normalize_url(url)
+    return list({url, normalized, normalized + "/"})
+
+def link_to_result(link: Link) -> Dict[str, Any]:
+    """Convierte un Link guardado en un resultado con la forma de scrape_website"""
+    return {
+        "url": link.url,
+        "status_code": None,
+        "title": link.title,
+        "date": link.post_date.isoformat() if link.post_date else None,
+        "content": link.content,
+        "meta_description": None,
+        "content_length": 0,
+        "html_content": None,
+        "page_exists": link.page_exists,
+        "success": True,
+        "error": None,
+        "error_category": None,
+        "reused_link_id": link.id,
+        # La copia conserva la fecha del scrape original: así la ventana de
+        # frescura se cuenta desde la descarga y no se renueva en cada copia
+        "processed_date": link.processed_date
+    }
+
+def find_reusable_results(db: Session, urls: Iterable[str], freshness_hours: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Busca scrapes exitosos recientes de las URLs en cualquier archivo
+
+    Args:
+        db (Session): Sesión de base de datos
+        urls (Iterable[str]): URLs a buscar
+        freshness_hours (float): Antigüedad máxima del resultado a reutilizar
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Resultados reutilizables indexados por URL normalizada
+    """
+    if freshness_hours <= 0:
+        return {}
+
+    candidates = sorted({candidate for url in urls for candidate in _lookup_candidates(url)})
+    cutoff = datetime.utcnow() - timedelta(hours=freshness_hours)
+    reusable: Dict[str, Dict[str, Any]] = {}
+
+    for start in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+        batch = candidates[start:start + LOOKUP_BATCH_SIZE]
+        links = (
+            db.query(Link)
+            .filter(Link.url.in_(batch), Link.success.is_(True), Link.processed_date >= cutoff)
+            .order_by(Link.processed_date.desc())
+            .all()
+        )
+        for link in links:
+            # Al estar ordenados por fecha, se conserva el más reciente de cada URL del lote
+            reusable.setdefault(normalize_url(link.url), link_to_result(link))
+
+    if reusable:
+        logger.info(f"Se reutilizarán {len(reusable)} resultados recientes de otros archivos")
+    return reusable
@@ -1,97 +1,387 @@
+import time
 import requests
+import urllib3
 from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import Callable, Dict, Any, Iterator, Mapping, Optional, Tuple, Union, TYPE_CHECKING
 import logging
 
+from .parsers import NOT_FOUND_TEXT, LazyHtml, ParserBackend, get_parser
+from .download import (
+    CHUNK_SIZE, ERROR_CIRCUIT_OPEN, ERROR_HTTP_STATUS, ERROR_NETWORK, ERROR_NOT_FOUND, ERROR_UNEXPECTED,
+    BodyReader, DownloadLimits, DownloadRejected
+)
+from .resilience import RETRY_STATUSES, resilience_counters
+from ..metrics import PARSE_SECONDS, track_request
+from ..tracing import start_span
+from .transport import DEFAULT_HEADERS, get_transport
+
+if TYPE_CHECKING:
+    from .rate_limiter import HostRateLimiter
+    from .resilience import CircuitBreaker, RetryPolicy
+    from .http_cache import ValidatorCache
+    from .archive import PageArchive
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Modos de conservación del HTML en "html_content":
+# off (None), raw (bytes de la respuesta) o lazy (LazyHtml, se serializa al usarse)
+HTML_CONTENT_MODES = ('off', 'raw', 'lazy')
+
+# Errores de requests que se consideran transitorios y se reintentan
+TRANSIENT_REQUESTS_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+def iter_body(response: requests.Response, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Recorre el cuerpo de una respuesta en streaming a medida que llega
+
+    iter_content() espera a juntar chunk_size bytes antes de entregar un
+    fragmento, así que un servidor que envía el cuerpo de a poco retiene la
+    lectura hasta el timeout de lectura entre cada fragmento. read1() de
+    urllib3 devuelve lo que haya disponible tras una sola lectura del socket,
+    lo que permite revisar el tiempo total de la descarga en cada paso. Los
+    errores de urllib3 se traducen a los de requests como en iter_content().
+
+    Args:
+        response (requests.Response): Respuesta pedida con stream=True
+        chunk_size (int): Bytes máximos por fragmento
+
+    Returns:
+        Iterator[bytes]: Fragmentos del cuerpo ya decodificados
+    """
+    raw = response.raw
+    if not isinstance(raw, urllib3.response.HTTPResponse):
+        yield from response.iter_content(chunk_size=chunk_size)
+        return
+    try:
+        while True:
+            chunk = raw.read1(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    except urllib3.exceptions.ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except urllib3.exceptions.DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except urllib3.exceptions.SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
 class WebScraper:
     """
-    Clase para realizar web scraping utilizando BeautifulSoup4
+    Clase para realizar web scraping
+    
+    El parseo del HTML se delega en un ParserBackend (BeautifulSoup, lxml o
+    selectolax) elegido con HTML_PARSER_BACKEND; todos extraen los mismos campos.
+    
+    El HTML completo solo se conserva en "html_content" si se pide con
+    html_content_mode (ver HTML_CONTENT_MODES); por defecto no se conserva.
+    
+    El cuerpo se descarga en streaming aplicando DownloadLimits: tamaño
+    máximo, Content-Type permitido, tiempo total máximo y, con un backend
+    incremental (single_pass), dejar de guardar el cuerpo cuando ya se vieron
+    todos los campos: el resto solo se revisa en busca del mensaje de página
+    no encontrada.
+    
+    Las peticiones usan la sesión HTTP compartida del proceso (ver
+    transport.py), por lo que las conexiones abiertas se reutilizan entre
+    instancias y entre tareas.
+    
+    Con retry_policy y circuit_breaker (ver resilience.py) los fallos
+    transitorios se reintentan con backoff y los hosts con demasiados errores
+    fallan de inmediato mientras su circuito está abierto.
     """
     
-    def __init__(self, timeout: int = 30):
-        self.timeout = timeout
-        self.session = requests.Session()
-        # Headers básicos para simular un navegador
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, timeout: Optional[Union[float, Tuple[float, float]]] = None, rate_limiter: Optional["HostRateLimiter"] = None,
+                 cache: Optional["ValidatorCache"] = None, parser: Optional[ParserBackend] = None,
+                 html_content_mode: Optional[str] = None, archive: Optional["PageArchive"] = None,
+                 download_limits: Optional[DownloadLimits] = None,
+                 session: Optional[requests.Session] = None, retry_policy: Optional["RetryPolicy"] = None,
+                 circuit_breaker: Optional["CircuitBreaker"] = None):
+        transport = get_transport()
+        # Sin timeout explícito se usan los de conexión y lectura configurados
+        self.timeout = timeout if timeout is not None else transport.config.requests_timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.archive = archive
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.parser = parser or get_parser()
+        self.download_limits = download_limits or DownloadLimits.from_settings()
+        if html_content_mode is None:
+            from ..settings import HTML_CONTENT_MODE
+            html_content_mode = HTML_CONTENT_MODE
+        if html_content_mode not in HTML_CONTENT_MODES:
+            raise ValueError(f"Modo de html_content inválido: {html_content_mode} (opciones: {', '.join(HTML_CONTENT_MODES)})")
+        self.html_content_mode = html_content_mode
+        self.session = session or transport.session()
     
     def scrape_website(self, url: str) -> Dict[str, Any]:
         """
         Función principal para realizar scraping de una página web
         
+        Los fallos transitorios (red, timeouts, 5xx y 429) se reintentan según
+        retry_policy, y si el circuito del host está abierto la URL falla de
+        inmediato sin hacer la petición.
+        
         Args:
             url (str): URL de la página web a scrapear
             
         Returns:
             Dict[str, Any]: Diccionario con los datos extraídos y metadatos
         """
+        with start_span("scrape.url", url=url) as span:
+            attempt = 0
+            while True:
+                rejected = self.circuit_rejection(url)
+                if rejected:
+                    return rejected
+                
+                result, retry_reason, retry_after = self._fetch(url)
+                delay = self.retry_delay(url, attempt, retry_reason, retry_after)
+                if delay is None:
+                    span.set_attribute("scrape.attempts", attempt + 1)
+                    return result
+                time.sleep(delay)
+                attempt += 1
+    
+    def _fetch(self, url: str) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """
+        Realiza un único intento de descarga y extracción de la URL
+        
+        Returns:
+            Tuple: Resultado, motivo de reintento ("network", "http_503", ...; None
+                si el resultado es definitivo) y header Retry-After de la respuesta
+        """
         try:
             logger.info(f"Iniciando scraping de: {url}")
             
-            # Realizar la petición HTTP
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            # Enviar los validadores guardados para evitar descargar páginas sin cambios
+            cache_entry, request_kwargs = None, {}
+            if self.cache:
+                cache_entry, conditional_headers = self.cache.conditional_headers(url)
+                if conditional_headers:
+                    request_kwargs["headers"] = conditional_headers
             
-            # Parsear el HTML con BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Realizar la petición HTTP en streaming respetando el límite del host
+            with self.rate_limiter.limit(url) if self.rate_limiter else nullcontext(), track_request("requests"), \
+                    start_span("http.get", url=url, engine="requests") as span:
+                started = time.monotonic()
+                response = self.session.get(url, timeout=self.timeout, stream=True, **request_kwargs)
+                span.set_attribute("http.status_code", response.status_code)
+                try:
+                    if response.status_code == 304 and cache_entry:
+                        return self.cache.cached_result(url, cache_entry), None, None
+                    response.raise_for_status()
+                    
+                    reader = self.body_reader(url, response.headers, started)
+                    for chunk in iter_body(response):
+                        if reader.feed(chunk):
+                            break
+                finally:
+                    # Liberar la conexión aunque el cuerpo no se haya leído completo
+                    response.close()
             
-            # Verificar si la página existe (no contiene "Recurso no encontrado")
-            page_exists, error_message = self._check_page_exists(soup)
-            if not page_exists:
-                logger.error(f"La página {url} no existe: {error_message}")
-                return self._create_error_response(url, error_message)
+            return self.handle_response(url, response.status_code, response.headers, reader), None, None
             
-            # Estructura básica de datos a retornar
-            scraped_data = {
-                "url": url,
-                "status_code": response.status_code,
-                "title": self._get_title(soup),
-                "date": self._get_date(soup),
-                "content": self._get_content(soup),
-                "meta_description": self._get_meta_description(soup),
-                "content_length": len(response.content),
-                "html_content": str(soup),  # HTML completo para análisis posterior
-                "page_exists": True,  # Agregamos este campo para confirmar que la página existe
-                "success": True,
-                "error": None
-            }
+        except DownloadRejected as e:
+            logger.warning(f"Descarga de {url} cortada: {e.description}")
+            return self._create_error_response(url, e.description, e.category), None, None
             
-            logger.info(f"Scraping completado exitosamente para: {url}")
-            return scraped_data
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Error HTTP al acceder a {url}: {str(e)}")
+            status_code = e.response.status_code
+            result = self._create_error_response(
+                url, f"Error de red (HTTP {status_code}): {str(e)}", ERROR_HTTP_STATUS
+            )
+            if status_code in RETRY_STATUSES:
+                return result, f"http_{status_code}", e.response.headers.get("Retry-After")
+            return result, None, None
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error de red al acceder a {url}: {str(e)}")
-            return self._create_error_response(url, f"Error de red: {str(e)}")
+            result = self._create_error_response(url, f"Error de red: {str(e)}", ERROR_NETWORK)
+            return result, "network" if isinstance(e, TRANSIENT_REQUESTS_ERRORS) else None, None
             
         except Exception as e:
             logger.error(f"Error inesperado al procesar {url}: {str(e)}")
-            return self._create_error_response(url, f"Error inesperado: {str(e)}")
+            return self._create_error_response(url, f"Error inesperado: {str(e)}", ERROR_UNEXPECTED), None, None
+    
+    def circuit_rejection(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Consulta el circuit breaker antes de un intento
+        
+        Returns:
+            Optional[Dict[str, Any]]: Resultado de error si el circuito del host
+                está abierto, o None si se puede hacer la petición
+        """
+        if self.circuit_breaker is None or self.circuit_breaker.allow(url):
+            return None
+        host = self.circuit_breaker.host(url)
+        logger.warning(f"Se omite {url}: circuito abierto para el host {host}")
+        return self._create_error_response(
+            url, f"Host no disponible (circuito abierto): {host}", ERROR_CIRCUIT_OPEN
+        )
+    
+    def retry_delay(self, url: str, attempt: int, retry_reason: Optional[str],
+                    retry_after: Optional[str]) -> Optional[float]:
+        """
+        Registra el resultado de un intento y decide si se reintenta
+        
+        Compartido con AsyncWebScraper para que ambos motores apliquen la misma
+        política y actualicen los mismos contadores.
+        
+        Args:
+            url (str): URL del intento
+            attempt (int): Número del intento (desde 0)
+            retry_reason (str, optional): Motivo del fallo transitorio, o None
+            retry_after (str, optional): Header Retry-After de la respuesta
+            
+        Returns:
+            Optional[float]: Segundos a esperar antes de reintentar, o None si el
+                resultado es definitivo
+        """
+        if self.circuit_breaker:
+            self.circuit_breaker.record(url, failed=retry_reason is not None)
+        if retry_reason is None or self.retry_policy is None:
+            return None
+        if not self.retry_policy.should_retry(attempt):
+            resilience_counters.increment("retry.exhausted")
+            logger.warning(f"Se agotaron los {self.retry_policy.max_attempts} intentos para {url}")
+            return None
+        
+        delay = self.retry_policy.delay(attempt, retry_after)
+        resilience_counters.increment(f"retry.{retry_reason}")
+        logger.warning(f"Reintentando {url} en {delay:.2f} s (intento {attempt + 2}/{self.retry_policy.max_attempts}, motivo: {retry_reason})")
+        return delay
+    
+    def body_reader(self, url: str, headers: Mapping[str, str], started: Optional[float] = None) -> BodyReader:
+        """
+        Valida los headers de la respuesta y prepara la lectura del cuerpo
+        
+        stop_buffering_after_fields solo se aplica si el backend de parseo tiene
+        incremental() (single_pass; los demás devuelven None) y no se está
+        archivando la respuesta (el archivo debe guardar la página completa).
+        
+        Args:
+            url (str): URL descargada
+            headers (Mapping[str, str]): Headers de la respuesta
+            started (float, optional): time.monotonic() al iniciar la petición,
+                desde el que corre limits.max_seconds
+        
+        Raises:
+            DownloadRejected: Si el Content-Type o el Content-Length no están permitidos
+        """
+        self.download_limits.check_headers(headers)
+        feeder = None if self.archive else self.parser.incremental()
+        return BodyReader(self.download_limits, feeder, started)
     
-    def _get_title(self, soup: BeautifulSoup) -> Optional[str]:
+    def handle_response(self, url: str, status_code: int, headers: Mapping[str, str], body: BodyReader) -> Dict[str, Any]:
+        """Archiva, parsea y guarda en caché una respuesta ya descargada"""
+        body.close()
+        content = body.content
+        # Guardar la respuesta cruda para poder re-extraer sin descargar de nuevo
+        if self.archive:
+            self.archive.append(url, status_code, headers, content)
+        
+        if body.not_found:
+            # El mensaje puede estar en la parte del cuerpo que no se guardó, así que no se parsea
+            error_message = f"La página no existe - se encontró el mensaje: '{NOT_FOUND_TEXT}'"
+            logger.error(f"La página {url} no existe: {error_message}")
+            result = self._create_error_response(url, error_message, ERROR_NOT_FOUND)
+        else:
+            with PARSE_SECONDS.time(), start_span("parse", backend=self.parser.name, bytes=len(content)):
+                result = self.parse_response(url, status_code, content, content_length=body.size)
+        if self.cache:
+            self.cache.store(url, headers, result)
+        return result
+    
+    def parse_response(self, url: str, status_code: int, content: bytes,
+                       content_length: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Parsea el cuerpo de una respuesta HTTP y extrae los campos de la página
+        
+        Se separa de scrape_website para que otros motores de descarga
+        (por ejemplo AsyncWebScraper) reutilicen exactamente la misma extracción.
+        
+        Args:
+            url (str): URL de la página descargada
+            status_code (int): Código de estado HTTP de la respuesta
+            content (bytes): Cuerpo de la respuesta
+            content_length (int, optional): Tamaño real del cuerpo, si content
+                es solo la parte que se guardó (stop_buffering_after_fields)
+            
+        Returns:
+            Dict[str, Any]: Diccionario con los datos extraídos y metadatos
+        """
+        # Parsear el HTML con el backend configurado
+        with start_span("parse.html"):
+            soup = self.parser.parse(content)
+        
+        # Verificar si la página existe (no contiene "Recurso no encontrado")
+        page_exists, error_message = self._extract("page_exists", self._check_page_exists, soup)
+        if not page_exists:
+            logger.error(f"La página {url} no existe: {error_message}")
+            return self._create_error_response(url, error_message, ERROR_NOT_FOUND)
+        
+        # Estructura básica de datos a retornar
+        scraped_data = {
+            "url": url,
+            "status_code": status_code,
+            "title": self._extract("title", self._get_title, soup),
+            "date": self._extract("date", self._get_date, soup),
+            "content": self._extract("content", self._get_content, soup),
+            "meta_description": self._extract("meta_description", self._get_meta_description, soup),
+            "content_length": content_length if content_length is not None else len(content),
+            "html_content": self._html_content(soup, content),  # HTML completo solo si se pidió
+            "page_exists": True,  # Agregamos este campo para confirmar que la página existe
+            "success": True,
+            "error": None,
+            "error_category": None
+        }
+        
+        logger.info(f"Scraping completado exitosamente para: {url}")
+        return scraped_data
+    
+    def _extract(self, field: str, extractor: Callable[[Any], Any], soup: Any) -> Any:
+        """Ejecuta un extractor dentro de su propio span (extract.<campo>)"""
+        with start_span(f"extract.{field}"):
+            return extractor(soup)
+    
+    def _html_content(self, soup: Any, content: bytes) -> Any:
+        """Retorna el HTML de la página según html_content_mode"""
+        if self.html_content_mode == 'raw':
+            return content
+        if self.html_content_mode == 'lazy':
+            return LazyHtml(self.parser, soup)
+        return None
+    
+    def _get_title(self, soup: Any) -> Optional[str]:
         """Extrae el título de la página"""
-        title_tag = soup.find('title')
-        return title_tag.text.strip() if title_tag else None
+        return self.parser.title(soup)
     
-    def _get_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def _get_date(self, soup: Any) -> Optional[str]:
         """
         Extrae la fecha de la página buscando elementos <time> con atributo datetime
         
         Args:
-            soup (BeautifulSoup): Objeto BeautifulSoup del HTML parseado
+            soup (Any): Documento parseado por el backend
             
         Returns:
             Optional[str]: Fecha encontrada en formato datetime, o None si no se encuentra
         """
         # Buscar el primer elemento <time> que tenga el atributo datetime
-        time_tag = soup.find('time', attrs={'datetime': True})
+        datetime_value = self.parser.time_datetime(soup)
         
-        if time_tag and time_tag.get('datetime'):
-            datetime_value = time_tag['datetime'].strip()
+        if datetime_value:
+            datetime_value = datetime_value.strip()
             logger.info(f"Fecha encontrada: {datetime_value}")
             return datetime_value
         
@@ -99,45 +389,40 @@ class WebScraper:
         logger.warning("No se encontró ningún elemento <time> con atributo datetime")
         return None
     
-    def _get_content(self, soup: BeautifulSoup) -> Optional[str]:
+    def _get_content(self, soup: Any) -> Optional[str]:
         """
         Extrae el contenido del primer <p> que se encuentra después de <div class="article-content">
         
         Args:
-            soup (BeautifulSoup): Objeto BeautifulSoup del HTML parseado
+            soup (Any): Documento parseado por el backend
             
         Returns:
             Optional[str]: Contenido del primer párrafo encontrado, o None si no se encuentra
         """
-        # Buscar el div con clase "article-content"
-        article_content_div = soup.find('div', class_='article-content')
+        # Buscar el primer elemento <p> dentro del div con clase "article-content"
+        found_div, content = self.parser.article_paragraph(soup)
         
-        if not article_content_div:
+        if not found_div:
             logger.warning("No se encontró el div con clase 'article-content'")
             return None
         
-        # Buscar el primer elemento <p> dentro del div article-content
-        first_paragraph = article_content_div.find('p')
-        
-        if first_paragraph:
-            content = first_paragraph.get_text(strip=True)
+        if content is not None:
             logger.info(f"Contenido extraído: {content[:100]}...")  # Log de los primeros 100 caracteres
             return content
         else:
             logger.warning("No se encontró ningún párrafo <p> dentro del div 'article-content'")
             return None
     
-    def _get_meta_description(self, soup: BeautifulSoup) -> Optional[str]:
+    def _get_meta_description(self, soup: Any) -> Optional[str]:
         """Extrae la meta descripción de la página"""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        return meta_desc.get('content') if meta_desc else None
+        return self.parser.meta_description(soup)
     
-    def _check_page_exists(self, soup: BeautifulSoup) -> tuple[bool, Optional[str]]:
+    def _check_page_exists(self, soup: Any) -> tuple[bool, Optional[str]]:
         """
         Verifica si la página existe buscando el texto 'Recurso no encontrado'
         
         Args:
-            soup (BeautifulSoup): Objeto BeautifulSoup del HTML parseado
+            soup (Any): Documento parseado por el backend
             
         Returns:
             tuple[bool, Optional[str]]: (página_existe, mensaje_error)
@@ -145,12 +430,9 @@ class WebScraper:
                 - False si no existe (se encontró "Recurso no encontrado")
                 - mensaje_error será None si existe, o descripción del error si no existe
         """
-        # Extraer todo el texto de la página para buscar el mensaje de error
-        page_text = soup.get_text().strip()
-        
-        # Buscar el texto de error (case insensitive)
-        error_text = "Recurso no encontrado"
-        if error_text.lower() in page_text.lower():
+        # Buscar el texto de error en el texto de la página (case insensitive)
+        error_text = NOT_FOUND_TEXT
+        if self.parser.page_not_found(soup):
             logger.warning(f"Página no encontrada - se detectó el texto: '{error_text}'")
             return False, f"La página no existe - se encontró el mensaje: '{error_text}'"
         
@@ -165,8 +447,9 @@ class WebScraper:
             script.decompose()
         return soup.get_text(strip=True, separator=' ')
     
-    def _create_error_response(self, url: str, error_message: str) -> Dict[str, Any]:
-        """Crea una respuesta de error estandarizada"""
+    def _create_error_response(self, url: str, error_message: str,
+                               error_category: str = ERROR_UNEXPECTED) -> Dict[str, Any]:
+        """Crea una respuesta de error estandarizada (ver las categorías en download.py)"""
         return {
             "url": url,
             "status_code": None,
@@ -178,7 +461,8 @@ class WebScraper:
             "html_content": None,
             "page_exists": False,  # En caso de error, asumimos que la página no existe o no es válida
             "success": False,
-            "error": error_message
+            "error": error_message,
+            "error_category": error_category
         }
 
 # Función de conveniencia para usar directamente
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import requests
+import httpx
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Headers básicos para simular un navegador
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+@dataclass
+class TransportConfig:
+    """
+    Parámetros de las conexiones HTTP de los scrapers
+
+    Attributes:
+        pool_connections (int): Hosts distintos con pool propio (requests)
+        pool_maxsize (int): Conexiones reutilizables por host (requests)
+        max_connections (int): Conexiones abiertas en total (httpx)
+        max_keepalive_connections (int): Conexiones inactivas que se mantienen abiertas (httpx)
+        keepalive_expiry (float): Segundos que una conexión inactiva se mantiene abierta (httpx)
+        connect_timeout (float): Segundos máximos para establecer la conexión
+        read_timeout (float): Segundos máximos entre bytes recibidos
+        http2 (bool): Negociar HTTP/2 en el cliente asíncrono (requiere el paquete h2)
+    """
+    pool_connections: int = 20
+    pool_maxsize: int = 10
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_settings(cls) -> "TransportConfig":
+        """Crea la configuración definida en settings"""
+        from ..settings import (
+            HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE,
+            HTTP_KEEPALIVE_EXPIRY, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP2_ENABLED
+        )
+        return cls(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            connect_timeout=HTTP_CONNECT_TIMEOUT,
+            read_timeout=HTTP_READ_TIMEOUT,
+            http2=HTTP2_ENABLED
+        )
+
+    @property
+    def requests_timeout(self) -> Tuple[float, float]:
+        """Timeout (conexión, lectura) en el formato de requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def httpx_timeout(self) -> httpx.Timeout:
+        """Timeout en el formato de httpx (escritura y espera del pool usan el de lectura)"""
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+def create_session(config: TransportConfig) -> requests.Session:
+    """Crea una sesión de requests con el pool de conexiones configurado"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=config.pool_connections, pool_maxsize=config.pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+def create_async_client(config: TransportConfig, max_connections: Optional[int] = None,
+                        transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Crea un cliente httpx asíncrono con el pool de conexiones configurado
+
+    Args:
+        config (TransportConfig): Configuración de las conexiones
+        max_connections (int, optional): Reemplaza config.max_connections
+        transport (httpx.AsyncBaseTransport, optional): Transporte alternativo (pruebas)
+
+    Returns:
+        httpx.AsyncClient: Cliente HTTP
+    """
+    http2 = config.http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 habilitado pero el paquete h2 no está instalado, se usará HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        timeout=config.httpx_timeout,
+        follow_redirects=True,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections or config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry
+        ),
+        transport=transport
+    )
+
+class SharedTransport:
+    """
+    Sesión HTTP, event loop y cliente asíncrono compartidos por un proceso
+
+    Un worker de Celery atiende muchas tareas en el mismo proceso; al compartir
+    la sesión de requests y el cliente httpx (junto con el event loop al que
+    está ligado) las conexiones TLS ya abiertas a un host se reutilizan entre
+    URLs y entre tareas. Tras un fork el proceso hijo descarta lo heredado y
+    crea sus propias conexiones.
+    """
+
+    def __init__(self, config: TransportConfig):
+        self.config = config
+        self._pid = os.getpid()
+        self._session: Optional[requests.Session] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset()
+
+    def reset(self):
+        """
+        Descarta las conexiones heredadas del proceso padre
+
+        No se cierran: los sockets siguen siendo del padre y cerrarlos desde el
+        hijo cortaría sus conexiones TLS.
+        """
+        self._pid = os.getpid()
+        self._session = None
+        self._loop = None
+        self._client = None
+        self._client_loop = None
+
+    def session(self) -> requests.Session:
+        """Sesión de requests del proceso"""
+        self._check_pid()
+        if self._session is None:
+            self._session = create_session(self.config)
+        return self._session
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop del proceso usado por AsyncWebScraper.scrape_iter"""
+        self._check_pid()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Cliente httpx del proceso para el event loop en ejecución
+
+        Un cliente httpx solo puede usarse desde el event loop en el que abrió
+        sus conexiones, por lo que si se llama desde otro loop se crea uno nuevo.
+        """
+        self._check_pid()
+        running_loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not running_loop:
+            self._client = create_async_client(self.config)
+            self._client_loop = running_loop
+        return self._client
+
+    def close(self):
+        """Cierra la sesión, el cliente y el event loop del proceso"""
+        if self._pid != os.getpid():
+            self.reset()
+            return
+        if self._session is not None:
+            self._session.close()
+        if self._loop is not None and not self._loop.is_closed():
+            if self._client is not None and self._client_loop is self._loop:
+                self._loop.run_until_complete(self._client.aclose())
+            self._loop.close()
+        self.reset()
+
+_shared_transport: Optional[SharedTransport] = None
+
+def get_transport() -> SharedTransport:
+    """Retorna el transporte HTTP compartido del proceso configurado desde settings"""
+    global _shared_transport
+
+    if _shared_transport is None:
+        _shared_transport = SharedTransport(TransportConfig.from_settings())
+    return _shared_transport
+
+def _reset_after_fork():
+    if _shared_transport is not None:
+        _shared_transport.reset()
+
+# Los workers prefork de Celery crean los procesos hijos con fork
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,77 @@
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class UrlFileReader:
+    """
+    Lector en streaming de archivos de URLs (una por línea)
+
+    Las URLs se entregan de forma perezosa junto con el offset en bytes de su
+    línea, por lo que un archivo de cientos de MB se procesa con memoria
+    constante y se puede retomar la lectura desde cualquier offset con seek.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    @staticmethod
+    def _is_url(line: bytes) -> bool:
+        """Validación básica de URL sobre la línea sin decodificar"""
+        return line.strip().startswith(b'http')
+
+    def scan(self, chunk_size: int = 0) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Recorre el archivo una vez para contar las URLs sin decodificarlas
+
+        Args:
+            chunk_size (int): Si es mayor a 0, calcula además los rangos de bytes
+                que contienen `chunk_size` URLs cada uno
+
+        Returns:
+            Tuple[int, List[Tuple[int, int]]]: Total de URLs y rangos (inicio, fin)
+                en bytes de cada bloque
+        """
+        total = 0
+        offset = 0
+        chunk_start = 0
+        ranges = []
+        with open(self.file_path, 'rb') as file:
+            for line in file:
+                if self._is_url(line):
+                    if chunk_size and total and total % chunk_size == 0:
+                        ranges.append((chunk_start, offset))
+                        chunk_start = offset
+                    total += 1
+                offset += len(line)
+        if total:
+            ranges.append((chunk_start, offset))
+        logger.info(f"Se encontraron {total} URLs en el archivo {self.file_path}")
+        return total, ranges
+
+    def count(self) -> int:
+        """Cuenta las URLs válidas del archivo"""
+        return self.scan()[0]
+
+    def iter_urls(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Entrega las URLs del archivo de forma perezosa
+
+        Args:
+            start (int): Offset en bytes desde donde comenzar (inicio de una línea)
+            end (int, optional): Offset en bytes donde detenerse (exclusivo)
+
+        Yields:
+            Tuple[int, str]: Offset de la línea y URL
+        """
+        with open(self.file_path, 'rb') as file:
+            file.seek(start)
+            offset = start
+            for line in file:
+                if end is not None and offset >= end:
+                    break
+                if self._is_url(line):
+                    yield offset, line.strip().decode('utf-8')
+                offset += len(line)
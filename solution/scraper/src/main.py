@@ -1,11 +1,25 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+import json
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+import anyio
+import redis
+import redis.asyncio as aioredis
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from .apps.scraper import scrape_url
-from .settings import get_db, engine, Base, CORS_ORIGINS
+from .apps.progress import FINAL_STATUSES, ProgressBroker, progress_event
+from .apps.checkpoint import get_file_lease
+from .settings import get_async_db, CORS_ORIGINS, REDIS_HOST, REDIS_PORT, PROFILES_DIR, PROGRESS_KEEPALIVE_SECONDS
 from .models import Link, File
 from .tasks import process_file_task
+from . import metrics, profiling, tracing
 import logging
 from typing import List, Optional
 from datetime import datetime
@@ -15,10 +29,21 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Una sola suscripción a Redis por proceso para todos los clientes del stream de progreso
+progress_broker = ProgressBroker(
+    lambda: aioredis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0, decode_responses=True)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await progress_broker.close()
+
 app = FastAPI(
     title="Web Scraper API",
     description="API para realizar web scraping con BeautifulSoup4 y almacenamiento en PostgreSQL",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -30,10 +55,37 @@ app.add_middleware(
     allow_headers=["*"],  # Permite todos los headers
 )
 
+# Spans de las peticiones; su contexto viaja a las tareas de Celery en los headers
+tracing.setup_tracing("scraper-api")
+
+# Largo de la cola de Celery, leído del broker en cada scrape de /metrics
+metrics.register_queue_depth(redis.Redis(host=REDIS_HOST, port=int(REDIS_PORT), db=0))
+
+@app.middleware("http")
+async def track_api_requests(request: Request, call_next):
+    """
+    Mide la duración de cada petición por ruta (la plantilla, no la URL) y código de estado
+    
+    También abre el span de la petición, hijo del traceparent recibido si lo hay.
+    """
+    start = time.perf_counter()
+    with tracing.start_server_span(request.method, request.headers) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        route_path = route.path if route else "sin_ruta"
+        span.update_name(f"{request.method} {route_path}")
+        span.set_attributes({"http.route": route_path, "http.status_code": response.status_code})
+    metrics.API_REQUEST_SECONDS.labels(
+        request.method, route_path, str(response.status_code)
+    ).observe(time.perf_counter() - start)
+    return response
+
 # Modelo para la petición POST del endpoint /process
 class ProcessRequest(BaseModel):
     file_id: int
     email: str
+    resume: bool = False
+    profile: bool = False
 
 
 @app.get("/")
@@ -43,18 +95,26 @@ async def read_root():
         "version": "1.0.0",
         "endpoints": {
             "POST /process": "Procesa un archivo de URLs usando Celery (requiere file_id)",
-            "GET /task-status/{task_id}": "Consulta el estado de una tarea de procesamiento"
+            "GET /task-status/{task_id}": "Consulta el estado de una tarea de procesamiento",
+            "GET /progress/{file_id}": "Progreso de un archivo en vivo (Server-Sent Events)",
+            "GET /metrics": "Métricas de Prometheus de la API y de la cola de Celery",
+            "GET /profiles": "Lista los perfiles de tareas guardados (POST /process con profile=true)",
+            "GET /profiles/{task_id}": "Descarga el perfil de una tarea (folded para flamegraph, o format=json)"
         }
     }
 
 @app.post("/process")
-async def process_file(request: ProcessRequest, db: Session = Depends(get_db)):
+async def process_file(request: ProcessRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Endpoint para procesar un archivo de URLs usando Celery
     
+    La consulta usa la sesión asíncrona y la publicación en el broker (síncrona
+    en Celery) se ejecuta en el threadpool, de modo que una base de datos o un
+    broker lentos no detienen las demás peticiones de la API.
+    
     Args:
         request (ProcessRequest): Objeto que contiene el file_id a procesar
-        db (Session): Sesión de base de datos
+        db (AsyncSession): Sesión asíncrona de base de datos
         
     Returns:
         Dict: Información sobre la tarea iniciada
@@ -63,30 +123,50 @@ async def process_file(request: ProcessRequest, db: Session = Depends(get_db)):
         logger.info(f"Iniciando procesamiento del archivo con ID: {request.file_id}")
         
         # Verificar que el archivo existe
-        file_record = db.query(File).filter(File.id == request.file_id).first()
+        file_record = (await db.execute(select(File).where(File.id == request.file_id))).scalar_one_or_none()
         if not file_record:
             raise HTTPException(
                 status_code=404,
                 detail=f"No se encontró el archivo con ID: {request.file_id}"
             )
         
-        # Verificar que el archivo no esté ya siendo procesado
-        if file_record.status == "PROCESSING":
+        # Verificar que el archivo no esté ya siendo procesado (salvo que se pida reanudarlo)
+        if file_record.status == "PROCESSING" and not request.resume:
             raise HTTPException(
                 status_code=400,
                 detail=f"El archivo con ID {request.file_id} ya está siendo procesado"
             )
         
+        # Reanudar solo si ninguna tarea viva tiene el lease del archivo (el worker anterior murió)
+        if request.resume and await run_in_threadpool(get_file_lease(request.file_id).is_held):
+            raise HTTPException(
+                status_code=409,
+                detail=f"El archivo con ID {request.file_id} sigue en proceso en un worker activo; "
+                       f"se podrá reanudar cuando venza su lease"
+            )
+        
         # Verificar que el archivo exista en el sistema de archivos
-        import os
-        if not os.path.exists(file_record.file_path):
+        if not await run_in_threadpool(os.path.exists, file_record.file_path):
             raise HTTPException(
                 status_code=404,
                 detail=f"El archivo no existe en la ruta especificada: {file_record.file_path}"
             )
         
-        # Iniciar la tarea de Celery
-        task = process_file_task.delay(request.file_id, request.email)
+        # Iniciar la tarea de Celery fuera del event loop (el contexto del span viaja
+        # en los headers del mensaje)
+        with tracing.start_span("celery.enqueue", file_id=request.file_id, resume=request.resume) as span:
+            if request.profile:
+                # Perfil por muestreo de esta ejecución (header "profile" del mensaje)
+                task = await run_in_threadpool(
+                    process_file_task.apply_async,
+                    (request.file_id, request.email), {"resume": request.resume},
+                    headers={profiling.PROFILE_HEADER: True}
+                )
+            elif request.resume:
+                task = await run_in_threadpool(process_file_task.delay, request.file_id, request.email, resume=True)
+            else:
+                task = await run_in_threadpool(process_file_task.delay, request.file_id, request.email)
+            span.set_attribute("celery.task_id", str(task.id))
         
         logger.info(f"Tarea de Celery iniciada con ID: {task.id} para archivo: {request.file_id} - Email: {request.email}")
         
@@ -108,11 +188,139 @@ async def process_file(request: ProcessRequest, db: Session = Depends(get_db)):
             detail=f"Error interno del servidor: {str(e)}"
         )
 
+def _sse(event: dict) -> str:
+    """Evento de progreso en el formato de Server-Sent Events"""
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+async def _progress_stream(request: Request, queue: asyncio.Queue, snapshot: dict, subscription: AsyncExitStack):
+    """
+    Envía el estado inicial del archivo y luego cada evento publicado por los
+    workers, hasta que el archivo termina o el cliente se desconecta
+    """
+    metrics.PROGRESS_STREAM_CLIENTS.inc()
+    try:
+        yield _sse(snapshot)
+        status = snapshot["status"]
+        while status not in FINAL_STATUSES:
+            try:
+                event = await asyncio.wait_for(queue.get(), PROGRESS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comentario SSE para que los proxies no cierren la conexión inactiva
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event)
+            status = event.get("status")
+    finally:
+        metrics.PROGRESS_STREAM_CLIENTS.dec()
+        # Al desconectarse el cliente el stream se cancela: liberar la suscripción igual
+        with anyio.CancelScope(shield=True):
+            await subscription.aclose()
+
+@app.get("/progress/{file_id}")
+async def stream_progress(file_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Endpoint con el progreso de un archivo en vivo (Server-Sent Events)
+    
+    Los workers publican el avance en Redis; cada proceso de la API tiene una
+    sola suscripción por archivo observado y la reparte entre sus clientes, así
+    que muchos paneles mirando el mismo archivo no agregan consultas a Redis ni
+    a la base de datos. El primer evento es el estado actual del archivo y el
+    stream termina cuando el archivo queda PROCESSED o ERROR.
+    
+    Args:
+        file_id (int): ID del archivo
+        request (Request): Petición (para detectar la desconexión del cliente)
+        db (AsyncSession): Sesión asíncrona de base de datos
+        
+    Returns:
+        StreamingResponse: Eventos "progress" con status, total, current,
+            processed, failed y progress (porcentaje)
+    """
+    subscription = AsyncExitStack()
+    try:
+        # Suscribirse antes de leer el estado para no perder eventos entre ambos
+        queue = await subscription.enter_async_context(progress_broker.subscribe(file_id))
+    except redis.RedisError as e:
+        logger.error(f"No se pudo suscribir al progreso del archivo {file_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail="Eventos de progreso no disponibles")
+    
+    try:
+        file_record = (await db.execute(select(File).where(File.id == file_id))).scalar_one_or_none()
+    except Exception:
+        await subscription.aclose()
+        raise
+    finally:
+        # No retener una conexión del pool mientras dure el stream
+        await db.close()
+    
+    if not file_record:
+        await subscription.aclose()
+        raise HTTPException(status_code=404, detail=f"No se encontró el archivo con ID: {file_id}")
+    
+    snapshot = progress_event(
+        file_id, file_record.status, file_record.total_links,
+        file_record.total_processed, file_record.total_failed
+    )
+    return StreamingResponse(
+        _progress_stream(request, queue, snapshot, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Endpoint con las métricas de Prometheus de la API
+
+    Las métricas del scraping (descargas, parseo, escrituras y tareas) las
+    exporta el worker de Celery en METRICS_WORKER_PORT.
+    """
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/profiles")
+def get_profiles():
+    """
+    Endpoint que lista los perfiles de tareas guardados en el volumen compartido
+    
+    Returns:
+        Dict: Perfiles del más reciente al más antiguo (tarea, duración y muestras)
+    """
+    return {"profiles": profiling.list_profiles(PROFILES_DIR)}
+
+@app.get("/profiles/{task_id}")
+async def download_profile(task_id: str, format: str = "folded"):
+    """
+    Endpoint para descargar el perfil de una tarea
+    
+    Args:
+        task_id (str): ID de la tarea de Celery
+        format (str): folded (pilas para flamegraph.pl o speedscope) o json
+            (resumen con las funciones más costosas)
+        
+    Returns:
+        FileResponse: Archivo del perfil
+    """
+    if format not in ("folded", "json"):
+        raise HTTPException(status_code=400, detail="Formato no válido (folded o json)")
+    
+    path = profiling.profile_path(PROFILES_DIR, task_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"No se encontró el perfil de la tarea {task_id}")
+    
+    media_type = "application/json" if format == "json" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
 @app.get("/task-status/{task_id}")
-async def get_task_status(task_id: str):
+def get_task_status(task_id: str):
     """
     Endpoint para consultar el estado de una tarea de Celery
     
+    Es síncrono (FastAPI lo ejecuta en el threadpool) porque leer el estado
+    consulta el backend de resultados de Celery de forma bloqueante.
+    
     Args:
         task_id (str): ID de la tarea de Celery
         
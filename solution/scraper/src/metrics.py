@@ -0,0 +1,190 @@
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import logging
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, start_http_server
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Los workers prefork de Celery escriben sus métricas en este directorio
+# (modo multiproceso de prometheus_client) para que el exporter del proceso
+# principal las sume. Debe definirse antes de importar este módulo.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# Buckets en segundos para descargas, parseo y escrituras
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TASK_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+FETCH_SECONDS = Histogram(
+    "scraper_fetch_seconds", "Tiempo de descarga de una URL (petición y cuerpo)",
+    ["engine"], buckets=LATENCY_BUCKETS
+)
+PARSE_SECONDS = Histogram(
+    "scraper_parse_seconds", "Tiempo de parseo y extracción de una página", buckets=LATENCY_BUCKETS
+)
+DB_WRITE_SECONDS = Histogram(
+    "scraper_db_write_seconds", "Tiempo de escritura en la base de datos por URL (duración del lote / filas)",
+    buckets=LATENCY_BUCKETS
+)
+URLS_TOTAL = Counter(
+    "scraper_urls_total", "URLs procesadas por resultado y categoría de error",
+    ["result", "category"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "scraper_requests_in_flight", "Peticiones HTTP en curso", multiprocess_mode="livesum"
+)
+TASKS_IN_PROGRESS = Gauge(
+    "scraper_celery_tasks_in_progress", "Tareas de Celery en ejecución", ["task"], multiprocess_mode="livesum"
+)
+TASK_SECONDS = Histogram(
+    "scraper_celery_task_seconds", "Duración de las tareas de Celery", ["task", "state"], buckets=TASK_BUCKETS
+)
+RESILIENCE_EVENTS = Counter(
+    "scraper_resilience_events_total", "Reintentos y eventos del circuit breaker", ["event"]
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "scraper_db_pool_checkout_seconds", "Tiempo para obtener una conexión del pool (espera, pre-ping y conexión)",
+    ["pool"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "scraper_db_pool_checked_out", "Conexiones del pool en uso", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "scraper_db_pool_capacity", "Conexiones máximas del pool (pool_size + max_overflow)", ["pool"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_TIMEOUTS = Counter(
+    "scraper_db_pool_timeouts_total", "Checkouts que agotaron pool_timeout sin obtener conexión", ["pool"]
+)
+API_REQUEST_SECONDS = Histogram(
+    "scraper_api_request_seconds", "Duración de las peticiones a la API", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+PROGRESS_STREAM_CLIENTS = Gauge(
+    "scraper_progress_stream_clients", "Clientes conectados al stream de progreso de la API",
+    multiprocess_mode="livesum"
+)
+
+# Resultado de una URL según Link: exitosa, no encontrada o fallida
+RESULT_SUCCESS = "success"
+RESULT_NOT_FOUND = "not_found"
+RESULT_FAILURE = "failure"
+
+def record_url_result(result: dict):
+    """Cuenta el resultado de una URL según su éxito y su error_category"""
+    category = result.get("error_category") or "none"
+    if result.get("success"):
+        outcome = RESULT_SUCCESS
+    elif category == "not_found":
+        outcome = RESULT_NOT_FOUND
+    else:
+        outcome = RESULT_FAILURE
+    URLS_TOTAL.labels(outcome, category).inc()
+
+@contextmanager
+def track_request(engine: str) -> Iterator[None]:
+    """Mide la descarga de una URL y la cuenta como petición en curso"""
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        FETCH_SECONDS.labels(engine).observe(time.perf_counter() - start)
+        REQUESTS_IN_FLIGHT.dec()
+
+class QueueDepthCollector:
+    """
+    Largo de las colas de Celery leído de Redis en cada scrape
+
+    Con el broker Redis cada cola es una lista con el nombre de la cola.
+    """
+
+    def __init__(self, redis_client, queues=("celery",)):
+        self.redis_client = redis_client
+        self.queues = queues
+
+    def collect(self):
+        gauge = GaugeMetricFamily("scraper_celery_queue_length", "Mensajes en espera en la cola de Celery", labels=["queue"])
+        for queue in self.queues:
+            try:
+                gauge.add_metric([queue], self.redis_client.llen(queue))
+            except Exception as e:
+                logger.warning(f"No se pudo leer el largo de la cola {queue}: {str(e)}")
+        yield gauge
+
+def register_queue_depth(redis_client, queues=("celery",), registry: CollectorRegistry = REGISTRY):
+    """Registra el largo de las colas de Celery en el registro de la API"""
+    registry.register(QueueDepthCollector(redis_client, queues))
+
+def render_latest(registry: CollectorRegistry = REGISTRY) -> tuple[bytes, str]:
+    """
+    Serializa las métricas en el formato de texto de Prometheus
+
+    Returns:
+        tuple[bytes, str]: Cuerpo y Content-Type de la respuesta
+    """
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def start_worker_exporter(port: int) -> Optional[CollectorRegistry]:
+    """
+    Inicia el servidor HTTP de métricas del worker de Celery
+
+    Se llama en el proceso principal del worker antes de crear los procesos
+    hijo. Con PROMETHEUS_MULTIPROC_DIR se vacía el directorio (las métricas de
+    una ejecución anterior no deben sumarse) y se exporta la suma de todos los
+    procesos; sin él solo se exportan las del proceso actual (worker --pool=solo
+    o threads).
+
+    Args:
+        port (int): Puerto del exporter (0 = deshabilitado)
+
+    Returns:
+        Optional[CollectorRegistry]: Registro exportado, o None si está deshabilitado
+    """
+    if not port:
+        return None
+
+    registry = REGISTRY
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        shutil.rmtree(MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(MULTIPROC_DIR, exist_ok=True)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    start_http_server(port, registry=registry)
+    logger.info(f"Exporter de métricas del worker escuchando en el puerto {port} (multiproceso: {bool(MULTIPROC_DIR)})")
+    return registry
+
+def mark_process_dead(pid: int):
+    """Descarta los gauges de un proceso hijo del worker que terminó"""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+
+# Inicio de cada tarea en curso del proceso, por task_id
+_task_starts: Dict[str, float] = {}
+
+def task_started(task_id: str, task_name: str):
+    """Registra el inicio de una tarea de Celery"""
+    _task_starts[task_id] = time.perf_counter()
+    TASKS_IN_PROGRESS.labels(task_name).inc()
+
+def task_finished(task_id: str, task_name: str, state: Optional[str]):
+    """Registra el fin de una tarea de Celery y su duración"""
+    start = _task_starts.pop(task_id, None)
+    TASKS_IN_PROGRESS.labels(task_name).dec()
+    if start is not None:
+        TASK_SECONDS.labels(task_name, state or "UNKNOWN").observe(time.perf_counter() - start)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .settings import Base
 from datetime import datetime
@@ -8,6 +8,10 @@ class File(Base):
     Modelo para la tabla files
     """
     __tablename__ = "files"
+    # Los índices reflejan las migraciones del hub, que es quien crea el esquema
+    __table_args__ = (
+        Index("IX_files_user_id_uploaded_at", "user_id", "uploaded_at"),
+    )
     
     id = Column("id", Integer, primary_key=True, index=True)
     total_links = Column(Integer, nullable=False)
@@ -27,6 +31,11 @@ class Link(Base):
     Modelo para la tabla links
     """
     __tablename__ = "links"
+    __table_args__ = (
+        Index("IX_links_file_id", "file_id"),
+        # Reutilización de resultados y reanudación buscan por igualdad de URL
+        Index("IX_links_url", "url", postgresql_using="hash"),
+    )
     
     id = Column("id", Integer, primary_key=True, index=True)
     file_id = Column(Integer, ForeignKey("files.id"), nullable=False)
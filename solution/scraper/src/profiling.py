@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tareas que se pueden perfilar (las demás ignoran el header y PROFILING_ENABLED)
+PROFILED_TASKS = (
+    "src.tasks.process_file_task",
+    "src.tasks.process_chunk_task",
+    "src.tasks.process_single_url_task",
+)
+
+# Header del mensaje de Celery que activa el perfil de una tarea
+PROFILE_HEADER = "profile"
+
+# IDs de tarea válidos como nombre de archivo (UUID de Celery)
+TASK_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,100}$")
+
+# Funciones más costosas guardadas en el resumen de cada perfil
+TOP_FUNCTIONS = 30
+
+def _frame_label(frame) -> str:
+    """Nombre de una función en el perfil: función (archivo:línea de definición)"""
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo de un hilo
+
+    Un hilo de fondo lee la pila del hilo perfilado cada `interval` segundos
+    (sys._current_frames) y cuenta cuántas veces aparece cada pila. El costo no
+    depende de la cantidad de llamadas, por lo que se puede usar con cargas
+    reales. Las corrutinas del event loop de process_urls aparecen en la pila
+    del hilo que ejecuta el loop.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Toma una muestra de la pila del hilo perfilado"""
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """
+        Pilas en formato "collapsed" (raíz;...;hoja cantidad)
+
+        Es el formato de entrada de flamegraph.pl y speedscope.
+        """
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """
+        Funciones con más muestras propias (en la hoja) y totales (en la pila)
+
+        Returns:
+            List[Dict[str, Any]]: Función, muestras propias y totales, ordenadas por las totales
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        return [
+            {"function": function, "own_samples": own[function], "total_samples": samples}
+            for function, samples in total.most_common(limit)
+        ]
+
+def _profile_paths(directory: str, task_id: str) -> Tuple[str, str]:
+    """Rutas del perfil (.folded) y de sus metadatos (.json) de una tarea"""
+    return os.path.join(directory, f"{task_id}.folded"), os.path.join(directory, f"{task_id}.json")
+
+def save_profile(profiler: SamplingProfiler, directory: str, task_id: str, task_name: str,
+                 args: Optional[List[Any]] = None) -> str:
+    """
+    Guarda el perfil de una tarea y un resumen con sus funciones más costosas
+
+    Args:
+        profiler (SamplingProfiler): Profiler ya detenido
+        directory (str): Directorio compartido de perfiles
+        task_id (str): ID de la tarea
+        task_name (str): Nombre de la tarea
+        args (List, optional): Argumentos de la tarea
+
+    Returns:
+        str: Ruta del archivo .folded
+    """
+    os.makedirs(directory, exist_ok=True)
+    folded_path, metadata_path = _profile_paths(directory, task_id)
+    with open(folded_path, "w", encoding="utf-8") as folded_file:
+        folded_file.write(profiler.collapsed())
+
+    metadata = {
+        "task_id": task_id,
+        "task_name": task_name,
+        "args": json.loads(json.dumps(list(args or []), default=str)),
+        "created_at": datetime.utcnow().isoformat(),
+        "seconds": round(profiler.elapsed, 3),
+        "samples": profiler.samples,
+        "interval_ms": profiler.interval * 1000,
+        "top_functions": profiler.top_functions(),
+    }
+    with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+    return folded_path
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    """
+    Perfiles guardados en el directorio, del más reciente al más antiguo
+
+    Returns:
+        List[Dict[str, Any]]: Metadatos de cada perfil (sin las funciones más costosas)
+    """
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer el perfil {name}: {str(e)}")
+            continue
+        metadata.pop("top_functions", None)
+        profiles.append(metadata)
+    profiles.sort(key=lambda profile: profile.get("created_at", ""), reverse=True)
+    return profiles
+
+def profile_path(directory: str, task_id: str, kind: str = "folded") -> Optional[str]:
+    """
+    Ruta del perfil (folded) o de su resumen (json) de una tarea
+
+    Returns:
+        Optional[str]: Ruta, o None si el ID no es válido o el perfil no existe
+    """
+    if not TASK_ID_PATTERN.match(task_id):
+        return None
+    folded_path, metadata_path = _profile_paths(directory, task_id)
+    path = metadata_path if kind == "json" else folded_path
+    return path if os.path.isfile(path) else None
+
+# Profiler de cada tarea en curso del proceso, por task_id
+_task_profilers: Dict[str, SamplingProfiler] = {}
+
+def _requested(task: Any) -> bool:
+    """Si el mensaje de la tarea trae el header que activa el perfil"""
+    request = task.request
+    value = getattr(request, PROFILE_HEADER, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(PROFILE_HEADER)
+    return str(value).lower() in ("1", "true")
+
+def task_started(task_id: str, task: Any):
+    """Inicia el profiler si la tarea se puede perfilar y el perfil está activado"""
+    from .settings import PROFILING_ENABLED, PROFILING_INTERVAL_MS
+
+    if task.name not in PROFILED_TASKS or not (PROFILING_ENABLED or _requested(task)):
+        return
+    profiler = SamplingProfiler(PROFILING_INTERVAL_MS / 1000)
+    profiler.start()
+    _task_profilers[task_id] = profiler
+    logger.info(f"Perfilando la tarea {task.name} [{task_id}] cada {PROFILING_INTERVAL_MS} ms")
+
+def task_finished(task_id: str, task: Any, args: Optional[List[Any]] = None):
+    """Detiene el profiler de la tarea y guarda su perfil en el directorio compartido"""
+    from .settings import PROFILES_DIR
+
+    profiler = _task_profilers.pop(task_id, None)
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        path = save_profile(profiler, PROFILES_DIR, task_id, task.name, args)
+        logger.info(f"Perfil de la tarea {task_id} guardado en {path} ({profiler.samples} muestras)")
+    except OSError as e:
+        logger.error(f"No se pudo guardar el perfil de la tarea {task_id}: {str(e)}")
+
+def inject_headers(headers: Dict[str, Any]):
+    """Propaga el perfil a las sub-tareas que encola una tarea perfilada (bloques del chord)"""
+    if any(profiler.thread_id == threading.get_ident() for profiler in _task_profilers.values()):
+        headers[PROFILE_HEADER] = True
@@ -2,9 +2,12 @@ import os
 import logging
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .apps.db_pool import engine_options, instrument_engine
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +29,24 @@ if not os.getenv('DOCKER_ENV') and POSTGRES_HOST == "localhost":
     POSTGRES_PORT = "9040"
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Misma base de datos con el driver asíncrono (asyncpg), usada por los endpoints de la API
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+
+# Pool de conexiones por proceso: cada hijo prefork del worker tiene el suyo, por lo
+# que el máximo de conexiones es procesos x (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+# Con DB_PGBOUNCER=true el pool lo hace PgBouncer y cada proceso usa NullPool.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+# Configuración de Redis (broker de Celery, pub/sub y coordinación entre workers)
+# Usar diferentes URLs según el entorno (Docker vs local)
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = os.getenv('REDIS_PORT', '9050')
+REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
 
 # Configuración CORS
 # Permitir orígenes específicos desde variables de entorno
@@ -33,6 +54,105 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 # Limpiar espacios en blanco de cada origen
 CORS_ORIGINS = [origin.strip() for origin in CORS_ORIGINS]
 
+# Configuración del scraping
+# Número de peticiones HTTP en vuelo por tarea de Celery
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "10"))
+# Archivos con más URLs que este valor se dividen en bloques (sub-tareas de Celery)
+FILE_CHUNK_SIZE = int(os.getenv("FILE_CHUNK_SIZE", "200"))
+
+# Límite de peticiones por host compartido entre todos los workers (en Redis)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Peticiones por segundo y ráfaga máxima por host
+RATE_LIMIT_DEFAULT_RATE = float(os.getenv("RATE_LIMIT_DEFAULT_RATE", "5"))
+RATE_LIMIT_DEFAULT_BURST = int(os.getenv("RATE_LIMIT_DEFAULT_BURST", "10"))
+# Peticiones simultáneas por host (0 = sin límite)
+RATE_LIMIT_DEFAULT_CONCURRENCY = int(os.getenv("RATE_LIMIT_DEFAULT_CONCURRENCY", "8"))
+# Límites específicos: "host=rate:burst:concurrency,host2=rate"
+RATE_LIMIT_HOSTS = os.getenv("RATE_LIMIT_HOSTS", "")
+
+# Caché de peticiones condicionales (ETag / Last-Modified) por URL
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_TTL_DAYS = int(os.getenv("HTTP_CACHE_TTL_DAYS", "30"))
+
+# Horas durante las que un scrape exitoso se reutiliza en otros archivos (0 = deshabilitado)
+REUSE_FRESHNESS_HOURS = float(os.getenv("REUSE_FRESHNESS_HOURS", "24"))
+
+# Escritura por lotes de la tabla links: filas por lote y segundos máximos entre lotes
+LINK_BATCH_SIZE = int(os.getenv("LINK_BATCH_SIZE", "100"))
+LINK_BATCH_SECONDS = float(os.getenv("LINK_BATCH_SECONDS", "5"))
+# Backend de parseo HTML: bs4 (html.parser), lxml, selectolax o single_pass
+# (extracción en una sola pasada sin construir el árbol)
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "bs4")
+# Archivo comprimido de las respuestas descargadas en el volumen compartido
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE_ENABLED", "false").lower() == "true"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "/app/shared/archive")
+PAGE_ARCHIVE_COMPRESSION = os.getenv("PAGE_ARCHIVE_COMPRESSION", "zstd")
+PAGE_ARCHIVE_SEGMENT_MB = int(os.getenv("PAGE_ARCHIVE_SEGMENT_MB", "256"))
+# Páginas archivadas por cada commit del índice SQLite
+PAGE_ARCHIVE_INDEX_BATCH = int(os.getenv("PAGE_ARCHIVE_INDEX_BATCH", "100"))
+# Conexiones HTTP compartidas por cada proceso worker
+# Pool de requests: hosts con pool propio y conexiones reutilizables por host
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "20"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+# Pool de httpx: conexiones totales, conexiones inactivas y segundos que se mantienen abiertas
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# Timeouts separados de conexión y de lectura (segundos)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+# Límites de cada descarga: tamaño máximo del cuerpo, tipos de contenido aceptados
+# y tiempo total máximo (segundos, 0 = sin límite; aparte del timeout de lectura,
+# que solo limita la espera entre bytes)
+MAX_RESPONSE_BYTES = int(os.getenv("MAX_RESPONSE_BYTES", str(5 * 1024 * 1024)))
+ALLOWED_CONTENT_TYPES = [
+    content_type.strip().lower()
+    for content_type in os.getenv("ALLOWED_CONTENT_TYPES", "text/html,application/xhtml+xml").split(",")
+    if content_type.strip()
+]
+DOWNLOAD_MAX_SECONDS = float(os.getenv("DOWNLOAD_MAX_SECONDS", "60"))
+# Dejar de guardar el cuerpo cuando ya se vieron todos los campos que se extraen.
+# La descarga sigue hasta el final para buscar el mensaje de página no encontrada,
+# y solo aplica con un backend con parseo incremental (single_pass); con los demás
+# se guarda el cuerpo completo. EARLY_STOP_ENABLED es el nombre anterior.
+STOP_BUFFERING_AFTER_FIELDS = os.getenv(
+    "STOP_BUFFERING_AFTER_FIELDS", os.getenv("EARLY_STOP_ENABLED", "true")
+).lower() == "true"
+# HTML completo en el resultado del scraping: off, raw (bytes) o lazy (serializado al usarse)
+HTML_CONTENT_MODE = os.getenv("HTML_CONTENT_MODE", "off")
+# Puerto del exporter de Prometheus del worker de Celery (0 = deshabilitado)
+METRICS_WORKER_PORT = int(os.getenv("METRICS_WORKER_PORT", "9101"))
+# Reintentos de fallos transitorios (red, timeouts, 5xx y 429) con backoff exponencial y jitter
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+# Circuit breaker por host: se abre cuando la proporción de fallos transitorios
+# entre los últimos CIRCUIT_WINDOW resultados supera CIRCUIT_FAILURE_RATIO
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_REQUESTS = int(os.getenv("CIRCUIT_MIN_REQUESTS", "5"))
+CIRCUIT_FAILURE_RATIO = float(os.getenv("CIRCUIT_FAILURE_RATIO", "0.5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+# Tracing por fase (OpenTelemetry): exporter file (JSON lines en TRACING_DIR),
+# otlp (OTEL_EXPORTER_OTLP_ENDPOINT) o console, y proporción de trazas muestreadas
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")
+TRACING_DIR = os.getenv("TRACING_DIR", "/app/shared/traces")
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+# Perfil por muestreo de las tareas de archivos: para todas (PROFILING_ENABLED) o solo las
+# encoladas con el header "profile"; se guarda por task_id en PROFILES_DIR
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILES_DIR = os.getenv("PROFILES_DIR", "/app/shared/profiles")
+# Eventos de progreso por archivo en Redis (pub/sub) para GET /progress/{file_id}:
+# segundos mínimos entre eventos de una tarea y entre comentarios keep-alive del stream SSE
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("PROGRESS_INTERVAL_SECONDS", "0.5"))
+PROGRESS_KEEPALIVE_SECONDS = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+# Lease por archivo en Redis: la tarea que lo procesa lo renueva mientras trabaja y
+# POST /process con resume=true solo se acepta cuando venció (el worker anterior murió)
+FILE_LEASE_SECONDS = float(os.getenv("FILE_LEASE_SECONDS", "120"))
+
 # Log de la configuración para debugging
 logger.info(f"Configuración de base de datos:")
 logger.info(f"  - Host: {POSTGRES_HOST}")
@@ -40,15 +160,47 @@ logger.info(f"  - Puerto: {POSTGRES_PORT}")
 logger.info(f"  - Base de datos: {POSTGRES_DB}")
 logger.info(f"  - Usuario: {POSTGRES_USER}")
 logger.info(f"  - Entorno Docker: {bool(os.getenv('DOCKER_ENV'))}")
+logger.info(f"  - Pool por proceso: {'NullPool (PgBouncer)' if DB_PGBOUNCER else f'{DB_POOL_SIZE} + {DB_MAX_OVERFLOW} conexiones, espera {DB_POOL_TIMEOUT} s, reciclado {DB_POOL_RECYCLE} s'}, pre-ping {DB_POOL_PRE_PING}")
 logger.info(f"Configuración CORS:")
 logger.info(f"  - Orígenes permitidos: {CORS_ORIGINS}")
+logger.info(f"Configuración del scraping:")
+logger.info(f"  - Concurrencia por tarea: {SCRAPER_CONCURRENCY}")
+logger.info(f"  - Tamaño de bloque por archivo: {FILE_CHUNK_SIZE}")
+logger.info(f"  - Límite por host: {RATE_LIMIT_DEFAULT_RATE} req/s (habilitado: {RATE_LIMIT_ENABLED})")
+logger.info(f"  - Caché HTTP condicional: {HTTP_CACHE_ENABLED} ({HTTP_CACHE_TTL_DAYS} días)")
+logger.info(f"  - Reutilización de resultados: {REUSE_FRESHNESS_HOURS} horas")
+logger.info(f"  - Lotes de links: {LINK_BATCH_SIZE} filas / {LINK_BATCH_SECONDS} s")
+logger.info(f"  - Backend de parseo HTML: {HTML_PARSER_BACKEND}")
+logger.info(f"  - Conservación de html_content: {HTML_CONTENT_MODE}")
+logger.info(f"  - Conexiones HTTP: pool {HTTP_POOL_CONNECTIONS} hosts x {HTTP_POOL_MAXSIZE}, máximo {HTTP_MAX_CONNECTIONS} (keep-alive {HTTP_MAX_KEEPALIVE} / {HTTP_KEEPALIVE_EXPIRY} s), HTTP/2 {HTTP2_ENABLED}")
+logger.info(f"  - Timeouts HTTP: conexión {HTTP_CONNECT_TIMEOUT} s / lectura {HTTP_READ_TIMEOUT} s")
+logger.info(f"  - Descargas: máximo {MAX_RESPONSE_BYTES} bytes, tipos {ALLOWED_CONTENT_TYPES}, máximo {DOWNLOAD_MAX_SECONDS} s, dejar de guardar tras los campos {STOP_BUFFERING_AFTER_FIELDS}")
+logger.info(f"  - Exporter de métricas del worker: {METRICS_WORKER_PORT or 'deshabilitado'}")
+logger.info(f"  - Reintentos: {RETRY_MAX_ATTEMPTS} intentos, backoff {RETRY_BASE_DELAY}-{RETRY_MAX_DELAY} s")
+logger.info(f"  - Circuit breaker por host: {CIRCUIT_BREAKER_ENABLED} ({CIRCUIT_FAILURE_RATIO:.0%} de fallos en {CIRCUIT_WINDOW} peticiones, abierto {CIRCUIT_OPEN_SECONDS} s)")
+logger.info(f"  - Tracing: {TRACING_EXPORTER + ' (muestreo ' + str(TRACING_SAMPLE_RATIO) + ')' if TRACING_ENABLED else 'deshabilitado'}")
+logger.info(f"  - Perfil de tareas: {'todas' if PROFILING_ENABLED else 'solo con header'} cada {PROFILING_INTERVAL_MS} ms en {PROFILES_DIR}")
+logger.info(f"  - Eventos de progreso: cada {PROGRESS_INTERVAL_SECONDS} s como máximo (keep-alive SSE {PROGRESS_KEEPALIVE_SECONDS} s)")
+logger.info(f"  - Lease de archivos en proceso: {FILE_LEASE_SECONDS} s")
+logger.info(f"  - Archivo de páginas: {'habilitado en ' + PAGE_ARCHIVE_DIR + ' (' + PAGE_ARCHIVE_COMPRESSION + ', índice cada ' + str(PAGE_ARCHIVE_INDEX_BATCH) + ' páginas)' if PAGE_ARCHIVE_ENABLED else 'deshabilitado'}")
 
 # Crear el motor de SQLAlchemy
-engine = create_engine(DATABASE_URL)
+DB_POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE, pre_ping=DB_POOL_PRE_PING, pgbouncer=DB_PGBOUNCER
+)
+DB_POOL_CAPACITY = 0 if DB_PGBOUNCER else DB_POOL_SIZE + DB_MAX_OVERFLOW
+engine = create_engine(DATABASE_URL, **engine_options(**DB_POOL_OPTIONS))
+instrument_engine(engine, "sync", DB_POOL_CAPACITY)
 
 # Crear la clase SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Motor y sesiones asíncronas para la API: las consultas no bloquean el event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(async_driver=True, **DB_POOL_OPTIONS))
+instrument_engine(async_engine.sync_engine, "async", DB_POOL_CAPACITY)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Crear la clase base para los modelos
 Base = declarative_base()
 
@@ -58,4 +210,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependencia para obtener la sesión asíncrona de base de datos (endpoints de la API)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
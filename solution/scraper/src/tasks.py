@@ -1,31 +1,46 @@
-from celery import Celery
+from celery import Celery, chord
+from celery.signals import (
+    before_task_publish, task_prerun, task_postrun, worker_init, worker_process_init, worker_process_shutdown
+)
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 from datetime import datetime
 import os
+import uuid
 import logging
 import redis
 import json
-from typing import List
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
-from .settings import get_db, SessionLocal
+from .settings import (
+    get_db, engine, SessionLocal, SCRAPER_CONCURRENCY, FILE_CHUNK_SIZE, REUSE_FRESHNESS_HOURS,
+    LINK_BATCH_SIZE, LINK_BATCH_SECONDS,
+    REDIS_HOST, REDIS_PORT, REDIS_URL, METRICS_WORKER_PORT
+)
 from .models import File, Link
 from .apps.scraper import WebScraper
+from .apps.async_scraper import AsyncWebScraper
+from .apps.rate_limiter import get_rate_limiter
+from .apps.http_cache import get_validator_cache
+from .apps.reuse import find_reusable_results, normalize_url
+from .apps.link_writer import LinkBatchWriter
+from .apps.url_reader import UrlFileReader
+from .apps.checkpoint import get_checkpoint, get_file_lease, find_done_urls
+from .apps.archive import get_page_archive, flush_page_archive, close_page_archive
+from .apps.dates import parse_post_date
+from .apps.resilience import get_retry_policy, get_circuit_breaker, resilience_counters
+from .apps.download import ERROR_UNEXPECTED
+from .apps.db_pool import dispose_after_fork
+from .apps.progress import ProgressPublisher, get_progress_publisher
+from . import metrics, profiling, tracing
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configuración de Celery con Redis
-# Usar diferentes URLs según el entorno (Docker vs local)
-import os
-REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
-REDIS_PORT = os.getenv('REDIS_PORT', '9050')
-REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
-
-# Para Docker, usar el nombre del servicio configurado en variables de entorno
-if os.getenv('DOCKER_ENV'):
-    REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
-
+# Configuración de Celery con Redis (ver REDIS_URL en settings)
 app = Celery(
     'scraper_tasks',
     broker=REDIS_URL,
@@ -47,6 +62,57 @@ app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Inicia el exporter de Prometheus y el tracing en el proceso principal del worker"""
+    metrics.start_worker_exporter(METRICS_WORKER_PORT)
+    tracing.setup_tracing("scraper-worker")
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Cada proceso hijo prefork abre sus propias conexiones a la base de datos"""
+    dispose_after_fork(engine)
+
+@worker_process_shutdown.connect
+def discard_process_metrics(pid=None, **kwargs):
+    """Descarta los gauges del proceso hijo que termina"""
+    metrics.mark_process_dead(pid or os.getpid())
+
+@worker_process_shutdown.connect
+def close_archive(**kwargs):
+    """Confirma el último lote del índice del archivo de páginas y cierra sus segmentos"""
+    close_page_archive()
+
+@before_task_publish.connect
+def propagate_trace_context(headers=None, **kwargs):
+    """
+    Envía en los headers el contexto de tracing actual (la petición a la API o la
+    tarea que encola) y, desde una tarea perfilada, el header de perfil
+    """
+    if headers is not None:
+        tracing.inject_headers(headers)
+        profiling.inject_headers(headers)
+
+@task_prerun.connect
+def track_task_start(task_id=None, task=None, args=None, **kwargs):
+    metrics.task_started(task_id, task.name)
+    tracing.task_span_start(task_id, task, args)
+    profiling.task_started(task_id, task)
+
+@task_postrun.connect
+def flush_archive_index(**kwargs):
+    """Confirma al terminar cada tarea las páginas archivadas que quedaron fuera de un lote"""
+    flush_page_archive()
+
+@task_postrun.connect
+def track_task_end(task_id=None, task=None, args=None, state=None, **kwargs):
+    profiling.task_finished(task_id, task, args)
+    metrics.task_finished(task_id, task.name, state)
+    tracing.task_span_end(task_id, state)
+
+# URLs que se leen del archivo por vez (búsqueda de reutilización y descarga)
+URL_WINDOW_SIZE = 500
+
 def publish_processing_complete(file_id: int, email: str, results: dict):
     """
     Publica un mensaje en Redis cuando se completa el procesamiento
@@ -75,45 +141,285 @@ def publish_processing_complete(file_id: int, email: str, results: dict):
         
         # Publicar en el canal "processing_complete"
         channel = "processing_complete"
-        redis_client.publish(channel, json.dumps(message))
+        with tracing.start_span("redis.publish", channel=channel, file_id=file_id):
+            redis_client.publish(channel, json.dumps(message))
         
         logger.info(f"Mensaje publicado en Redis - Canal: {channel}, File ID: {file_id}, Email: {email}")
         
     except Exception as e:
         logger.error(f"Error al publicar en Redis: {str(e)}")
 
-def read_urls_from_file(file_path: str) -> List[str]:
+def build_link_row(url: str, result: dict) -> dict:
+    """
+    Convierte el resultado de un scraping en las columnas de un registro Link
+    
+    Args:
+        url (str): URL procesada
+        result (dict): Resultado de scrape_website
+        
+    Returns:
+        dict: Columnas del registro (sin file_id)
+    """
+    return {
+        "url": url,
+        "title": result.get('title'),
+        "post_date": parse_post_date(result.get('date'), url),
+        "content": result.get('content'),
+        "page_exists": result.get('page_exists', False),
+        "success": result.get('success', False),
+        "error_description": result.get('error') if not result.get('success') else None,
+        # Los resultados reutilizados conservan la fecha del scrape original
+        "processed_date": result.get('processed_date') or datetime.utcnow()
+    }
+
+def _windows(items: Iterable, size: int) -> Iterator[list]:
+    """Agrupa un iterable en listas de hasta `size` elementos sin materializarlo"""
+    iterator = iter(items)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+def process_urls(db: Session, file_id: int, entries: Iterable[Tuple[int, str]], total: Optional[int] = None,
+                 progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                 checkpoint_callback: Optional[Callable[[int], None]] = None,
+                 progress: Optional[ProgressPublisher] = None, resume: bool = False,
+                 heartbeat: Optional[Callable[[], None]] = None) -> Tuple[int, int]:
     """
-    Lee las URLs de un archivo de texto o CSV
+    Scrapea URLs y guarda un registro Link por cada una
+    
+    Las URLs se consumen por ventanas de URL_WINDOW_SIZE, por lo que la memoria
+    usada no depende del tamaño del archivo. Los registros se guardan por lotes
+    con LinkBatchWriter. Cada URL del archivo produce un Link, aunque esté
+    repetida: lo ya procesado se identifica por el offset del checkpoint.
+    
+    Solo al reanudar, la primera ventana puede tener links guardados por una
+    ejecución anterior que murió antes de confirmar su checkpoint; en esa
+    ventana se omiten las URLs que ya tienen un Link en el archivo.
+    
+    Args:
+        db (Session): Sesión de base de datos
+        file_id (int): ID del archivo al que pertenecen las URLs
+        entries (Iterable[Tuple[int, str]]): Pares (offset, url) a procesar
+            (puede ser un generador)
+        total (int, optional): Total de URLs, solo para los logs de progreso
+        progress_callback (Callable, optional): Función llamada en cada lote
+            guardado con (actual, procesadas, fallidas)
+        checkpoint_callback (Callable, optional): Función llamada al confirmar
+            cada ventana con el offset de su última URL
+        progress (ProgressPublisher, optional): Publica en Redis el avance del
+            archivo tras cada URL (limitado por PROGRESS_INTERVAL_SECONDS)
+        resume (bool): Si es True, entries continúa justo después del último
+            checkpoint y se revisa su primera ventana con find_done_urls
+        heartbeat (Callable, optional): Función llamada tras cada URL para
+            renovar el lease del archivo (ver FileLease.heartbeat)
+        
+    Returns:
+        Tuple[int, int]: Cantidad de URLs procesadas y fallidas en esta ejecución
     """
-    urls = []
+    scraper = AsyncWebScraper(
+        concurrency=SCRAPER_CONCURRENCY,
+        rate_limiter=get_rate_limiter(),
+        cache=get_validator_cache(),
+        archive=get_page_archive(),
+        retry_policy=get_retry_policy(),
+        circuit_breaker=get_circuit_breaker()
+    )
+    writer = LinkBatchWriter(
+        db, file_id,
+        max_rows=LINK_BATCH_SIZE,
+        max_seconds=LINK_BATCH_SECONDS,
+        on_flush=progress_callback
+    )
+    
+    for index, window in enumerate(_windows(entries, URL_WINDOW_SIZE)):
+        with tracing.start_span("urls.window", file_id=file_id, urls=len(window)) as span:
+            # Omitir las URLs de la ventana sin checkpoint que ya guardó la ejecución anterior
+            done = find_done_urls(db, file_id, (url for _, url in window)) if resume and index == 0 else set()
+            if done:
+                logger.info(f"Se omiten {len(done)} URLs ya procesadas del archivo {file_id}")
+            urls = [url for _, url in window if url not in done]
+            
+            # Reutilizar scrapes exitosos recientes de cualquier archivo en lugar de descargar
+            reusable = find_reusable_results(db, urls, REUSE_FRESHNESS_HOURS)
+            reused = [(url, reusable[normalize_url(url)]) for url in urls if normalize_url(url) in reusable]
+            pending = [url for url in urls if normalize_url(url) not in reusable]
+            span.set_attributes({"urls.skipped": len(done), "urls.reused": len(reused), "urls.pending": len(pending)})
+            
+            for url, result in chain(reused, scraper.scrape_iter(pending)):
+                _store_result(writer, url, result, total)
+                if progress:
+                    progress.report(*writer.file_counts())
+                if heartbeat:
+                    heartbeat()
+            
+            # Confirmar la ventana completa antes de avanzar el checkpoint
+            writer.flush()
+            if checkpoint_callback:
+                checkpoint_callback(window[-1][0])
+    
+    logger.info(f"Contadores de reintentos y circuit breaker del proceso: {resilience_counters.snapshot()}")
+    return writer.processed, writer.failed
+
+def _store_result(writer: LinkBatchWriter, url: str, result: dict, total: Optional[int]):
+    """Agrega al lote el registro Link correspondiente a un resultado de scraping"""
+    current = writer.written + len(writer.rows) + 1
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                url = line.strip()
-                if url and url.startswith('http'):  # Validación básica de URL
-                    urls.append(url)
-        logger.info(f"Se encontraron {len(urls)} URLs en el archivo {file_path}")
-        return urls
-    except Exception as e:
-        logger.error(f"Error al leer el archivo {file_path}: {str(e)}")
+        logger.info(f"Procesando URL {current}/{total or '?'}: {url}")
+        row = build_link_row(url, result)
+        metrics.record_url_result(result)
+        
+        if result.get('success'):
+            if result.get('reused_link_id'):
+                logger.info(f"URL reutilizada del link {result['reused_link_id']}: {url}")
+            else:
+                logger.info(f"URL procesada exitosamente: {url}")
+        else:
+            logger.warning(f"Error al procesar URL {url}: {result.get('error')}")
+            
+    except SoftTimeLimitExceeded:
         raise
+    except Exception as e:
+        logger.error(f"Error inesperado al procesar URL {url}: {str(e)}")
+        metrics.record_url_result({"success": False, "error_category": ERROR_UNEXPECTED})
+        
+        # Crear registro de error
+        row = {
+            "url": url,
+            "title": None,
+            "post_date": None,
+            "content": None,
+            "page_exists": False,
+            "success": False,
+            "error_description": f"Error en el procesamiento: {str(e)}",
+            "processed_date": datetime.utcnow()
+        }
+    
+    writer.add(row)
 
-@app.task(bind=True)
-def process_file_task(self, file_id: int, email: str):
+def finalize_file(db: Session, file_id: int, email: str, total_urls: int, lease_owner: Optional[str] = None) -> dict:
+    """
+    Marca el archivo como procesado y notifica por Redis
+    
+    Los totales se leen de los contadores del archivo, que se actualizan en la
+    misma transacción que cada lote de links; así también son exactos cuando
+    el archivo se reanudó tras una caída.
+    
+    Returns:
+        dict: Resumen del procesamiento
+    """
+    file_record = db.query(File).filter(File.id == file_id).first()
+    file_record.status = "PROCESSED"
+    db.commit()
+    get_checkpoint(file_id).clear()
+    get_file_lease(file_id).release(lease_owner)
+    
+    result_summary = {
+        "success": True,
+        "file_id": file_id,
+        "total_urls": total_urls,
+        "processed": file_record.total_processed,
+        "failed": file_record.total_failed,
+        "status": "PROCESSED"
+    }
+
+    # Publicar en Redis que el procesamiento ha terminado
+    publish_processing_complete(file_id, email, result_summary)
+    get_progress_publisher(file_id, total_urls).publish(
+        "PROCESSED", file_record.total_processed, file_record.total_failed
+    )
+    
+    logger.info(f"Procesamiento completado para archivo {file_id}: {result_summary}")
+    return result_summary
+
+def _mark_file_error(db: Session, file_id: int, error: Optional[str] = None, lease_owner: Optional[str] = None):
+    """Actualiza el estado del archivo a ERROR y libera su lease sin propagar excepciones"""
+    try:
+        db.rollback()
+        file_record = db.query(File).filter(File.id == file_id).first()
+        if file_record:
+            file_record.status = "ERROR"
+            db.commit()
+    except Exception:
+        logger.exception(f"No se pudo marcar el archivo {file_id} como ERROR")
+    get_file_lease(file_id).release(lease_owner)
+    get_progress_publisher(file_id).publish("ERROR", error=error)
+
+def _process_range(db: Session, file_id: int, file_path: str, start: int, end: Optional[int],
+                   total: int, progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                   progress: Optional[ProgressPublisher] = None, resume: bool = False,
+                   heartbeat: Optional[Callable[[], None]] = None) -> Tuple[int, int]:
+    """
+    Procesa un rango de bytes del archivo retomando desde su checkpoint
+    
+    El checkpoint guarda el offset de la última URL confirmada, que se
+    descarta al releer: la lectura sigue exactamente donde empezaba la
+    ventana sin confirmar.
+    
+    Args:
+        db (Session): Sesión de base de datos
+        file_id (int): ID del archivo
+        file_path (str): Ruta del archivo de URLs
+        start (int): Offset donde comienza el rango (identifica el checkpoint)
+        end (int, optional): Offset donde termina el rango (exclusivo)
+        total (int): Cantidad de URLs del rango
+        progress_callback (Callable, optional): Ver process_urls
+        progress (ProgressPublisher, optional): Ver process_urls
+        resume (bool): Si es True el rango pudo ejecutarse antes (ver process_urls)
+        heartbeat (Callable, optional): Ver process_urls
+        
+    Returns:
+        Tuple[int, int]: Cantidad de URLs procesadas y fallidas en esta ejecución
+    """
+    checkpoint = get_checkpoint(file_id)
+    resume_from = checkpoint.get(start)
+    if resume_from is not None:
+        logger.info(f"Reanudando el archivo {file_id} desde el offset {resume_from} (bloque {start})")
+    
+    if resume_from is None:
+        entries = UrlFileReader(file_path).iter_urls(start, end)
+    else:
+        entries = islice(UrlFileReader(file_path).iter_urls(resume_from, end), 1, None)
+    return process_urls(
+        db, file_id, entries, total, progress_callback,
+        checkpoint_callback=lambda offset: checkpoint.save(start, offset),
+        progress=progress, resume=resume, heartbeat=heartbeat
+    )
+
+@app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_file_task(self, file_id: int, email: str, resume: bool = False):
     """
     Tarea principal que procesa un archivo completo de URLs
     
+    Los archivos con más de FILE_CHUNK_SIZE URLs se dividen en bloques que se
+    despachan como un chord de Celery: cualquier worker puede tomar un bloque
+    y finalize_file_task consolida los resultados al terminar todos.
+    
+    El progreso se guarda por checkpoints: si el worker muere la tarea se
+    vuelve a entregar (acks_late) y continúa donde quedó, y al alcanzar el
+    límite blando de tiempo se reprograma a sí misma en modo reanudación.
+    Un mensaje reentregado, o uno que encuentra el archivo en PROCESSING con
+    checkpoint, siempre se trata como reanudación: nunca borra los links, los
+    contadores ni el checkpoint, ni vuelve a despachar un chord ya despachado.
+    
+    Mientras trabaja, la tarea (o los bloques de su chord) renueva el lease
+    del archivo; si otra tarea tiene el lease vigente no procesa nada.
+    
     Args:
         file_id (int): ID del archivo en la base de datos
         email (str): Email para notificación de finalización
+        resume (bool): Si es True conserva los links y contadores existentes y
+            continúa desde los checkpoints en lugar de empezar de cero
         
     Returns:
         dict: Resultado del procesamiento
     """
     db = SessionLocal()
+    lease_owner = None
     try:
-        logger.info(f"Iniciando procesamiento del archivo con ID: {file_id}")
+        logger.info(f"Iniciando procesamiento del archivo con ID: {file_id} (reanudar: {resume})")
+        tracing.set_attributes(file_id=file_id)
         
         # Buscar el archivo en la base de datos
         file_record = db.query(File).filter(File.id == file_id).first()
@@ -122,162 +428,261 @@ def process_file_task(self, file_id: int, email: str):
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
         
+        # Las reentregas y reintentos conservan el ID de la tarea, y con él el lease
+        lease = get_file_lease(file_id)
+        lease_owner = self.request.id or uuid.uuid4().hex
+        if not lease.acquire(lease_owner):
+            error_msg = f"El archivo con ID {file_id} está siendo procesado por otra tarea"
+            logger.warning(error_msg)
+            return {"success": False, "error": error_msg}
+        
+        checkpoint = get_checkpoint(file_id)
+        delivery_info = self.request.delivery_info or {}
+        redelivered = bool(delivery_info.get("redelivered")) or (
+            not resume and file_record.status == "PROCESSING" and checkpoint.exists()
+        )
+        if redelivered and not resume:
+            # El worker anterior murió a mitad del archivo: continuar donde quedó
+            logger.warning(f"El archivo {file_id} ya estaba en proceso, se reanudará desde el checkpoint")
+            resume = True
+        
         # Actualizar el estado a "PROCESSING"
         file_record.status = "PROCESSING"
         db.commit()
         logger.info(f"Estado del archivo {file_id} actualizado a PROCESSING")
         
-        # Leer las URLs del archivo
+        # Contar las URLs del archivo sin cargarlas en memoria
+        reader = UrlFileReader(file_record.file_path)
         try:
-            urls = read_urls_from_file(file_record.file_path)
+            with tracing.start_span("file.read", file_id=file_id, path=file_record.file_path) as span:
+                total_urls, chunk_ranges = reader.scan(FILE_CHUNK_SIZE)
+                span.set_attribute("urls", total_urls)
         except Exception as e:
             file_record.status = "ERROR"
             db.commit()
             error_msg = f"Error al leer el archivo: {str(e)}"
             logger.error(error_msg)
+            lease.release(lease_owner)
+            get_progress_publisher(file_id).publish("ERROR", error=error_msg)
             return {"success": False, "error": error_msg}
         
-        if not urls:
+        if not total_urls:
             file_record.status = "ERROR"
             db.commit()
             error_msg = "No se encontraron URLs válidas en el archivo"
             logger.error(error_msg)
+            lease.release(lease_owner)
+            get_progress_publisher(file_id).publish("ERROR", error=error_msg)
             return {"success": False, "error": error_msg}
         
-        # Actualizar el total de links en el archivo
-        file_record.total_links = len(urls)
+        file_record.total_links = total_urls
+        if not resume:
+            # Un procesamiento nuevo reemplaza los resultados anteriores del archivo
+            db.query(Link).filter(Link.file_id == file_id).delete(synchronize_session=False)
+            file_record.total_processed = 0
+            file_record.total_failed = 0
+            checkpoint.clear()
         db.commit()
         
-        # Procesar cada URL
-        scraper = WebScraper()
-        processed_count = 0
-        failed_count = 0
-        
-        for i, url in enumerate(urls, 1):
-            try:
-                logger.info(f"Procesando URL {i}/{len(urls)}: {url}")
-                
-                # Realizar el scraping
-                result = scraper.scrape_website(url)
-                
-                # Procesar la fecha si existe
-                post_date = None
-                if result.get('date'):
-                    try:
-                        date_str = result.get('date')
-                        # Manejar diferentes formatos de fecha
-                        if 'T' in date_str:
-                            if date_str.endswith('Z'):
-                                date_str = date_str.replace('Z', '+00:00')
-                            post_date = datetime.fromisoformat(date_str)
-                        else:
-                            # Si no tiene formato ISO, intentar parsearlo como string
-                            from dateutil import parser
-                            post_date = parser.parse(date_str)
-                    except Exception as date_error:
-                        logger.warning(f"Error al parsear fecha '{result.get('date')}': {date_error}")
-                        post_date = None
-                
-                # Crear nuevo registro en la tabla links
-                link_record = Link(
-                    file_id=file_id,
-                    url=url,
-                    title=result.get('title'),
-                    post_date=post_date,
-                    content=result.get('content'),
-                    page_exists=result.get('page_exists', False),
-                    success=result.get('success', False),
-                    error_description=result.get('error') if not result.get('success') else None,
-                    processed_date=datetime.utcnow()
-                )
-                
-                db.add(link_record)
-                
-                if result.get('success'):
-                    processed_count += 1
-                    logger.info(f"URL procesada exitosamente: {url}")
-                else:
-                    failed_count += 1
-                    logger.warning(f"Error al procesar URL {url}: {result.get('error')}")
-                
-                # Actualizar progreso cada 10 URLs o en la última
-                if i % 10 == 0 or i == len(urls):
-                    file_record.total_processed = processed_count
-                    file_record.total_failed = failed_count
-                    db.commit()
-                    
-                    # Actualizar progreso de la tarea
-                    progress = int((i / len(urls)) * 100)
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'current': i,
-                            'total': len(urls),
-                            'progress': progress,
-                            'processed': processed_count,
-                            'failed': failed_count
-                        }
-                    )
-                    
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Error inesperado al procesar URL {url}: {str(e)}")
-                
-                # Crear registro de error
-                link_record = Link(
-                    file_id=file_id,
-                    url=url,
-                    title=None,
-                    post_date=None,
-                    content=None,
-                    page_exists=False,
-                    success=False,
-                    error_description=f"Error en el procesamiento: {str(e)}",
-                    processed_date=datetime.utcnow()
+        # Estado inicial para los clientes de GET /progress/{file_id}
+        progress = get_progress_publisher(file_id, total_urls)
+        progress.publish("PROCESSING", file_record.total_processed, file_record.total_failed)
+        
+        if total_urls > FILE_CHUNK_SIZE:
+            callback_id = checkpoint.get_chord() if redelivered else None
+            if callback_id:
+                # Los bloques ya están en la cola; despacharlos otra vez duplicaría el trabajo
+                logger.info(f"El chord del archivo {file_id} ya fue despachado ({callback_id})")
+                return {
+                    "success": True,
+                    "file_id": file_id,
+                    "total_urls": total_urls,
+                    "chunks": len(chunk_ranges),
+                    "callback_task_id": callback_id,
+                    "status": "DISPATCHED"
+                }
+            
+            # Dividir el archivo en rangos de bytes que cualquier worker puede procesar
+            callback = chord(
+                process_chunk_task.s(
+                    file_id, index, start, end,
+                    min(FILE_CHUNK_SIZE, total_urls - index * FILE_CHUNK_SIZE),
+                    resume=resume, lease_owner=lease_owner
                 )
-                db.add(link_record)
-                
-                file_record.total_failed = failed_count
-                db.commit()
-        
-        # Actualizar estado final del archivo
-        file_record.status = "PROCESSED"
-        file_record.total_processed = processed_count
-        file_record.total_failed = failed_count
-        db.commit()
+                for index, (start, end) in enumerate(chunk_ranges)
+            )(finalize_file_task.s(file_id, email, total_urls, lease_owner=lease_owner))
+            checkpoint.save_chord(callback.id)
+            
+            logger.info(f"Archivo {file_id} dividido en {len(chunk_ranges)} bloques de hasta {FILE_CHUNK_SIZE} URLs")
+            return {
+                "success": True,
+                "file_id": file_id,
+                "total_urls": total_urls,
+                "chunks": len(chunk_ranges),
+                "callback_task_id": callback.id,
+                "status": "DISPATCHED"
+            }
         
-        result_summary = {
-            "success": True,
-            "file_id": file_id,
-            "total_urls": len(urls),
-            "processed": processed_count,
-            "failed": failed_count,
-            "status": "PROCESSED"
-        }
-
-        # Publicar en Redis que el procesamiento ha terminado
-        publish_processing_complete(file_id, email, result_summary)
+        def report_progress(current: int, processed: int, failed: int):
+            # Actualizar progreso de la tarea
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': current,
+                    'total': total_urls,
+                    'progress': int((current / total_urls) * 100),
+                    'processed': processed,
+                    'failed': failed
+                }
+            )
         
-        logger.info(f"Procesamiento completado para archivo {file_id}: {result_summary}")
-        return result_summary
+        _process_range(
+            db, file_id, file_record.file_path, 0, None, total_urls, report_progress, progress, resume,
+            heartbeat=lambda: lease.heartbeat(lease_owner)
+        )
+        return finalize_file(db, file_id, email, total_urls, lease_owner)
+        
+    except SoftTimeLimitExceeded:
+        # Continuar en una nueva ejecución desde el último checkpoint
+        logger.warning(f"Límite de tiempo alcanzado en el archivo {file_id}, se reanudará desde el checkpoint")
+        db.rollback()
+        raise self.retry(args=(file_id, email), kwargs={"resume": True}, countdown=1, max_retries=None)
         
     except Exception as e:
         logger.error(f"Error crítico en el procesamiento del archivo {file_id}: {str(e)}")
         
         # Actualizar estado a ERROR en caso de falla crítica
-        try:
-            file_record = db.query(File).filter(File.id == file_id).first()
-            if file_record:
-                file_record.status = "ERROR"
-                db.commit()
-        except:
-            pass
+        _mark_file_error(db, file_id, str(e), lease_owner)
             
         return {"success": False, "error": str(e)}
         
     finally:
         db.close()
 
+@app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_chunk_task(self, file_id: int, chunk_index: int, start: int, end: int, url_count: int,
+                       resume: bool = False, lease_owner: Optional[str] = None):
+    """
+    Tarea que procesa un bloque de URLs de un archivo
+    
+    El bloque se identifica por su rango de bytes dentro del archivo, de modo
+    que el mensaje en el broker no crece con la cantidad de URLs. Al igual que
+    process_file_task, continúa desde su checkpoint si se vuelve a ejecutar.
+    
+    Args:
+        file_id (int): ID del archivo en la base de datos
+        chunk_index (int): Posición del bloque dentro del archivo
+        start (int): Offset en bytes donde comienza el bloque
+        end (int): Offset en bytes donde termina el bloque (exclusivo)
+        url_count (int): Cantidad de URLs del bloque
+        resume (bool): Si es True el archivo se está reanudando; también se
+            considera reanudación una reentrega o un reintento del bloque
+        lease_owner (str, optional): Dueño del lease del archivo (la tarea que
+            despachó el chord); el bloque lo renueva mientras trabaja
+        
+    Returns:
+        dict: Cantidad de URLs procesadas y fallidas del bloque en esta ejecución
+    """
+    db = SessionLocal()
+    try:
+        logger.info(f"Procesando bloque {chunk_index} del archivo {file_id} ({url_count} URLs)")
+        tracing.set_attributes(file_id=file_id, chunk_index=chunk_index)
+        file_record = db.query(File).filter(File.id == file_id).first()
+        delivery_info = self.request.delivery_info or {}
+        resume = resume or bool(delivery_info.get("redelivered")) or bool(self.request.retries)
+        
+        heartbeat = None
+        if lease_owner:
+            lease = get_file_lease(file_id)
+            if not lease.acquire(lease_owner):
+                # Otra tarea reanudó el archivo después de que venció el lease de este chord
+                error_msg = f"El lease del archivo {file_id} pertenece a otra tarea"
+                logger.warning(f"Bloque {chunk_index} omitido: {error_msg}")
+                return {"chunk": chunk_index, "processed": 0, "failed": 0, "error": error_msg}
+            heartbeat = lambda: lease.heartbeat(lease_owner)
+        
+        processed_count, failed_count = _process_range(
+            db, file_id, file_record.file_path, start, end, url_count,
+            progress=get_progress_publisher(file_id, file_record.total_links), resume=resume,
+            heartbeat=heartbeat
+        )
+        return {"chunk": chunk_index, "processed": processed_count, "failed": failed_count}
+        
+    except SoftTimeLimitExceeded:
+        # Continuar en una nueva ejecución desde el último checkpoint
+        logger.warning(f"Límite de tiempo alcanzado en el bloque {chunk_index} del archivo {file_id}, se reanudará")
+        db.rollback()
+        raise self.retry(countdown=1, max_retries=None)
+        
+    except Exception as e:
+        # No propagar la excepción para que el chord pueda finalizar el archivo
+        logger.error(f"Error crítico en el bloque {chunk_index} del archivo {file_id}: {str(e)}")
+        return {"chunk": chunk_index, "processed": 0, "failed": 0, "error": str(e)}
+        
+    finally:
+        db.close()
+
+@app.task
+def finalize_file_task(chunk_results: List[dict], file_id: int, email: str, total_urls: int,
+                       lease_owner: Optional[str] = None):
+    """
+    Callback del chord: finaliza el archivo cuando terminan todos sus bloques
+    
+    Si algún bloque terminó con error sus URLs pendientes no tienen registro
+    Link, por lo que el archivo queda en ERROR en lugar de PROCESSED. Los
+    checkpoints se conservan: POST /process con resume=true procesa solo las
+    URLs que faltan.
+    
+    Si el lease del archivo ya pertenece a otra tarea (lo reanudaron después
+    de que venció el de este chord), no se modifica el archivo.
+    
+    Args:
+        chunk_results (List[dict]): Resultados de cada process_chunk_task
+        file_id (int): ID del archivo en la base de datos
+        email (str): Email para notificación de finalización
+        total_urls (int): Total de URLs del archivo
+        lease_owner (str, optional): Dueño del lease del archivo
+        
+    Returns:
+        dict: Resultado del procesamiento
+    """
+    db = SessionLocal()
+    tracing.set_attributes(file_id=file_id)
+    try:
+        if lease_owner and not get_file_lease(file_id).acquire(lease_owner):
+            error_msg = f"El archivo con ID {file_id} está siendo procesado por otra tarea"
+            logger.warning(error_msg)
+            return {"success": False, "file_id": file_id, "error": error_msg}
+        
+        failed_chunks = []
+        for result in chunk_results:
+            if result.get('error'):
+                logger.warning(f"El bloque {result.get('chunk')} del archivo {file_id} terminó con error: {result['error']}")
+                failed_chunks.append(result.get('chunk'))
+        
+        if failed_chunks:
+            error_msg = f"Bloques terminados con error: {failed_chunks}"
+            logger.error(f"El archivo {file_id} queda en ERROR ({error_msg}); se puede reanudar con resume=true")
+            _mark_file_error(db, file_id, error_msg, lease_owner)
+            return {
+                "success": False,
+                "file_id": file_id,
+                "total_urls": total_urls,
+                "failed_chunks": failed_chunks,
+                "error": error_msg,
+                "status": "ERROR"
+            }
+        
+        return finalize_file(db, file_id, email, total_urls, lease_owner)
+        
+    except Exception as e:
+        logger.error(f"Error al finalizar el archivo {file_id}: {str(e)}")
+        _mark_file_error(db, file_id, str(e), lease_owner)
+        return {"success": False, "error": str(e)}
+        
+    finally:
+        db.close()
+
 @app.task
 def process_single_url_task(file_id: int, url: str):
     """
@@ -293,34 +698,21 @@ def process_single_url_task(file_id: int, url: str):
     db = SessionLocal()
     try:
         logger.info(f"Procesando URL individual: {url}")
+        tracing.set_attributes(file_id=file_id)
         
-        scraper = WebScraper()
+        scraper = WebScraper(
+            rate_limiter=get_rate_limiter(), cache=get_validator_cache(), archive=get_page_archive(),
+            retry_policy=get_retry_policy(), circuit_breaker=get_circuit_breaker()
+        )
         result = scraper.scrape_website(url)
-        
-        # Procesar la fecha si existe
-        post_date = None
-        if result.get('date'):
-            try:
-                date_str = result.get('date')
-                # Manejar diferentes formatos de fecha
-                if 'T' in date_str:
-                    if date_str.endswith('Z'):
-                        date_str = date_str.replace('Z', '+00:00')
-                    post_date = datetime.fromisoformat(date_str)
-                else:
-                    # Si no tiene formato ISO, intentar parsearlo como string
-                    from dateutil import parser
-                    post_date = parser.parse(date_str)
-            except Exception as date_error:
-                logger.warning(f"Error al parsear fecha '{result.get('date')}': {date_error}")
-                post_date = None
+        metrics.record_url_result(result)
         
         # Crear nuevo registro en la tabla links
         link_record = Link(
             file_id=file_id,
             url=url,
             title=result.get('title'),
-            post_date=post_date,
+            post_date=parse_post_date(result.get('date'), url),
             content=result.get('content'),
             page_exists=result.get('page_exists', False),
             success=result.get('success', False),
@@ -344,3 +736,100 @@ def process_single_url_task(file_id: int, url: str):
         
     finally:
         db.close()
+
+@app.task
+def reextract_file_task(file_id: int):
+    """
+    Reconstruye los registros Link de un archivo desde el archivo de páginas
+    
+    Vuelve a aplicar la extracción actual sobre la última respuesta archivada
+    de cada URL, sin acceder a la red. Los links se recorren por ventanas y
+    las respuestas se leen en orden de segmento y offset, por lo que el costo
+    queda limitado por la lectura del disco. Los links sin respuesta archivada
+    no se modifican.
+    
+    Args:
+        file_id (int): ID del archivo en la base de datos
+        
+    Returns:
+        dict: Cantidad de links re-extraídos y sin respuesta archivada
+    """
+    db = SessionLocal()
+    try:
+        archive = get_page_archive()
+        if archive is None:
+            error_msg = "El archivo de páginas no está habilitado (PAGE_ARCHIVE_ENABLED)"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        
+        file_record = db.query(File).filter(File.id == file_id).first()
+        if not file_record:
+            error_msg = f"No se encontró el archivo con ID: {file_id}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        
+        logger.info(f"Re-extrayendo los links del archivo {file_id} desde {archive.directory}")
+        extractor = WebScraper(html_content_mode='off')
+        reextracted = 0
+        missing = 0
+        last_id = 0
+        while True:
+            links = (
+                db.query(Link.id, Link.url)
+                .filter(Link.file_id == file_id, Link.id > last_id)
+                .order_by(Link.id)
+                .limit(URL_WINDOW_SIZE)
+                .all()
+            )
+            if not links:
+                break
+            last_id = links[-1].id
+            
+            link_ids = {}
+            for link in links:
+                link_ids.setdefault(link.url, []).append(link.id)
+            
+            updates = []
+            for page in archive.iter_latest(link_ids):
+                try:
+                    row = build_link_row(page.url, extractor.parse_response(page.url, page.status_code, page.content))
+                except Exception as e:
+                    logger.error(f"Error al re-extraer {page.url}: {str(e)}")
+                    row = build_link_row(page.url, {"success": False, "error": f"Error en el procesamiento: {str(e)}"})
+                # La fecha de procesamiento es la de la descarga archivada
+                row["processed_date"] = page.fetched_at
+                updates.extend({"id": link_id, **row} for link_id in link_ids[page.url])
+            
+            if updates:
+                db.execute(update(Link), updates)
+            db.commit()
+            reextracted += len(updates)
+            missing += len(links) - len(updates)
+        
+        # Recalcular los contadores del archivo con los resultados nuevos
+        file_record.total_processed = db.query(func.count(Link.id)).filter(
+            Link.file_id == file_id, Link.success.is_(True)
+        ).scalar()
+        file_record.total_failed = db.query(func.count(Link.id)).filter(
+            Link.file_id == file_id, Link.success.is_(False)
+        ).scalar()
+        db.commit()
+        
+        result_summary = {
+            "success": True,
+            "file_id": file_id,
+            "reextracted": reextracted,
+            "missing": missing,
+            "processed": file_record.total_processed,
+            "failed": file_record.total_failed
+        }
+        logger.info(f"Re-extracción completada para archivo {file_id}: {result_summary}")
+        return result_summary
+        
+    except Exception as e:
+        logger.error(f"Error en la re-extracción del archivo {file_id}: {str(e)}")
+        db.rollback()
+        return {"success": False, "error": str(e)}
+        
+    finally:
+        db.close()
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import statistics
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+import logging
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.propagators.textmap import Getter
+from opentelemetry.trace import Status, StatusCode
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sin setup_tracing el tracer es el no-op de opentelemetry: crear spans no cuesta nada
+tracer = trace.get_tracer("scraper")
+
+# Eventos del trace de httpx (httpcore) que se registran como spans. connect_tcp
+# incluye la resolución DNS, que httpcore hace dentro de la conexión.
+HTTPX_TRACE_EVENTS = {
+    "connection.connect_tcp": "http.connect",
+    "connection.start_tls": "http.tls",
+    "http11.receive_response_headers": "http.wait_response",
+    "http2.receive_response_headers": "http.wait_response",
+}
+
+class JsonLinesSpanExporter:
+    """
+    Exporta cada span terminado como una línea JSON en un archivo
+
+    Varios procesos pueden escribir en el mismo archivo: cada lote se agrega
+    con una sola escritura en modo append.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, spans: Sequence[Any]):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(lines)
+        except OSError as e:
+            logger.warning(f"No se pudieron escribir {len(spans)} spans en {self.path}: {str(e)}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+def _create_exporter(exporter_name: str, service_name: str):
+    """Crea el exporter configurado; OTLP requiere opentelemetry-exporter-otlp-proto-http"""
+    if exporter_name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            # El endpoint se toma de OTEL_EXPORTER_OTLP_ENDPOINT
+            return OTLPSpanExporter()
+        except ImportError:
+            logger.warning("Exporter OTLP no instalado (opentelemetry-exporter-otlp-proto-http), se usará el archivo")
+    if exporter_name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+
+    from .settings import TRACING_DIR
+    return JsonLinesSpanExporter(os.path.join(TRACING_DIR, f"{service_name}.jsonl"))
+
+_configured = False
+
+def setup_tracing(service_name: str) -> bool:
+    """
+    Configura el TracerProvider del proceso según settings
+
+    Args:
+        service_name (str): Nombre del servicio en los spans (scraper-api, scraper-worker)
+
+    Returns:
+        bool: True si el tracing quedó habilitado
+    """
+    global _configured
+
+    from .settings import TRACING_ENABLED, TRACING_EXPORTER, TRACING_SAMPLE_RATIO
+    if not TRACING_ENABLED or _configured:
+        return _configured
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO))
+    )
+    provider.add_span_processor(BatchSpanProcessor(_create_exporter(TRACING_EXPORTER, service_name)))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    logger.info(f"Tracing habilitado para {service_name} (exporter: {TRACING_EXPORTER}, muestreo: {TRACING_SAMPLE_RATIO})")
+    return True
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """Abre un span hijo del span actual con los atributos dados (se omiten los None)"""
+    with tracer.start_as_current_span(name, attributes={k: v for k, v in attributes.items() if v is not None}) as span:
+        yield span
+
+@contextmanager
+def start_server_span(method: str, headers: Mapping[str, str]) -> Iterator[trace.Span]:
+    """Abre el span de una petición HTTP recibida, continuando el traceparent del cliente"""
+    parent = propagate.extract(headers)
+    with tracer.start_as_current_span(method, context=parent, kind=trace.SpanKind.SERVER,
+                                      attributes={"http.method": method}) as span:
+        yield span
+
+def set_attributes(**attributes: Any):
+    """Agrega atributos al span actual (por ejemplo file_id al span de la tarea)"""
+    trace.get_current_span().set_attributes({k: v for k, v in attributes.items() if v is not None})
+
+def inject_headers(headers: Dict[str, Any]):
+    """Agrega el contexto del span actual (traceparent) a los headers de un mensaje"""
+    propagate.inject(headers)
+
+class _RequestGetter(Getter):
+    """Lee el traceparent de la petición de una tarea de Celery"""
+
+    def get(self, carrier: Any, key: str) -> Optional[list]:
+        # Celery expone los headers del mensaje como atributos de task.request
+        value = getattr(carrier, key, None)
+        if value is None:
+            value = (getattr(carrier, "headers", None) or {}).get(key)
+        return [value] if value is not None else None
+
+    def keys(self, carrier: Any) -> list:
+        return []
+
+# Span y token de contexto de cada tarea en curso del proceso, por task_id
+_task_spans: Dict[str, Tuple[trace.Span, object]] = {}
+
+def task_span_start(task_id: str, task: Any, args: Optional[Sequence] = None):
+    """Abre el span de una tarea de Celery como hijo del contexto recibido en sus headers"""
+    parent = propagate.extract(task.request, getter=_RequestGetter())
+    span = tracer.start_span(
+        f"celery.task {task.name}", context=parent, kind=trace.SpanKind.CONSUMER,
+        attributes={"celery.task_id": task_id, "celery.args": json.dumps(list(args or []), default=str)[:500]}
+    )
+    _task_spans[task_id] = (span, context.attach(trace.set_span_in_context(span)))
+
+def task_span_end(task_id: str, state: Optional[str]):
+    """Cierra el span de una tarea de Celery"""
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("celery.state", state or "UNKNOWN")
+    if state == "FAILURE":
+        span.set_status(Status(StatusCode.ERROR))
+    span.end()
+    context.detach(token)
+
+def httpx_trace_hook() -> Optional[Callable]:
+    """
+    Callback para la extensión "trace" de httpx que registra las fases de conexión
+
+    Returns:
+        Optional[Callable]: Callback, o None si el span actual no se está grabando
+    """
+    if not trace.get_current_span().is_recording():
+        return None
+    spans: Dict[str, trace.Span] = {}
+
+    async def trace_event(event_name: str, info: Mapping[str, Any]):
+        prefix, _, stage = event_name.rpartition(".")
+        span_name = HTTPX_TRACE_EVENTS.get(prefix)
+        if span_name is None:
+            return
+        if stage == "started":
+            spans[prefix] = tracer.start_span(span_name)
+        elif prefix in spans:
+            span = spans.pop(prefix)
+            if stage == "failed":
+                span.set_status(Status(StatusCode.ERROR, str(info.get("exception", ""))))
+            span.end()
+
+    return trace_event
+
+def summarize(path: str, file_id: Optional[int] = None, trace_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Resume los spans de un archivo exportado por nombre de span
+
+    Args:
+        path (str): Archivo JSON lines del exporter
+        file_id (int, optional): Solo las trazas cuyo algún span tiene ese file_id
+        trace_id (str, optional): Solo esa traza
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por nombre de span: cantidad, total, p50 y p95 en ms
+    """
+    spans = []
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            if line.strip():
+                spans.append(json.loads(line))
+
+    if file_id is not None:
+        traces = {span["context"]["trace_id"] for span in spans if span.get("attributes", {}).get("file_id") == file_id}
+    else:
+        traces = {trace_id} if trace_id else {span["context"]["trace_id"] for span in spans}
+
+    durations = defaultdict(list)
+    for span in spans:
+        if span["context"]["trace_id"] in traces:
+            start = datetime.fromisoformat(span["start_time"].replace("Z", "+00:00"))
+            end = datetime.fromisoformat(span["end_time"].replace("Z", "+00:00"))
+            durations[span["name"]].append((end - start).total_seconds() * 1000)
+
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50_ms": statistics.median(values),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))]
+        }
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume las trazas exportadas a un archivo por nombre de span")
+    parser.add_argument("path", help="Archivo .jsonl del exporter")
+    parser.add_argument("--file-id", type=int, help="Solo las trazas del archivo con este ID")
+    parser.add_argument("--trace-id", help="Solo la traza con este ID (0x...)")
+    args = parser.parse_args()
+
+    summary = summarize(args.path, args.file_id, args.trace_id)
+    print(f"{'span':<40} {'cantidad':>9} {'total ms':>12} {'p50 ms':>10} {'p95 ms':>10}")
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<40} {row['count']:>9} {row['total_ms']:>12.1f} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
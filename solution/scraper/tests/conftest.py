@@ -4,22 +4,26 @@ import tempfile
 from datetime import datetime
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
 
-from src.settings import Base, get_db
+from src.settings import Base, get_db, get_async_db
 from src.main import app
 from src.models import File, Link
 
-# Configuración de base de datos de pruebas en memoria
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+@pytest.fixture(scope="function")
+def database_path(tmp_path):
+    """Archivo SQLite de la prueba, compartido por la sesión síncrona y la asíncrona de la API"""
+    return str(tmp_path / "test.db")
 
 
 @pytest.fixture(scope="function")
-def test_db():
-    """Fixture que crea una base de datos SQLite en memoria para las pruebas"""
+def test_db(database_path):
+    """Fixture que crea una base de datos SQLite temporal para las pruebas"""
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
+        f"sqlite:///{database_path}", 
         connect_args={"check_same_thread": False}
     )
     
@@ -40,11 +44,20 @@ def test_db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
-    """Fixture que proporciona un cliente de pruebas para FastAPI"""
+def client(test_db, database_path):
+    """
+    Fixture que proporciona un cliente de pruebas para FastAPI
+    
+    Los endpoints asíncronos leen la misma base de datos con aiosqlite, por lo
+    que solo ven los cambios confirmados con test_db.commit().
+    """
+    # Sin pool: cada conexión de aiosqlite (y su hilo) se cierra al terminar la petición
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
     
     def override_get_db():
         try:
@@ -52,7 +65,12 @@ def client(test_db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
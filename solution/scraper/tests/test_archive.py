@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from src.apps.archive import PageArchive
+from src.apps.scraper import WebScraper
+from src.models import File, Link
+from src.tasks import reextract_file_task
+
+
+ARTICLE_HTML = b"""
+<html>
+    <head><title>Nota archivada</title></head>
+    <body>
+        <time datetime="2024-01-01T12:00:00Z">Enero 1, 2024</time>
+        <div class="article-content"><p>Primer parrafo</p></div>
+    </body>
+</html>
+"""
+
+
+def indexed_rows(tmp_path) -> int:
+    """Filas confirmadas en el índice, vistas desde otra conexión"""
+    path = tmp_path / "archive" / PageArchive.INDEX_NAME
+    if not path.exists():
+        return 0
+    connection = sqlite3.connect(str(path))
+    try:
+        return connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        connection.close()
+
+
+@pytest.fixture(params=["zstd", "gzip"])
+def archive(request, tmp_path):
+    """Archivo de páginas en un directorio temporal con cada compresión"""
+    page_archive = PageArchive(str(tmp_path / "archive"), compression=request.param)
+    yield page_archive
+    page_archive.close()
+
+
+class TestPageArchive:
+    """Tests para el archivo comprimido de respuestas"""
+
+    def test_append_and_read(self, archive):
+        """Test para recuperar la respuesta, sus headers y su fecha de descarga"""
+        fetched_at = datetime(2024, 5, 1, 10, 0, 0)
+        assert archive.append("https://example.com/a", 200, {"ETag": '"v1"'}, ARTICLE_HTML, fetched_at)
+
+        page = archive.get_latest("https://example.com/a")
+
+        assert page.url == "https://example.com/a"
+        assert page.status_code == 200
+        assert page.headers == {"ETag": '"v1"'}
+        assert page.content == ARTICLE_HTML
+        assert page.fetched_at == fetched_at
+
+    def test_latest_before(self, archive):
+        """Test para elegir la última descarga anterior a una fecha"""
+        archive.append("https://example.com/a", 200, {}, b"v1", datetime(2024, 1, 1))
+        archive.append("https://example.com/a", 200, {}, b"v2", datetime(2024, 2, 1))
+
+        assert archive.get_latest("https://example.com/a").content == b"v2"
+        assert archive.get_latest("https://example.com/a", before=datetime(2024, 1, 15)).content == b"v1"
+        assert archive.get_latest("https://example.com/otra") is None
+
+    def test_rolls_segments(self, tmp_path):
+        """Test para abrir un segmento nuevo al superar el tamaño máximo"""
+        archive = PageArchive(str(tmp_path / "archive"), compression="gzip", segment_max_bytes=1)
+        for i in range(3):
+            archive.append(f"https://example.com/{i}", 200, {}, ARTICLE_HTML)
+
+        pages = list(archive.iter_latest(f"https://example.com/{i}" for i in range(3)))
+
+        segments = [name for name in (tmp_path / "archive").iterdir() if name.name.startswith("segment-")]
+        assert len(segments) == 3
+        assert sorted(page.url for page in pages) == [f"https://example.com/{i}" for i in range(3)]
+        archive.close()
+
+    def test_index_committed_in_batches(self, tmp_path):
+        """Test para confirmar el índice cada index_batch_size páginas y con flush()"""
+        archive = PageArchive(str(tmp_path / "archive"), compression="gzip", index_batch_size=3)
+        for i in range(4):
+            archive.append(f"https://example.com/{i}", 200, {}, ARTICLE_HTML)
+
+        assert indexed_rows(tmp_path) == 3
+        assert archive.flush() is True
+        assert indexed_rows(tmp_path) == 4
+        archive.close()
+
+    def test_close_commits_pending_rows(self, tmp_path):
+        """Test para confirmar al cerrar las páginas que no completaron un lote"""
+        archive = PageArchive(str(tmp_path / "archive"), compression="gzip", index_batch_size=10)
+        archive.append("https://example.com/a", 200, {}, ARTICLE_HTML)
+        archive.close()
+
+        assert indexed_rows(tmp_path) == 1
+
+    def test_segment_synced_before_index_commit(self, tmp_path):
+        """Test para que una fila del índice nunca apunte más allá de los datos escritos en el segmento"""
+        archive = PageArchive(str(tmp_path / "archive"), compression="gzip", index_batch_size=2)
+        synced = []
+
+        def fsync(fd):
+            # Al sincronizar, el segmento ya tiene todos los registros y el índice aún no tiene sus filas
+            synced.append((os.fstat(fd).st_size, indexed_rows(tmp_path)))
+
+        with patch("src.apps.archive.os.fsync", side_effect=fsync):
+            archive.append("https://example.com/a", 200, {}, ARTICLE_HTML)
+            archive.append("https://example.com/b", 200, {}, ARTICLE_HTML)
+
+        with sqlite3.connect(str(tmp_path / "archive" / PageArchive.INDEX_NAME)) as connection:
+            end = connection.execute("SELECT MAX(offset + length) FROM pages").fetchone()[0]
+        assert synced == [(end, 0)]
+        archive.close()
+
+    def test_disk_errors_fail_soft(self, archive):
+        """Test para no interrumpir el scraping si no se puede escribir"""
+        with patch.object(archive, "_current_segment", side_effect=OSError("disco lleno")):
+            assert archive.append("https://example.com/a", 200, {}, b"x") is False
+
+    @patch('src.apps.scraper.requests.Session.get')
+    def test_scraper_archives_responses(self, mock_get, archive):
+        """Test para archivar la respuesta cruda antes de extraer los campos"""
+        mock_response = Mock(status_code=200, headers={"Content-Type": "text/html"})
+        mock_response.iter_content.return_value = [ARTICLE_HTML]
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        WebScraper(archive=archive).scrape_website("https://example.com/nota")
+
+        page = archive.get_latest("https://example.com/nota")
+        assert page.content == ARTICLE_HTML
+        assert page.headers == {"Content-Type": "text/html"}
+
+
+class TestReextractFileTask:
+    """Tests para la re-extracción de links sin acceso a la red"""
+
+    @patch('src.tasks.get_page_archive')
+    @patch('src.tasks.SessionLocal')
+    def test_rebuilds_links_from_archive(self, mock_session, mock_get_archive, test_db, sample_file_record,
+                                         sample_links, archive):
+        """Test para reconstruir los links archivados y dejar intactos los demás"""
+        mock_session.return_value = test_db
+        mock_get_archive.return_value = archive
+        file_id = sample_file_record.id
+        fetched_at = datetime(2024, 5, 1, 10, 0, 0)
+        archive.append("https://example.com/page1", 200, {}, ARTICLE_HTML, fetched_at)
+        archive.append("https://example.com/page2", 200, {}, b"<html><body>Recurso no encontrado</body></html>")
+
+        result = reextract_file_task(file_id)
+
+        assert result["success"] is True
+        assert result["reextracted"] == 2
+        assert result["missing"] == 1
+        links = {link.url: link for link in test_db.query(Link).filter(Link.file_id == file_id)}
+        assert links["https://example.com/page1"].title == "Nota archivada"
+        assert links["https://example.com/page1"].content == "Primer parrafo"
+        assert links["https://example.com/page1"].success is True
+        assert links["https://example.com/page1"].processed_date == fetched_at
+        assert links["https://example.com/page2"].page_exists is False
+        assert "Recurso no encontrado" in links["https://example.com/page2"].error_description
+        assert links["https://example.com/page3"].title == "Test Page 3"
+
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.total_processed == 1
+        assert file_record.total_failed == 2
+
+    @patch('src.tasks.get_page_archive', return_value=None)
+    def test_archive_disabled(self, mock_get_archive):
+        """Test para informar que el archivo de páginas está deshabilitado"""
+        result = reextract_file_task(1)
+
+        assert result["success"] is False
+        assert "PAGE_ARCHIVE_ENABLED" in result["error"]
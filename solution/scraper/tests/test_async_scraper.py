@@ -0,0 +1,138 @@
+import pytest
+import asyncio
+import threading
+import httpx
+
+from src.apps.async_scraper import AsyncWebScraper
+
+
+ARTICLE_HTML = b"""
+<html>
+    <head>
+        <title>Test Page</title>
+        <meta name="description" content="Test description">
+    </head>
+    <body>
+        <time datetime="2024-01-01T12:00:00Z">Enero 1, 2024</time>
+        <div class="article-content"><p>Esta es una prueba</p></div>
+    </body>
+</html>
+"""
+
+
+class TestAsyncWebScraper:
+    """Tests para el motor de scraping asíncrono"""
+
+    def test_scrape_iter_success(self):
+        """Test para scrapear varias URLs y obtener todos los resultados"""
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=ARTICLE_HTML))
+        scraper = AsyncWebScraper(concurrency=2, transport=transport)
+
+        urls = [f"https://example.com/page{i}" for i in range(5)]
+        results = dict(scraper.scrape_iter(urls))
+
+        assert set(results) == set(urls)
+        for url, result in results.items():
+            assert result['success'] is True
+            assert result['url'] == url
+            assert result['title'] == "Test Page"
+            assert result['date'] == "2024-01-01T12:00:00Z"
+            assert result['content'] == "Esta es una prueba"
+
+    def test_scrape_iter_http_error(self):
+        """Test para registrar errores de red sin detener el resto de URLs"""
+        def handler(request):
+            if request.url.path == "/broken":
+                return httpx.Response(500)
+            return httpx.Response(200, content=ARTICLE_HTML)
+
+        scraper = AsyncWebScraper(concurrency=2, transport=httpx.MockTransport(handler))
+        results = dict(scraper.scrape_iter(["https://example.com/ok", "https://example.com/broken"]))
+
+        assert results["https://example.com/ok"]['success'] is True
+        assert results["https://example.com/broken"]['success'] is False
+        assert "Error de red" in results["https://example.com/broken"]['error']
+
+    def test_scrape_iter_page_not_found(self):
+        """Test para detectar páginas con 'Recurso no encontrado'"""
+        html = "<html><body><h1>Recurso no encontrado</h1></body></html>".encode('utf-8')
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=html))
+        scraper = AsyncWebScraper(transport=transport)
+
+        [(url, result)] = list(scraper.scrape_iter(["https://example.com/missing"]))
+
+        assert result['success'] is False
+        assert result['page_exists'] is False
+        assert "Recurso no encontrado" in result['error']
+
+    def test_concurrency_limit(self):
+        """Test para verificar que nunca hay más peticiones en vuelo que el límite"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def handler(request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, content=ARTICLE_HTML)
+
+        scraper = AsyncWebScraper(concurrency=3, transport=httpx.MockTransport(handler))
+        results = list(scraper.scrape_iter(f"https://example.com/{i}" for i in range(10)))
+
+        assert len(results) == 10
+        assert max_in_flight == 3
+
+    def test_downloads_continue_while_consumer_writes(self):
+        """Test para seguir descargando mientras el consumidor procesa un resultado"""
+        slow_served = threading.Event()
+
+        async def handler(request):
+            if request.url.path == "/lenta":
+                await asyncio.sleep(0.05)
+                slow_served.set()
+            return httpx.Response(200, content=ARTICLE_HTML)
+
+        scraper = AsyncWebScraper(concurrency=2, transport=httpx.MockTransport(handler))
+        results = scraper.scrape_iter(["https://example.com/rapida", "https://example.com/lenta"])
+
+        url, _ = next(results)
+        # El consumidor está "escribiendo" el primer resultado: la otra descarga debe terminar igual
+        assert url == "https://example.com/rapida"
+        assert slow_served.wait(timeout=2)
+        assert next(results)[0] == "https://example.com/lenta"
+        results.close()
+
+    def test_stopping_consumer_cancels_engine(self):
+        """Test para cancelar las descargas en vuelo y terminar el thread del loop al cortar el recorrido"""
+        cancelled = threading.Event()
+
+        async def handler(request):
+            if request.url.path != "/0":
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return httpx.Response(200, content=ARTICLE_HTML)
+
+        scraper = AsyncWebScraper(concurrency=3, transport=httpx.MockTransport(handler))
+        results = scraper.scrape_iter(f"https://example.com/{i}" for i in range(3))
+
+        assert next(results)[0] == "https://example.com/0"
+        results.close()
+
+        assert cancelled.is_set()
+        assert not [thread for thread in threading.enumerate() if thread.name == "scraper-engine"]
+
+    def test_engine_error_reaches_consumer(self):
+        """Test para propagar al consumidor un error al leer las URLs"""
+        def urls():
+            yield "https://example.com/0"
+            raise ValueError("archivo ilegible")
+
+        scraper = AsyncWebScraper(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=ARTICLE_HTML)))
+
+        with pytest.raises(ValueError, match="archivo ilegible"):
+            list(scraper.scrape_iter(urls()))
@@ -0,0 +1,345 @@
+import pytest
+import redis
+from unittest.mock import Mock, patch
+
+from src.apps.checkpoint import FileCheckpoint, FileLease, find_done_urls
+from src.models import File, Link
+from src.tasks import process_file_task
+
+
+class FakeRedis:
+    """Redis simulado con los comandos de hash que usa el checkpoint y los de strings del lease"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.values = {}
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = str(value)
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+        self.values.pop(key, None)
+
+    def exists(self, key):
+        return int(key in self.hashes or key in self.values)
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def pexpire(self, key, milliseconds):
+        return int(key in self.values)
+
+    def pipeline(self):
+        pipeline = Mock()
+        pipeline.hset.side_effect = self.hset
+        pipeline.expire.side_effect = self.expire
+        return pipeline
+
+
+def scrape_ok(urls):
+    return ((url, {"success": True, "page_exists": True, "title": "Ok"}) for url in urls)
+
+
+class TestFileCheckpoint:
+    """Tests para el checkpoint del procesamiento de archivos"""
+
+    def test_save_and_get(self):
+        """Test para guardar el último offset confirmado de cada bloque"""
+        checkpoint = FileCheckpoint(FakeRedis(), file_id=1)
+
+        assert checkpoint.get(0) is None
+        checkpoint.save(0, 52)
+        checkpoint.save(78, 104)
+
+        assert checkpoint.get(0) == 52
+        assert checkpoint.get(78) == 104
+
+        checkpoint.clear()
+        assert checkpoint.get(0) is None
+
+    def test_redis_errors_fail_soft(self):
+        """Test para continuar sin checkpoint si Redis no está disponible"""
+        redis_client = Mock()
+        redis_client.hget.side_effect = redis.ConnectionError("sin conexión")
+        redis_client.pipeline.side_effect = redis.ConnectionError("sin conexión")
+        redis_client.delete.side_effect = redis.ConnectionError("sin conexión")
+        checkpoint = FileCheckpoint(redis_client, file_id=1)
+
+        assert checkpoint.get(0) is None
+        checkpoint.save(0, 10)
+        checkpoint.clear()
+
+    def test_find_done_urls(self, test_db, sample_file_record, sample_links):
+        """Test para encontrar las URLs que ya tienen un Link en el archivo"""
+        done = find_done_urls(test_db, sample_file_record.id, [
+            "https://example.com/page1",
+            "https://example.com/otra"
+        ])
+
+        assert done == {"https://example.com/page1"}
+
+
+class TestFileLease:
+    """Tests para el lease de la tarea que procesa un archivo"""
+
+    def test_acquire_is_exclusive(self):
+        """Test para que una segunda tarea no tome el lease vigente de otra"""
+        redis_client = FakeRedis()
+        lease = FileLease(redis_client, file_id=1)
+
+        assert lease.acquire("tarea-1") is True
+        assert lease.is_held() is True
+        assert FileLease(redis_client, file_id=1).acquire("tarea-2") is False
+        # Una reentrega conserva el ID de la tarea y recupera su lease
+        assert FileLease(redis_client, file_id=1).acquire("tarea-1") is True
+
+    def test_release_only_by_owner(self):
+        """Test para que una tarea vieja no libere el lease que ya tomó otra"""
+        redis_client = FakeRedis()
+        lease = FileLease(redis_client, file_id=1)
+        lease.acquire("tarea-2")
+
+        lease.release("tarea-1")
+        assert lease.is_held() is True
+
+        lease.release("tarea-2")
+        assert lease.is_held() is False
+
+    def test_redis_errors_fail_open(self):
+        """Test para procesar el archivo aunque Redis no esté disponible"""
+        redis_client = Mock()
+        redis_client.set.side_effect = redis.ConnectionError("sin conexión")
+        redis_client.exists.side_effect = redis.ConnectionError("sin conexión")
+        lease = FileLease(redis_client, file_id=1)
+
+        assert lease.acquire("tarea-1") is True
+        assert lease.is_held() is False
+
+
+class TestResume:
+    """Tests para reanudar un archivo desde su checkpoint"""
+
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_resume_skips_committed_urls(self, mock_publish, mock_session, mock_scraper, mock_get_checkpoint,
+                                         test_db, sample_file_record, temp_file):
+        """Test para continuar desde el checkpoint sin duplicar los links ya guardados"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        checkpoint = FileCheckpoint(FakeRedis(), file_id)
+        mock_get_checkpoint.return_value = checkpoint
+        mock_scraper.return_value.scrape_iter.side_effect = scrape_ok
+
+        # Simular una ejecución anterior que murió tras confirmar page1 y page2
+        line_length = len("https://example.com/page1\n")
+        test_db.add_all([
+            Link(file_id=file_id, url="https://example.com/page1", success=True, page_exists=True),
+            Link(file_id=file_id, url="https://example.com/page2", success=True, page_exists=True)
+        ])
+        test_db.query(File).filter(File.id == file_id).update({File.total_processed: 2})
+        test_db.commit()
+        checkpoint.save(0, line_length)
+
+        with patch.object(process_file_task, 'update_state'):
+            result = process_file_task(file_id, "test@example.com", resume=True)
+
+        # La lectura retoma en page2, que ya está guardada, así que solo se descarga page3
+        mock_scraper.return_value.scrape_iter.assert_called_once_with(["https://example.com/page3"])
+        assert result["success"] is True
+        assert result["processed"] == 3
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 3
+        assert checkpoint.get(0) is None
+
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_fresh_run_replaces_previous_links(self, mock_publish, mock_session, mock_scraper, mock_get_checkpoint,
+                                               test_db, sample_file_record, temp_file):
+        """Test para reiniciar los links y el checkpoint si no se pide reanudar"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        checkpoint = FileCheckpoint(FakeRedis(), file_id)
+        checkpoint.save(0, 999)
+        mock_get_checkpoint.return_value = checkpoint
+        mock_scraper.return_value.scrape_iter.side_effect = scrape_ok
+        test_db.add(Link(file_id=file_id, url="https://example.com/page1", success=False, page_exists=False))
+        test_db.commit()
+
+        with patch.object(process_file_task, 'update_state'):
+            result = process_file_task(file_id, "test@example.com")
+
+        assert result["processed"] == 3
+        assert result["failed"] == 0
+        links = test_db.query(Link).filter(Link.file_id == file_id).all()
+        assert len(links) == 3
+        assert all(link.success for link in links)
+
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_redelivery_resumes_instead_of_restarting(self, mock_publish, mock_session, mock_scraper,
+                                                      mock_get_checkpoint, test_db, sample_file_record, temp_file):
+        """Test para continuar desde el checkpoint cuando el broker reentrega el mensaje original"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        sample_file_record.status = "PROCESSING"
+        test_db.commit()
+        file_id = sample_file_record.id
+        checkpoint = FileCheckpoint(FakeRedis(), file_id)
+        mock_get_checkpoint.return_value = checkpoint
+        mock_scraper.return_value.scrape_iter.side_effect = scrape_ok
+
+        # El worker murió tras confirmar page1 y page2; el mensaje vuelve con resume=False
+        line_length = len("https://example.com/page1\n")
+        test_db.add_all([
+            Link(file_id=file_id, url="https://example.com/page1", success=True, page_exists=True),
+            Link(file_id=file_id, url="https://example.com/page2", success=False, page_exists=False)
+        ])
+        test_db.query(File).filter(File.id == file_id).update({File.total_processed: 1, File.total_failed: 1})
+        test_db.commit()
+        checkpoint.save(0, line_length)
+
+        process_file_task.push_request(delivery_info={"redelivered": True})
+        try:
+            with patch.object(process_file_task, 'update_state'):
+                result = process_file_task.run(file_id, "test@example.com")
+        finally:
+            process_file_task.pop_request()
+
+        mock_scraper.return_value.scrape_iter.assert_called_once_with(["https://example.com/page3"])
+        assert result["success"] is True
+        assert result["processed"] == 2
+        assert result["failed"] == 1
+        links = test_db.query(Link).filter(Link.file_id == file_id).all()
+        assert sorted(link.url for link in links) == [
+            "https://example.com/page1", "https://example.com/page2", "https://example.com/page3"
+        ]
+
+    @patch('src.tasks.chord')
+    @patch('src.tasks.FILE_CHUNK_SIZE', 2)
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.SessionLocal')
+    def test_redelivery_does_not_dispatch_chord_again(self, mock_session, mock_get_checkpoint, mock_chord,
+                                                      test_db, sample_file_record, temp_file):
+        """Test para no despachar un segundo chord si el archivo ya está en proceso"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        checkpoint = FileCheckpoint(FakeRedis(), file_id)
+        mock_get_checkpoint.return_value = checkpoint
+        mock_chord.return_value.return_value = Mock(id="callback-123")
+
+        first = process_file_task(file_id, "test@example.com")
+        assert checkpoint.get_chord() == "callback-123"
+
+        # Un bloque ya guardó su primer link cuando el mensaje original vuelve a entregarse
+        test_db.add(Link(file_id=file_id, url="https://example.com/page1", success=True, page_exists=True))
+        test_db.query(File).filter(File.id == file_id).update({File.total_processed: 1})
+        test_db.commit()
+        checkpoint.save(0, 0)
+
+        second = process_file_task(file_id, "test@example.com")
+
+        assert mock_chord.call_count == 1
+        assert second["status"] == "DISPATCHED"
+        assert second["callback_task_id"] == first["callback_task_id"]
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 1
+        assert test_db.query(File).filter(File.id == file_id).first().total_processed == 1
+        assert checkpoint.get(0) == 0
+
+    @patch('src.tasks.URL_WINDOW_SIZE', 1)
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_fresh_run_keeps_duplicated_urls(self, mock_publish, mock_session, mock_scraper, mock_get_checkpoint,
+                                             test_db, sample_file_record, tmp_path):
+        """Test para guardar un Link por cada línea aunque la URL se repita en otra ventana"""
+        urls_file = tmp_path / "urls.txt"
+        urls_file.write_text("https://example.com/page1\nhttps://example.com/page2\nhttps://example.com/page1\n")
+        mock_session.return_value = test_db
+        sample_file_record.file_path = str(urls_file)
+        test_db.commit()
+        file_id = sample_file_record.id
+        mock_get_checkpoint.return_value = FileCheckpoint(FakeRedis(), file_id)
+        mock_scraper.return_value.scrape_iter.side_effect = scrape_ok
+
+        with patch.object(process_file_task, 'update_state'):
+            result = process_file_task(file_id, "test@example.com")
+
+        assert result["processed"] == 3
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 3
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.total_processed + file_record.total_failed == file_record.total_links
+
+    @patch('src.tasks.get_file_lease')
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    def test_second_task_does_not_run_next_to_live_one(self, mock_session, mock_scraper, mock_get_checkpoint,
+                                                       mock_get_lease, test_db, sample_file_record, temp_file):
+        """Test para no procesar el archivo si otra tarea tiene su lease vigente"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        sample_file_record.status = "PROCESSING"
+        test_db.commit()
+        file_id = sample_file_record.id
+        redis_client = FakeRedis()
+        mock_get_checkpoint.return_value = FileCheckpoint(redis_client, file_id)
+        mock_get_lease.return_value = FileLease(redis_client, file_id)
+        FileLease(redis_client, file_id).acquire("tarea-viva")
+        test_db.add(Link(file_id=file_id, url="https://example.com/page1", success=True, page_exists=True))
+        test_db.commit()
+
+        result = process_file_task(file_id, "test@example.com", resume=True)
+
+        assert result["success"] is False
+        assert "otra tarea" in result["error"]
+        mock_scraper.return_value.scrape_iter.assert_not_called()
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 1
+        assert test_db.query(File).filter(File.id == file_id).first().status == "PROCESSING"
+
+    @patch('src.tasks.get_file_lease')
+    @patch('src.tasks.get_checkpoint')
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_lease_released_when_file_finishes(self, mock_publish, mock_session, mock_scraper, mock_get_checkpoint,
+                                               mock_get_lease, test_db, sample_file_record, temp_file):
+        """Test para liberar el lease al terminar el archivo"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        redis_client = FakeRedis()
+        mock_get_checkpoint.return_value = FileCheckpoint(redis_client, file_id)
+        mock_get_lease.side_effect = lambda file_id: FileLease(redis_client, file_id)
+        mock_scraper.return_value.scrape_iter.side_effect = scrape_ok
+
+        with patch.object(process_file_task, 'update_state'):
+            result = process_file_task(file_id, "test@example.com")
+
+        assert result["success"] is True
+        assert FileLease(redis_client, file_id).is_held() is False
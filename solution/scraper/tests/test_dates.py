@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from src.apps.dates import DATE_FORMATS, DateFormat, DateNormalizer, parse_post_date
+
+
+CAN_URL = "https://www.comunidadandina.org/notas-de-prensa/{}"
+
+
+class TestDateNormalizer:
+    """Tests para la normalización de fechas de publicación"""
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("2024-03-15T10:30:00-05:00", datetime(2024, 3, 15, 10, 30, tzinfo=timezone(timedelta(hours=-5)))),
+        ("2019-07-01T00:00:00Z", datetime(2019, 7, 1, tzinfo=timezone.utc)),
+        ("2023-11-02", datetime(2023, 11, 2)),
+        ("2023-11-02 08:15:00", datetime(2023, 11, 2, 8, 15)),
+        ("2023-11-02T08:15:00.5", datetime(2023, 11, 2, 8, 15, 0, 500000)),
+        ("2023/11/02", datetime(2023, 11, 2)),
+        ("11/02/2023", datetime(2023, 11, 2)),
+        (" 15 de marzo de 2024 ", datetime(2024, 3, 15)),
+        ("March 15, 2024", datetime(2024, 3, 15)),
+    ])
+    def test_formats(self, raw, expected):
+        """Test para interpretar los formatos conocidos y los que resuelve dateutil"""
+        assert DateNormalizer().normalize(raw, CAN_URL.format(1)) == expected
+
+    def test_invalid_dates(self):
+        """Test para retornar None con fechas vacías o inválidas"""
+        normalizer = DateNormalizer()
+
+        assert normalizer.normalize(None) is None
+        assert normalizer.normalize("") is None
+        assert normalizer.normalize("sin fecha") is None
+        assert normalizer.normalize("2024-13-45") is None
+
+    def test_remembers_host_format(self):
+        """Test para probar primero el formato que ya funcionó en el mismo host"""
+        iso = Mock(return_value=None)
+        normalizer = DateNormalizer(formats=(DateFormat("iso", iso), DATE_FORMATS[2]))
+        normalizer.normalize("2023/11/02", CAN_URL.format(1))
+
+        assert normalizer.normalize("2024/01/05", CAN_URL.format(2)) == datetime(2024, 1, 5)
+        assert iso.call_count == 1
+
+    def test_dateutil_only_as_fallback(self):
+        """Test para no recurrir a dateutil con los formatos precompilados"""
+        with patch('src.apps.dates.dateutil_parser.parse') as mock_parse:
+            parse_post_date("2023-11-02", CAN_URL.format(1))
+
+        mock_parse.assert_not_called()
+
+    def test_normalize_many(self):
+        """Test para normalizar muchas fechas conservando el orden"""
+        items = [
+            ("2023-11-02", CAN_URL.format(1)),
+            ("sin fecha", CAN_URL.format(2)),
+            (None, CAN_URL.format(3)),
+            ("2023-11-02", CAN_URL.format(4)),
+        ]
+
+        assert DateNormalizer().normalize_many(items) == [datetime(2023, 11, 2), None, None, datetime(2023, 11, 2)]
@@ -0,0 +1,97 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+
+from src.apps.db_pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, dispose_after_fork, engine_options, instrument_engine
+)
+from src.metrics import DB_POOL_CAPACITY
+
+
+POOL_OPTIONS = dict(pool_size=1, max_overflow=0, pool_timeout=0.1, pool_recycle=1800, pre_ping=True, pgbouncer=False)
+
+
+def sample(name, labels):
+    """Valor actual de una métrica del registro global (0 si no existe)"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """Motor SQLite con un pool instrumentado de una sola conexión"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **engine_options(**POOL_OPTIONS))
+    instrument_engine(engine, "prueba", capacity=1)
+    yield engine
+    engine.dispose()
+
+
+class TestEngineOptions:
+    """Tests para las opciones del pool de conexiones"""
+
+    def test_queue_pool(self):
+        """Test para configurar tamaño, espera, reciclado y pre-ping del pool"""
+        options = engine_options(**{**POOL_OPTIONS, "pool_size": 5, "max_overflow": 10})
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 5
+        assert options["max_overflow"] == 10
+        assert options["pool_timeout"] == 0.1
+        assert options["pool_recycle"] == 1800
+        assert options["pool_pre_ping"] is True
+        assert engine_options(async_driver=True, **POOL_OPTIONS)["poolclass"] is InstrumentedAsyncQueuePool
+
+    def test_pgbouncer(self):
+        """Test para usar NullPool y deshabilitar los prepared statements de asyncpg con PgBouncer"""
+        options = {**POOL_OPTIONS, "pgbouncer": True}
+
+        assert engine_options(**options) == {"poolclass": NullPool, "pool_pre_ping": True}
+        assert engine_options(async_driver=True, **options)["connect_args"] == {
+            "statement_cache_size": 0, "prepared_statement_cache_size": 0
+        }
+
+
+class TestPoolMetrics:
+    """Tests para las métricas del pool de conexiones"""
+
+    def test_checked_out_and_checkout_time(self, pooled_engine):
+        """Test para contar las conexiones en uso y medir cada checkout"""
+        checkouts = sample("scraper_db_pool_checkout_seconds_count", {"pool": "sync"})
+
+        with pooled_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            assert sample("scraper_db_pool_checked_out", {"pool": "prueba"}) == 1
+
+        assert sample("scraper_db_pool_checked_out", {"pool": "prueba"}) == 0
+        assert sample("scraper_db_pool_checkout_seconds_count", {"pool": "sync"}) == checkouts + 1
+        assert sample("scraper_db_pool_capacity", {"pool": "prueba"}) == 1
+
+    def test_checkout_timeout(self, pooled_engine):
+        """Test para contar los checkouts que agotan pool_timeout con el pool saturado"""
+        timeouts = sample("scraper_db_pool_timeouts_total", {"pool": "sync"})
+
+        with pooled_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                pooled_engine.connect()
+
+        assert sample("scraper_db_pool_timeouts_total", {"pool": "sync"}) == timeouts + 1
+
+
+class TestDisposeAfterFork:
+    """Tests para reiniciar el pool en los procesos hijo del worker"""
+
+    def test_new_pool_keeps_parent_connections(self, pooled_engine):
+        """Test para crear un pool nuevo sin cerrar las conexiones heredadas"""
+        parent_connection = pooled_engine.connect()
+        parent_pool = pooled_engine.pool
+        DB_POOL_CAPACITY.labels("prueba").set(0)
+
+        dispose_after_fork(pooled_engine)
+
+        assert pooled_engine.pool is not parent_pool
+        assert isinstance(pooled_engine.pool, InstrumentedQueuePool)
+        assert parent_connection.execute(text("SELECT 1")).scalar() == 1
+        with pooled_engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert sample("scraper_db_pool_capacity", {"pool": "prueba"}) == 1
+        parent_connection.close()
@@ -0,0 +1,235 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+import httpx
+from unittest.mock import Mock, patch
+
+from src.apps.async_scraper import AsyncWebScraper
+from src.apps.download import (
+    CHUNK_SIZE, ERROR_CONTENT_TYPE, ERROR_DEADLINE, ERROR_HTTP_STATUS, ERROR_NOT_FOUND, ERROR_TOO_LARGE,
+    BodyReader, DownloadLimits, DownloadTimeout, ResponseTooLarge
+)
+from src.apps.parsers import get_parser
+from src.apps.scraper import WebScraper
+
+
+ARTICLE_HEAD = (
+    b"<html><head><title>Nota</title><meta name='description' content='Resumen'></head><body>"
+    b"<time datetime='2024-01-01T12:00:00Z'>Enero</time>"
+    b"<div class='article-content'><p>Primer parrafo</p></div>"
+)
+
+
+def scrape_async(handler, **kwargs):
+    """Scrapea una URL con AsyncWebScraper sobre un transporte simulado"""
+    scraper = AsyncWebScraper(transport=httpx.MockTransport(handler), **kwargs)
+    return dict(scraper.scrape_iter(["https://example.com/nota"]))["https://example.com/nota"]
+
+
+def drip_server(stop: threading.Event) -> int:
+    """Levanta un servidor HTTP local que envía el cuerpo de a un byte; retorna su puerto"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    listener.settimeout(5)
+
+    def serve():
+        with listener:
+            connection, _ = listener.accept()
+            with connection:
+                connection.recv(4096)
+                connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 1000\r\n\r\n")
+                while not stop.is_set():
+                    connection.sendall(b"x")
+                    time.sleep(0.02)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+class TestDownloadLimits:
+    """Tests para los límites de las descargas en streaming"""
+
+    def test_rejects_content_type(self):
+        """Test para rechazar un PDF sin leer su cuerpo"""
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "application/pdf"}, content=b"%PDF-1.4")
+
+        result = scrape_async(handler)
+
+        assert result["success"] is False
+        assert result["error_category"] == ERROR_CONTENT_TYPE
+        assert result["error"] == "Tipo de contenido no soportado: application/pdf"
+
+    def test_rejects_declared_length(self):
+        """Test para rechazar una respuesta cuyo Content-Length supera el máximo"""
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"x" * 2048)
+
+        result = scrape_async(handler, download_limits=DownloadLimits(max_bytes=1024))
+
+        assert result["error_category"] == ERROR_TOO_LARGE
+        assert result["error"].startswith("Respuesta demasiado grande: ")
+
+    def test_stops_endless_stream(self):
+        """Test para cortar un cuerpo sin Content-Length al superar el máximo"""
+        sent = []
+
+        async def endless():
+            while True:
+                sent.append(1)
+                yield b"<p>" + b"x" * 1000 + b"</p>"
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=endless())
+
+        result = scrape_async(handler, download_limits=DownloadLimits(max_bytes=10_000, stop_buffering_after_fields=False))
+
+        # Se corta en el primer fragmento de lectura (CHUNK_SIZE) que supera el máximo
+        assert result["error_category"] == ERROR_TOO_LARGE
+        assert len(sent) * 1007 < 2 * CHUNK_SIZE
+
+    def test_stop_buffering_after_fields(self):
+        """Test para dejar de guardar el cuerpo cuando ya se vieron todos los campos"""
+        filler = b"<div>" + b"relleno " * 2000 + b"</div>"
+
+        async def body():
+            yield ARTICLE_HEAD
+            for _ in range(100):
+                yield filler
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=body())
+
+        result = scrape_async(handler, download_limits=DownloadLimits(max_bytes=0, stop_buffering_after_fields=True))
+
+        assert result["success"] is True
+        assert result["title"] == "Nota"
+        assert result["date"] == "2024-01-01T12:00:00Z"
+        assert result["content"] == "Primer parrafo"
+        assert result["meta_description"] == "Resumen"
+        # Se informa el tamaño real de la página, no el de la parte guardada
+        assert result["content_length"] == len(ARTICLE_HEAD) + 100 * len(filler)
+
+    def test_stop_buffering_finds_not_found_after_first_chunk(self):
+        """Test para detectar 'Recurso no encontrado' aunque aparezca después de los campos"""
+        body = ARTICLE_HEAD + b"<div>" + b"relleno " * 10_000 + b"</div><p>Recurso no encontrado</p></body></html>"
+        assert body.index(b"Recurso") > CHUNK_SIZE
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=body)
+
+        early = scrape_async(handler, download_limits=DownloadLimits(max_bytes=0, stop_buffering_after_fields=True))
+        full = scrape_async(handler, download_limits=DownloadLimits(max_bytes=0, stop_buffering_after_fields=False))
+
+        assert full["error_category"] == ERROR_NOT_FOUND
+        assert early["success"] is False
+        assert early["error_category"] == ERROR_NOT_FOUND
+        assert early["error"] == full["error"]
+
+    def test_deadline_stops_slow_stream(self):
+        """Test para cortar un cuerpo enviado de a poco al superar el tiempo total"""
+        async def drip():
+            while True:
+                yield b"x"
+                await asyncio.sleep(0.02)
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=drip())
+
+        started = time.monotonic()
+        result = scrape_async(handler, download_limits=DownloadLimits(max_seconds=0.2))
+
+        assert result["error_category"] == ERROR_DEADLINE
+        assert result["error"] == "Descarga demasiado lenta: más de 0.2 s"
+        assert time.monotonic() - started < 2
+
+    def test_sync_deadline_with_slow_server(self):
+        """Test para cortar en WebScraper un servidor que envía un byte antes de cada timeout de lectura"""
+        stop = threading.Event()
+        port = drip_server(stop)
+        scraper = WebScraper(timeout=(1, 5), download_limits=DownloadLimits(max_seconds=0.2))
+
+        started = time.monotonic()
+        try:
+            result = scraper.scrape_website(f"http://127.0.0.1:{port}/nota")
+        finally:
+            stop.set()
+
+        assert result["error_category"] == ERROR_DEADLINE
+        # Se corta al recibir el primer byte pasado el límite, sin esperar el timeout de lectura
+        assert time.monotonic() - started < 2
+
+    def test_http_status_category(self):
+        """Test para distinguir los errores HTTP de los errores de conexión"""
+        result = scrape_async(lambda request: httpx.Response(503))
+
+        assert result["error_category"] == ERROR_HTTP_STATUS
+        assert result["error"].startswith("Error de red (HTTP 503): ")
+
+    @patch('src.apps.scraper.requests.Session.get')
+    def test_sync_not_found_category(self, mock_get):
+        """Test para categorizar las páginas con 'Recurso no encontrado'"""
+        mock_response = Mock(status_code=200, headers={"Content-Type": "text/html"})
+        mock_response.iter_content.return_value = [b"<html><body>Recurso no encontrado</body></html>"]
+        mock_get.return_value = mock_response
+
+        result = WebScraper().scrape_website("https://example.com/nota")
+
+        assert result["error_category"] == ERROR_NOT_FOUND
+        mock_response.close.assert_called_once()
+
+
+class TestBodyReader:
+    """Tests para la lectura del cuerpo por fragmentos"""
+
+    def test_max_bytes(self):
+        """Test para lanzar ResponseTooLarge al superar el máximo"""
+        reader = BodyReader(DownloadLimits(max_bytes=10, stop_buffering_after_fields=False))
+        reader.feed(b"12345")
+
+        with pytest.raises(ResponseTooLarge):
+            reader.feed(b"678901")
+
+    def test_deadline(self):
+        """Test para lanzar DownloadTimeout al recibir un fragmento pasado el tiempo total"""
+        reader = BodyReader(DownloadLimits(max_seconds=1), started=time.monotonic() - 2)
+
+        with pytest.raises(DownloadTimeout):
+            reader.feed(b"<html>")
+
+    def test_feeder_disabled_without_stop_buffering(self):
+        """Test para guardar el cuerpo completo si stop_buffering_after_fields está deshabilitado"""
+        reader = BodyReader(DownloadLimits(stop_buffering_after_fields=False), get_parser("single_pass").incremental())
+
+        assert reader.feed(ARTICLE_HEAD) is False
+        assert reader.content == ARTICLE_HEAD
+
+    def test_keeps_only_prefix_after_fields(self):
+        """Test para seguir leyendo sin guardar el cuerpo después de ver todos los campos"""
+        reader = BodyReader(DownloadLimits(max_bytes=0), get_parser("single_pass").incremental())
+
+        assert reader.feed(ARTICLE_HEAD) is False
+        assert reader.feed(b"<div>relleno</div>") is False
+        reader.close()
+
+        assert reader.truncated is True
+        assert reader.not_found is False
+        assert reader.content == ARTICLE_HEAD
+        assert reader.size == len(ARTICLE_HEAD) + len(b"<div>relleno</div>")
+
+    def test_not_found_split_between_chunks(self):
+        """Test para detectar el mensaje partido entre dos fragmentos y separado por etiquetas"""
+        reader = BodyReader(DownloadLimits(max_bytes=0), get_parser("single_pass").incremental())
+
+        assert reader.feed(ARTICLE_HEAD + b"<p>Recurso no en") is False
+        assert reader.feed(b"<b>contrado</b></p>") is True
+        assert reader.not_found is True
+
+    def test_no_stop_buffering_when_archiving(self):
+        """Test para descargar la página completa cuando se archiva"""
+        scraper = WebScraper(archive=Mock(), download_limits=DownloadLimits(stop_buffering_after_fields=True))
+
+        reader = scraper.body_reader("https://example.com", {"Content-Type": "text/html"})
+
+        assert reader.feeder is None
@@ -0,0 +1,89 @@
+import pytest
+import httpx
+from unittest.mock import Mock, patch
+
+from src.apps.http_cache import ValidatorCache
+from src.apps.scraper import WebScraper
+from src.apps.async_scraper import AsyncWebScraper
+
+
+ARTICLE_HTML = b"""
+<html>
+    <head><title>Nota de prensa</title></head>
+    <body>
+        <time datetime="2024-01-01T12:00:00Z">Enero 1, 2024</time>
+        <div class="article-content"><p>Primer parrafo</p></div>
+    </body>
+</html>
+"""
+
+
+@pytest.fixture
+def cache():
+    """Caché de validadores sobre un Redis simulado con un diccionario"""
+    storage = {}
+    redis_client = Mock()
+    redis_client.get.side_effect = storage.get
+    redis_client.set.side_effect = lambda key, value, ex=None: storage.__setitem__(key, value)
+    return ValidatorCache(redis_client, ttl_seconds=60)
+
+
+class TestValidatorCache:
+    """Tests para la caché de peticiones condicionales"""
+
+    def test_store_requires_validators(self, cache):
+        """Test para no guardar respuestas sin ETag ni Last-Modified"""
+        cache.store("https://example.com/a", {}, {"success": True, "title": "A"})
+
+        assert cache.get("https://example.com/a") is None
+
+    def test_conditional_headers(self, cache):
+        """Test para enviar los validadores guardados en la siguiente petición"""
+        cache.store(
+            "https://example.com/a",
+            {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 12:00:00 GMT"},
+            {"success": True, "title": "A"}
+        )
+
+        entry, headers = cache.conditional_headers("https://example.com/a")
+
+        assert entry["title"] == "A"
+        assert headers == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 12:00:00 GMT"
+        }
+
+    @patch('src.apps.scraper.requests.Session.get')
+    def test_web_scraper_reuses_extraction_on_304(self, mock_get, cache):
+        """Test para reutilizar la extracción guardada cuando el servidor responde 304"""
+        first = Mock(status_code=200, content=ARTICLE_HTML, headers={"ETag": '"v1"'})
+        second = Mock(status_code=304, content=b"", headers={"ETag": '"v1"'})
+        first.iter_content.return_value = [ARTICLE_HTML]
+        mock_get.side_effect = [first, second]
+
+        scraper = WebScraper(cache=cache)
+        fresh = scraper.scrape_website("https://example.com/nota")
+        cached = scraper.scrape_website("https://example.com/nota")
+
+        assert mock_get.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert cached["success"] is True
+        assert cached["status_code"] == 304
+        for field in ("title", "date", "content"):
+            assert cached[field] == fresh[field]
+
+    def test_async_scraper_reuses_extraction_on_304(self, cache):
+        """Test para el mismo comportamiento en el motor asíncrono"""
+        def handler(request):
+            if request.headers.get("If-Modified-Since"):
+                return httpx.Response(304)
+            return httpx.Response(200, content=ARTICLE_HTML,
+                                  headers={"Last-Modified": "Mon, 01 Jan 2024 12:00:00 GMT"})
+
+        scraper = AsyncWebScraper(transport=httpx.MockTransport(handler), cache=cache)
+        [(_, fresh)] = list(scraper.scrape_iter(["https://example.com/nota"]))
+        [(_, cached)] = list(scraper.scrape_iter(["https://example.com/nota"]))
+
+        assert fresh["status_code"] == 200
+        assert cached["status_code"] == 304
+        assert cached["content"] == "Primer parrafo"
+        assert cached["date"] == "2024-01-01T12:00:00Z"
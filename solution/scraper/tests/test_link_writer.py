@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from src.apps.link_writer import LinkBatchWriter
+from src.models import File, Link
+
+
+def make_row(url, success=True):
+    return {
+        "url": url,
+        "title": "Titulo" if success else None,
+        "post_date": None,
+        "content": None,
+        "page_exists": success,
+        "success": success,
+        "error_description": None if success else "Error de red",
+        "processed_date": datetime.utcnow()
+    }
+
+
+class TestLinkBatchWriter:
+    """Tests para la escritura por lotes de la tabla links"""
+
+    def test_flush_by_row_count(self, test_db, sample_file_record):
+        """Test para guardar un lote al alcanzar el número de filas"""
+        on_flush = Mock()
+        writer = LinkBatchWriter(test_db, sample_file_record.id, max_rows=2, max_seconds=60, on_flush=on_flush)
+
+        writer.add(make_row("https://example.com/1"))
+        assert test_db.query(Link).count() == 0
+
+        writer.add(make_row("https://example.com/2", success=False))
+        assert test_db.query(Link).count() == 2
+        on_flush.assert_called_once_with(2, 1, 1)
+
+        # Los contadores del archivo se actualizan en la misma transacción
+        file_record = test_db.query(File).filter(File.id == sample_file_record.id).one()
+        test_db.refresh(file_record)
+        assert file_record.total_processed == 1
+        assert file_record.total_failed == 1
+
+    @patch('src.apps.link_writer.time.monotonic')
+    def test_flush_by_time(self, mock_monotonic, test_db, sample_file_record):
+        """Test para guardar un lote cuando pasó el tiempo máximo"""
+        mock_monotonic.side_effect = [0.0, 1.0, 6.0, 6.0]
+        writer = LinkBatchWriter(test_db, sample_file_record.id, max_rows=100, max_seconds=5)
+
+        writer.add(make_row("https://example.com/1"))
+        assert test_db.query(Link).count() == 0
+
+        writer.add(make_row("https://example.com/2"))
+        assert test_db.query(Link).count() == 2
+        assert writer.processed == 2
+
+    def test_flush_remaining_rows(self, test_db, sample_file_record):
+        """Test para guardar el último lote incompleto"""
+        writer = LinkBatchWriter(test_db, sample_file_record.id, max_rows=10, max_seconds=60)
+        for i in range(3):
+            writer.add(make_row(f"https://example.com/{i}"))
+
+        writer.flush()
+        writer.flush()
+
+        links = test_db.query(Link).filter(Link.file_id == sample_file_record.id).all()
+        assert len(links) == 3
+        assert writer.written == 3
+        assert all(link.title == "Titulo" for link in links)
+
+    def test_file_counts(self, test_db, sample_file_record):
+        """Test para contar el avance del archivo con los contadores de los otros bloques y el lote pendiente"""
+        # Otro bloque del archivo ya guardó 5 URLs
+        sample_file_record.total_processed = 5
+        test_db.commit()
+        writer = LinkBatchWriter(test_db, sample_file_record.id, max_rows=10, max_seconds=60)
+        writer.add(make_row("https://example.com/1"))
+
+        assert writer.file_counts() == (1, 0)
+
+        writer.add(make_row("https://example.com/2", success=False))
+        writer.flush()
+        writer.add(make_row("https://example.com/3"))
+
+        assert writer.file_totals == (6, 1)
+        assert writer.file_counts() == (7, 1)
+
+    def test_flush_failure_rolls_back(self, sample_file_record):
+        """Test para deshacer la transacción si falla el INSERT del lote"""
+        db = Mock()
+        db.execute.side_effect = RuntimeError("db caída")
+        writer = LinkBatchWriter(db, sample_file_record.id, max_rows=10)
+        writer.add(make_row("https://example.com/1"))
+
+        with pytest.raises(RuntimeError):
+            writer.flush()
+
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
+        assert writer.written == 0
@@ -1,5 +1,8 @@
 import pytest
 import json
+import asyncio
+import threading
+import httpx
 from unittest.mock import Mock, patch, MagicMock
 from fastapi import HTTPException
 
@@ -9,10 +12,11 @@ from src.main import app
 class TestMainAPI:
     """Tests para los endpoints de la API principal"""
     
-    def test_process_file_success(self, client, sample_file_record, temp_file):
+    def test_process_file_success(self, client, test_db, sample_file_record, temp_file):
         """Test para procesar un archivo exitosamente"""
         # Actualizar el archivo con la ruta temporal real
         sample_file_record.file_path = temp_file
+        test_db.commit()
         
         with patch('src.main.process_file_task') as mock_task:
             # Mock de la tarea de Celery
@@ -47,11 +51,12 @@ class TestMainAPI:
         data = response.json()
         assert "No se encontró el archivo" in data["detail"]
     
-    def test_process_file_already_processing(self, client, sample_file_record, temp_file):
+    def test_process_file_already_processing(self, client, test_db, sample_file_record, temp_file):
         """Test para procesar un archivo que ya está siendo procesado"""
         # Configurar el archivo como en procesamiento
         sample_file_record.status = "PROCESSING"
         sample_file_record.file_path = temp_file
+        test_db.commit()
         
         response = client.post("/process", json={
             "file_id": sample_file_record.id,
@@ -62,10 +67,49 @@ class TestMainAPI:
         data = response.json()
         assert "ya está siendo procesado" in data["detail"]
     
-    def test_process_file_path_not_exists(self, client, sample_file_record):
+    @patch('src.main.get_file_lease')
+    def test_resume_rejected_while_lease_is_held(self, mock_get_lease, client, test_db, sample_file_record, temp_file):
+        """Test para rechazar la reanudación mientras un worker vivo renueva el lease del archivo"""
+        sample_file_record.status = "PROCESSING"
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        mock_get_lease.return_value.is_held.return_value = True
+        
+        with patch('src.main.process_file_task') as mock_task:
+            response = client.post("/process", json={
+                "file_id": sample_file_record.id,
+                "email": "test@example.com",
+                "resume": True
+            })
+        
+        assert response.status_code == 409
+        assert "worker activo" in response.json()["detail"]
+        mock_task.delay.assert_not_called()
+    
+    @patch('src.main.get_file_lease')
+    def test_resume_allowed_after_lease_expires(self, mock_get_lease, client, test_db, sample_file_record, temp_file):
+        """Test para reanudar un archivo en PROCESSING cuyo lease ya venció"""
+        sample_file_record.status = "PROCESSING"
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        mock_get_lease.return_value.is_held.return_value = False
+        
+        with patch('src.main.process_file_task') as mock_task:
+            mock_task.delay.return_value = Mock(id="test-task-456")
+            response = client.post("/process", json={
+                "file_id": sample_file_record.id,
+                "email": "test@example.com",
+                "resume": True
+            })
+        
+        assert response.status_code == 200
+        mock_task.delay.assert_called_once_with(sample_file_record.id, "test@example.com", resume=True)
+    
+    def test_process_file_path_not_exists(self, client, test_db, sample_file_record):
         """Test para procesar un archivo cuya ruta no existe"""
         # El archivo en la DB tiene una ruta que no existe
         sample_file_record.file_path = "/path/that/does/not/exist.txt"
+        test_db.commit()
         
         response = client.post("/process", json={
             "file_id": sample_file_record.id,
@@ -93,4 +137,38 @@ class TestMainAPI:
         })
         
         assert response.status_code == 422  # Validation error
-    
\ No newline at end of file
+        
+    @pytest.mark.asyncio
+    async def test_process_file_concurrent_requests(self, client, test_db, sample_file_record, temp_file):
+        """Test para que un broker lento no bloquee las demás peticiones a /process"""
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        first_publish = threading.Event()
+        release_first = threading.Event()
+        
+        def blocking_delay(*args, **kwargs):
+            # La primera publicación queda trabada en el broker hasta que el test la libera
+            if not first_publish.is_set():
+                first_publish.set()
+                assert release_first.wait(timeout=5)
+            return Mock(id="test-task-123")
+        
+        with patch('src.main.process_file_task') as mock_task:
+            mock_task.delay.side_effect = blocking_delay
+            
+            async with httpx.AsyncClient(app=app, base_url="http://testserver") as async_client:
+                def post():
+                    return async_client.post("/process", json={"file_id": sample_file_record.id, "email": "test@example.com"})
+                
+                first = asyncio.ensure_future(post())
+                try:
+                    assert await asyncio.to_thread(first_publish.wait, 5)
+                    # Otra petición se atiende mientras la primera sigue esperando al broker
+                    second = await asyncio.wait_for(post(), timeout=5)
+                    assert not first.done()
+                finally:
+                    release_first.set()
+                first_response = await first
+        
+        assert second.status_code == 200
+        assert first_response.status_code == 200
@@ -0,0 +1,97 @@
+import pytest
+import httpx
+from unittest.mock import Mock
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from src import metrics
+from src.apps.async_scraper import AsyncWebScraper
+from src.apps.link_writer import LinkBatchWriter
+from src.apps.resilience import ResilienceCounters
+
+
+ARTICLE_HTML = b"<html><head><title>Nota</title></head><body><p>Hola</p></body></html>"
+
+
+def sample(name, labels=None):
+    """Valor actual de una métrica del registro global (0 si no existe)"""
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+class TestMetrics:
+    """Tests para las métricas de Prometheus"""
+
+    def test_record_url_result(self):
+        """Test para clasificar los resultados por éxito, no encontrada y categoría"""
+        before = {
+            key: sample("scraper_urls_total", {"result": key[0], "category": key[1]})
+            for key in (("success", "none"), ("not_found", "not_found"), ("failure", "network"))
+        }
+
+        metrics.record_url_result({"success": True, "error_category": None})
+        metrics.record_url_result({"success": False, "error_category": "not_found"})
+        metrics.record_url_result({"success": False, "error_category": "network"})
+
+        for (result, category), value in before.items():
+            assert sample("scraper_urls_total", {"result": result, "category": category}) == value + 1
+
+    def test_fetch_and_parse_histograms(self):
+        """Test para medir la descarga y el parseo de cada URL"""
+        fetches = sample("scraper_fetch_seconds_count", {"engine": "httpx"})
+        parses = sample("scraper_parse_seconds_count")
+        scraper = AsyncWebScraper(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=ARTICLE_HTML)))
+
+        dict(scraper.scrape_iter(["https://example.com/1", "https://example.com/2"]))
+
+        assert sample("scraper_fetch_seconds_count", {"engine": "httpx"}) == fetches + 2
+        assert sample("scraper_parse_seconds_count") == parses + 2
+        assert sample("scraper_requests_in_flight") == 0
+
+    def test_db_write_per_url(self):
+        """Test para registrar el tiempo de escritura de cada URL del lote"""
+        writes = sample("scraper_db_write_seconds_count")
+        writer = LinkBatchWriter(Mock(), file_id=1, max_rows=10)
+        for index in range(3):
+            writer.add({"url": f"https://example.com/{index}", "success": True})
+
+        writer.flush()
+
+        assert sample("scraper_db_write_seconds_count") == writes + 3
+
+    def test_task_duration(self):
+        """Test para medir las tareas de Celery y las que están en curso"""
+        labels = {"task": "src.tasks.prueba"}
+        metrics.task_started("id-1", "src.tasks.prueba")
+        assert sample("scraper_celery_tasks_in_progress", labels) == 1
+
+        metrics.task_finished("id-1", "src.tasks.prueba", "SUCCESS")
+
+        assert sample("scraper_celery_tasks_in_progress", labels) == 0
+        assert sample("scraper_celery_task_seconds_count", {**labels, "state": "SUCCESS"}) == 1
+
+    def test_resilience_events(self):
+        """Test para exportar los contadores de resiliencia"""
+        before = sample("scraper_resilience_events_total", {"event": "retry.http_503"})
+
+        ResilienceCounters(metrics.RESILIENCE_EVENTS).increment("retry.http_503")
+
+        assert sample("scraper_resilience_events_total", {"event": "retry.http_503"}) == before + 1
+
+    def test_queue_depth(self):
+        """Test para leer el largo de la cola de Celery de Redis"""
+        registry = CollectorRegistry()
+        redis_client = Mock()
+        redis_client.llen.return_value = 7
+        metrics.register_queue_depth(redis_client, registry=registry)
+
+        assert registry.get_sample_value("scraper_celery_queue_length", {"queue": "celery"}) == 7
+        redis_client.llen.assert_called_with("celery")
+
+    def test_metrics_endpoint(self, client):
+        """Test para exponer las métricas desde la API"""
+        client.get("/")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'scraper_api_request_seconds_count{method="GET",route="/",status="200"}' in response.text
@@ -3,6 +3,8 @@ import json
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
+from sqlalchemy import text
+
 from src.models import File, Link
 
 
@@ -30,3 +32,28 @@ class TestModels:
         assert link.page_exists is True
         assert link.success is False
     
+
+
+class TestIndexes:
+    """Tests para los índices de las consultas por archivo, usuario y URL"""
+
+    def test_declared_indexes(self):
+        """Test para declarar los mismos índices que las migraciones del hub"""
+        files = {index.name: [column.name for column in index.columns] for index in File.__table__.indexes}
+        links = {index.name: index for index in Link.__table__.indexes}
+
+        assert files["IX_files_user_id_uploaded_at"] == ["user_id", "uploaded_at"]
+        assert [column.name for column in links["IX_links_file_id"].columns] == ["file_id"]
+        assert links["IX_links_url"].dialect_options["postgresql"]["using"] == "hash"
+
+    def test_lookup_queries_use_indexes(self, test_db):
+        """Test para resolver con índices la búsqueda de URLs procesadas y la reutilización"""
+        done_urls = test_db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT url FROM links WHERE file_id = 1 AND url IN ('a', 'b')"
+        )).all()
+        reusable = test_db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM links WHERE url IN ('a', 'b') AND success = 1"
+        )).all()
+
+        assert any("USING INDEX" in row[-1] for row in done_urls)
+        assert any("USING INDEX IX_links_url" in row[-1] for row in reusable)
@@ -0,0 +1,168 @@
+import pytest
+from pathlib import Path
+
+from src.apps.parsers import PARSER_BACKENDS, BeautifulSoupBackend, decode_html, get_parser
+from src.apps.scraper import WebScraper
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+PAGES = sorted(PAGES_DIR.glob("*.html"))
+
+# Diferencias conocidas con BeautifulSoup: (backend, página) -> motivo
+KNOWN_DIFFERENCES = {
+    ("selectolax", "campos_en_plantilla.html"): "lexbor deja las etiquetas de <template> fuera del árbol",
+}
+
+
+def extract(scraper, content):
+    """Campos que deben coincidir entre todos los backends"""
+    document = scraper.parser.parse(content)
+    return {
+        "title": scraper._get_title(document),
+        "date": scraper._get_date(document),
+        "content": scraper._get_content(document),
+        "meta_description": scraper._get_meta_description(document),
+        "page_exists": scraper._check_page_exists(document)
+    }
+
+
+class TestParserBackends:
+    """Tests de paridad entre los backends de parseo HTML"""
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    @pytest.mark.parametrize("page", PAGES, ids=lambda page: page.name)
+    def test_parity_with_beautifulsoup(self, backend, page):
+        """Test para verificar que cada backend extrae lo mismo que BeautifulSoup"""
+        if (backend, page.name) in KNOWN_DIFFERENCES:
+            pytest.xfail(KNOWN_DIFFERENCES[(backend, page.name)])
+        content = page.read_bytes()
+        expected = extract(WebScraper(parser=BeautifulSoupBackend()), content)
+
+        assert extract(WebScraper(parser=get_parser(backend)), content) == expected
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_saved_page_fields(self, backend):
+        """Test para verificar los campos extraídos de una nota de prensa guardada"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "nota_prensa.html").read_bytes())
+
+        assert fields["title"] == "Comunidad Andina - Nota de prensa"
+        assert fields["date"] == "2024-03-15T10:30:00-05:00"
+        assert fields["content"].startswith("LaSecretaría Generalde la Comunidad Andina")
+        assert "&" in fields["content"]
+        assert fields["page_exists"] == (True, None)
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_not_found_ignores_scripts(self, backend):
+        """Test para ignorar el mensaje de error dentro de scripts, como BeautifulSoup"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "script_con_mensaje.html").read_bytes())
+
+        assert fields["page_exists"] == (True, None)
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_not_found_ignores_template(self, backend):
+        """Test para ignorar el mensaje de error dentro de <template>, como BeautifulSoup"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "plantilla.html").read_bytes())
+
+        assert fields["page_exists"] == (True, None)
+        assert fields["content"] == "Reunión del Consejo Andino de Ministros."
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_not_found_inside_noscript(self, backend):
+        """Test para incluir el texto de <noscript>, que BeautifulSoup sí lee"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "noscript.html").read_bytes())
+
+        assert fields["page_exists"][0] is False
+        assert fields["content"] == "Recurso no encontrado sin JavaScript"
+
+    @pytest.mark.parametrize("backend", ["bs4", "lxml", "single_pass"])
+    def test_fields_inside_template(self, backend):
+        """Test para tomar las etiquetas de <template> sin su texto, como BeautifulSoup"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "campos_en_plantilla.html").read_bytes())
+
+        assert fields["title"] == ""
+        assert fields["content"] == ""
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_empty_body(self, backend):
+        """Test para extraer un cuerpo vacío sin errores, como BeautifulSoup"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "vacia.html").read_bytes())
+
+        assert fields == {
+            "title": None, "date": None, "content": None, "meta_description": None, "page_exists": (True, None)
+        }
+
+    @pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+    def test_nested_paragraph(self, backend):
+        """Test para tomar el texto de un <p> con otro <p> adentro, que html.parser no cierra"""
+        scraper = WebScraper(parser=get_parser(backend))
+
+        fields = extract(scraper, (PAGES_DIR / "parrafo_anidado.html").read_bytes())
+
+        assert fields["content"] == "Primera partesegunda partey cierre"
+
+    def test_decode_declared_charset(self):
+        """Test para decodificar con el charset declarado en el documento"""
+        html = decode_html((PAGES_DIR / "latin1.html").read_bytes())
+
+        assert "Año de la integración" in html
+
+    def test_unknown_backend_falls_back(self):
+        """Test para usar BeautifulSoup si el backend configurado no existe"""
+        assert isinstance(get_parser("inexistente"), BeautifulSoupBackend)
+
+
+class TestSinglePassBackend:
+    """Tests para la extracción en una sola pasada"""
+
+    def test_skips_text_when_marker_absent(self):
+        """Test para no acumular el texto del documento si el mensaje de error no aparece"""
+        backend = get_parser("single_pass")
+
+        document = backend.parse((PAGES_DIR / "nota_prensa.html").read_bytes())
+
+        assert document.text_parts is None
+        assert backend.page_not_found(document) is False
+
+    def test_marker_split_by_tags(self):
+        """Test para detectar el mensaje aunque sus palabras estén en etiquetas distintas"""
+        backend = get_parser("single_pass")
+
+        document = backend.parse((PAGES_DIR / "no_encontrado.html").read_bytes())
+
+        assert backend.page_not_found(document) is True
+
+    def test_stops_when_fields_found(self):
+        """Test para dejar de parsear cuando ya se encontraron todos los campos"""
+        backend = get_parser("single_pass")
+        head = (
+            b"<html><head><title>T</title><meta name='description' content='D'></head><body>"
+            b"<time datetime='2024-01-01'>x</time><div class='article-content'><p>Uno</p></div>"
+        )
+        # Un resto de documento mayor al tamaño de cada fragmento que se entrega al parser
+        tail = b"<div>" + b"<span>relleno</span>" * (backend.feed_size // 10) + b"</div></body></html>"
+
+        document = backend.parse(head + tail)
+
+        assert document.complete is True
+        assert len(document._stack) > 0
+        assert (document.title, document.meta_description, document.time_datetime) == ("T", "D", "2024-01-01")
+        assert backend.article_paragraph(document) == (True, "Uno")
+
+    def test_numeric_references_disable_prescan(self):
+        """Test para no descartar el mensaje escrito con referencias numéricas"""
+        backend = get_parser("single_pass")
+
+        document = backend.parse("<html><body><p>Recurso no &#101;ncontrado</p></body></html>")
+
+        assert backend.page_not_found(document) is True
@@ -0,0 +1,154 @@
+import json
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from src import profiling
+from src.profiling import SamplingProfiler
+
+
+def busy_leaf(seconds):
+    """Función que consume CPU para que aparezca en las muestras"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(200))
+
+
+def busy_root(seconds):
+    busy_leaf(seconds)
+
+
+def make_task(name="src.tasks.process_file_task", **headers):
+    task = Mock()
+    task.name = name
+    task.request = Mock(spec=[], **headers)
+    return task
+
+
+class TestSamplingProfiler:
+    """Tests para el profiler por muestreo"""
+
+    def test_samples_current_thread(self):
+        """Test para registrar las pilas del hilo perfilado de la raíz a la hoja"""
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        busy_root(0.1)
+        profiler.stop()
+
+        assert profiler.samples > 0
+        stack = [frame.split(" ")[0] for frame in next(s for s in profiler.stacks if s[-1].startswith("busy_leaf"))]
+        assert stack[-2:] == ["busy_root", "busy_leaf"]
+
+        top = profiler.top_functions()
+        leaf = next(row for row in top if row["function"].startswith("busy_leaf"))
+        assert leaf["own_samples"] > 0
+        assert leaf["total_samples"] >= leaf["own_samples"]
+
+    def test_collapsed_format(self):
+        """Test para generar las pilas en el formato de flamegraph.pl"""
+        profiler = SamplingProfiler()
+        profiler.stacks[("main (a.py:1)", "leaf (b.py:5)")] = 3
+
+        assert profiler.collapsed() == "main (a.py:1);leaf (b.py:5) 3\n"
+
+    def test_save_and_list(self, tmp_path):
+        """Test para guardar el perfil por task_id y listarlo con su resumen"""
+        profiler = SamplingProfiler()
+        profiler.stacks[("main (a.py:1)",)] = 2
+        profiler.samples = 2
+
+        path = profiling.save_profile(profiler, str(tmp_path), "abc-123", "src.tasks.process_file_task", [42, "a@b.com"])
+
+        assert open(path).read() == "main (a.py:1) 2\n"
+        listed = profiling.list_profiles(str(tmp_path))
+        assert listed[0]["task_id"] == "abc-123"
+        assert listed[0]["args"] == [42, "a@b.com"]
+        assert "top_functions" not in listed[0]
+        assert profiling.profile_path(str(tmp_path), "abc-123") == path
+        assert profiling.profile_path(str(tmp_path), "../abc-123") is None
+        assert profiling.profile_path(str(tmp_path), "otra") is None
+
+
+class TestTaskProfiling:
+    """Tests para activar el perfil de las tareas por variable de entorno o header"""
+
+    def test_header_activates_profile(self, tmp_path):
+        """Test para perfilar una tarea encolada con el header profile"""
+        task = make_task(profile=True)
+
+        with patch("src.settings.PROFILES_DIR", str(tmp_path)):
+            profiling.task_started("task-1", task)
+            headers = {}
+            profiling.inject_headers(headers)
+            busy_leaf(0.02)
+            profiling.task_finished("task-1", task, [42])
+
+        assert headers == {profiling.PROFILE_HEADER: True}
+        assert (tmp_path / "task-1.folded").exists()
+        metadata = json.loads((tmp_path / "task-1.json").read_text())
+        assert metadata["task_name"] == "src.tasks.process_file_task"
+
+    def test_disabled_without_header(self, tmp_path):
+        """Test para no perfilar sin header ni PROFILING_ENABLED, ni tareas no perfilables"""
+        with patch("src.settings.PROFILES_DIR", str(tmp_path)):
+            for task in (make_task(), make_task("src.tasks.finalize_file_task", profile=True)):
+                profiling.task_started("task-2", task)
+                profiling.task_finished("task-2", task)
+
+        headers = {}
+        profiling.inject_headers(headers)
+        assert headers == {}
+        assert list(tmp_path.iterdir()) == []
+
+    def test_enabled_by_setting(self, tmp_path):
+        """Test para perfilar todas las tareas de archivos con PROFILING_ENABLED"""
+        task = make_task("src.tasks.process_single_url_task")
+
+        with patch("src.settings.PROFILING_ENABLED", True), patch("src.settings.PROFILES_DIR", str(tmp_path)):
+            profiling.task_started("task-3", task)
+            profiling.task_finished("task-3", task)
+
+        assert (tmp_path / "task-3.folded").exists()
+
+
+class TestProfilesAPI:
+    """Tests para los endpoints de perfiles"""
+
+    def test_process_with_profile(self, client, test_db, sample_file_record, temp_file):
+        """Test para encolar el procesamiento con el header de perfil"""
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+
+        with patch("src.main.process_file_task") as mock_task:
+            mock_task.apply_async.return_value = Mock(id="task-9")
+            response = client.post("/process", json={
+                "file_id": sample_file_record.id, "email": "test@example.com", "profile": True
+            })
+
+        assert response.status_code == 200
+        assert response.json()["task_id"] == "task-9"
+        mock_task.apply_async.assert_called_once_with(
+            (sample_file_record.id, "test@example.com"), {"resume": False},
+            headers={profiling.PROFILE_HEADER: True}
+        )
+        mock_task.delay.assert_not_called()
+
+    def test_list_and_download(self, client, tmp_path):
+        """Test para listar y descargar los perfiles guardados"""
+        profiler = SamplingProfiler()
+        profiler.stacks[("main (a.py:1)",)] = 5
+        profiling.save_profile(profiler, str(tmp_path), "task-7", "src.tasks.process_file_task")
+
+        with patch("src.main.PROFILES_DIR", str(tmp_path)):
+            listed = client.get("/profiles")
+            folded = client.get("/profiles/task-7")
+            summary = client.get("/profiles/task-7", params={"format": "json"})
+            missing = client.get("/profiles/otra")
+            invalid = client.get("/profiles/task-7", params={"format": "svg"})
+
+        assert [profile["task_id"] for profile in listed.json()["profiles"]] == ["task-7"]
+        assert folded.status_code == 200
+        assert folded.text == "main (a.py:1) 5\n"
+        assert summary.json()["top_functions"][0]["function"] == "main (a.py:1)"
+        assert missing.status_code == 404
+        assert invalid.status_code == 400
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import redis
+
+from src.apps.progress import ProgressBroker, ProgressPublisher, progress_channel
+from src.models import File
+from src.tasks import process_urls
+
+
+class FakePubSub:
+    """Conexión pub/sub simulada que entrega los mensajes agregados a `messages`"""
+
+    def __init__(self):
+        self.messages = []
+        self.channels = set()
+        self.subscribe_calls = 0
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self.subscribe_calls += 1
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if self.messages:
+            channel, event = self.messages.pop(0)
+            if channel in self.channels:
+                return {"type": "message", "channel": channel, "data": json.dumps(event)}
+        await asyncio.sleep(0.01)
+        return None
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncRedis:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def pubsub(self, **kwargs):
+        return self._pubsub
+
+    async def aclose(self):
+        pass
+
+
+def read_events(response):
+    """Eventos (data) de un stream SSE"""
+    return [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+
+
+class TestProgressPublisher:
+    """Tests para publicar el progreso de un archivo en Redis"""
+
+    def test_report_is_throttled(self):
+        """Test para publicar un avance por intervalo y siempre los cambios de estado"""
+        client = Mock()
+        publisher = ProgressPublisher(client, file_id=42, total=200, min_interval=60)
+
+        publisher.report(10, 0)
+        publisher.report(20, 1)
+        publisher.publish("PROCESSED", 190, 10)
+
+        assert client.publish.call_count == 2
+        channel, payload = client.publish.call_args_list[0].args
+        assert channel == progress_channel(42)
+        assert json.loads(payload)["progress"] == 5
+        final = json.loads(client.publish.call_args_list[1].args[1])
+        assert (final["status"], final["current"], final["progress"]) == ("PROCESSED", 200, 100)
+
+    def test_redis_errors_do_not_propagate(self):
+        """Test para seguir procesando si Redis no está disponible"""
+        client = Mock()
+        client.publish.side_effect = redis.ConnectionError("sin conexión")
+
+        assert ProgressPublisher(client, file_id=42).publish("ERROR", error="falla") is False
+
+    @patch('src.tasks.AsyncWebScraper')
+    def test_process_urls_reports_progress(self, mock_scraper, test_db, sample_file_record):
+        """Test para informar el avance del archivo después de cada URL"""
+        mock_scraper.return_value.scrape_iter.side_effect = lambda urls: (
+            (url, {"success": url.endswith("1"), "page_exists": True}) for url in urls
+        )
+        progress = Mock()
+
+        process_urls(
+            test_db, sample_file_record.id,
+            [(0, "https://example.com/1"), (22, "https://example.com/2")], progress=progress
+        )
+
+        assert [call.args for call in progress.report.call_args_list] == [(1, 0), (1, 1)]
+
+
+class TestProgressBroker:
+    """Tests para repartir los eventos entre los clientes de un proceso"""
+
+    @pytest.mark.asyncio
+    async def test_single_subscription_per_file(self):
+        """Test para suscribirse una sola vez por archivo y entregar cada evento a todos sus clientes"""
+        pubsub = FakePubSub()
+        broker = ProgressBroker(lambda: FakeAsyncRedis(pubsub))
+
+        async with broker.subscribe(1) as first, broker.subscribe(1) as second, broker.subscribe(2) as other:
+            assert pubsub.subscribe_calls == 2
+            assert broker.subscribers(1) == 2
+            pubsub.messages.append((progress_channel(1), {"file_id": 1, "progress": 50}))
+
+            assert (await asyncio.wait_for(first.get(), 1))["progress"] == 50
+            assert (await asyncio.wait_for(second.get(), 1))["progress"] == 50
+            assert other.empty()
+
+        assert pubsub.channels == set()
+        assert broker.subscribers(1) == 0
+        await broker.close()
+
+
+class TestProgressStream:
+    """Tests para el endpoint de progreso en vivo"""
+
+    def test_stream_until_processed(self, client, test_db, sample_file_record):
+        """Test para enviar el estado actual y los eventos del worker hasta que el archivo termina"""
+        sample_file_record.status = "PROCESSING"
+        sample_file_record.total_links = 4
+        sample_file_record.total_processed = 1
+        test_db.commit()
+        pubsub = FakePubSub()
+        channel = progress_channel(sample_file_record.id)
+        pubsub.messages = [
+            (channel, {"file_id": sample_file_record.id, "status": "PROCESSING", "progress": 50}),
+            (channel, {"file_id": sample_file_record.id, "status": "PROCESSED", "progress": 100}),
+        ]
+
+        with patch("src.main.progress_broker", ProgressBroker(lambda: FakeAsyncRedis(pubsub))):
+            with client.stream("GET", f"/progress/{sample_file_record.id}") as response:
+                assert response.headers["content-type"].startswith("text/event-stream")
+                events = read_events(response)
+
+        assert [(event["status"], event["progress"]) for event in events] == [
+            ("PROCESSING", 25), ("PROCESSING", 50), ("PROCESSED", 100)
+        ]
+        assert pubsub.channels == set()
+
+    def test_finished_file(self, client, test_db, sample_file_record):
+        """Test para cerrar el stream después del estado inicial si el archivo ya terminó"""
+        sample_file_record.status = "PROCESSED"
+        test_db.commit()
+        pubsub = FakePubSub()
+
+        with patch("src.main.progress_broker", ProgressBroker(lambda: FakeAsyncRedis(pubsub))):
+            with client.stream("GET", f"/progress/{sample_file_record.id}") as response:
+                events = read_events(response)
+            missing = client.get("/progress/999")
+
+        assert [event["status"] for event in events] == ["PROCESSED"]
+        assert missing.status_code == 404
+        assert pubsub.channels == set()
@@ -0,0 +1,136 @@
+import pytest
+import asyncio
+import redis
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.apps.rate_limiter import HostLimit, HostRateLimiter, parse_host_limits
+
+
+@pytest.fixture
+def redis_client():
+    """Cliente Redis simulado cuyos scripts Lua se controlan desde cada test"""
+    client = Mock()
+    client.register_script.side_effect = [Mock(name="token_bucket"), Mock(name="acquire_slot")]
+    return client
+
+
+@pytest.fixture
+def async_redis_client():
+    """Cliente de redis.asyncio simulado con sus scripts Lua"""
+    client = Mock()
+    client.token_bucket = AsyncMock(name="token_bucket")
+    client.acquire_slot = AsyncMock(name="acquire_slot")
+    client.register_script.side_effect = [client.token_bucket, client.acquire_slot]
+    client.zrem = AsyncMock()
+    return client
+
+
+class TestHostRateLimiter:
+    """Tests para el limitador de peticiones por host"""
+
+    def test_parse_host_limits(self):
+        """Test para interpretar la configuración de límites por host"""
+        default = HostLimit(rate=5, burst=10, max_concurrent=8)
+        limits = parse_host_limits("www.Example.org=2:4:1, api.example.org=0.5,invalid", default)
+
+        assert limits["www.example.org"] == HostLimit(rate=2, burst=4, max_concurrent=1)
+        assert limits["api.example.org"] == HostLimit(rate=0.5, burst=10, max_concurrent=8)
+        assert "invalid" not in limits
+
+    def test_acquire_uses_host_limits(self, redis_client):
+        """Test para verificar que el token bucket recibe los límites del host"""
+        limiter = HostRateLimiter(
+            redis_client,
+            default=HostLimit(rate=5, burst=10),
+            host_limits={"slow.example.org": HostLimit(rate=1, burst=2)}
+        )
+        limiter._token_bucket.return_value = "0"
+
+        assert limiter.acquire("slow.example.org") == 0.0
+        limiter._token_bucket.assert_called_once_with(
+            keys=["scraper:ratelimit:slow.example.org:bucket"],
+            args=[1, 2]
+        )
+
+    @patch('src.apps.rate_limiter.time.sleep')
+    def test_wait_sleeps_until_token(self, mock_sleep, redis_client):
+        """Test para esperar lo indicado por Redis hasta obtener un token"""
+        limiter = HostRateLimiter(redis_client, default=HostLimit(rate=5, burst=10))
+        limiter._token_bucket.side_effect = ["0.2", "0.1", "0"]
+
+        limiter.wait("example.org")
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.2, 0.1]
+
+    def test_redis_failure_fails_open(self, redis_client):
+        """Test para no bloquear el scraping si Redis no responde"""
+        limiter = HostRateLimiter(redis_client, default=HostLimit(rate=5, burst=10, max_concurrent=2))
+        limiter._token_bucket.side_effect = redis.ConnectionError("down")
+        limiter._acquire_slot_script.side_effect = redis.ConnectionError("down")
+
+        assert limiter.acquire("example.org") == 0.0
+        assert limiter.acquire_slot("example.org", "token") is True
+
+    @patch('src.apps.rate_limiter.time.sleep')
+    def test_limit_holds_and_releases_slot(self, mock_sleep, redis_client):
+        """Test para ocupar un slot de concurrencia durante la petición y liberarlo"""
+        limiter = HostRateLimiter(redis_client, default=HostLimit(rate=5, burst=10, max_concurrent=1))
+        limiter._acquire_slot_script.side_effect = [0, 1]
+        limiter._token_bucket.return_value = "0"
+
+        with limiter.limit("https://example.org/page"):
+            pass
+
+        assert limiter._acquire_slot_script.call_count == 2
+        token = limiter._acquire_slot_script.call_args.kwargs["args"][1]
+        redis_client.zrem.assert_called_once_with("scraper:ratelimit:example.org:slots", token)
+
+    def test_limit_async(self, redis_client):
+        """Test para el contexto asíncrono del limitador"""
+        limiter = HostRateLimiter(redis_client, default=HostLimit(rate=5, burst=10, max_concurrent=1), poll_interval=0)
+        limiter._acquire_slot_script.side_effect = [0, 1]
+        limiter._token_bucket.side_effect = ["0.001", "0"]
+
+        async def run():
+            async with limiter.limit_async("https://example.org/page"):
+                return True
+
+        assert asyncio.run(run()) is True
+        assert limiter._token_bucket.call_count == 2
+        redis_client.zrem.assert_called_once()
+
+    def test_limit_async_uses_async_client(self, redis_client, async_redis_client):
+        """Test para no hacer llamadas síncronas a Redis desde el event loop"""
+        limiter = HostRateLimiter(
+            redis_client, default=HostLimit(rate=5, burst=10, max_concurrent=1), poll_interval=0,
+            async_client_factory=lambda: async_redis_client
+        )
+        token_bucket, acquire_slot = async_redis_client.token_bucket, async_redis_client.acquire_slot
+        acquire_slot.side_effect = [0, 1]
+        token_bucket.side_effect = ["0.001", "0"]
+
+        async def run():
+            async with limiter.limit_async("https://example.org/page"):
+                return True
+
+        assert asyncio.run(run()) is True
+        assert token_bucket.await_count == 2
+        async_redis_client.zrem.assert_awaited_once()
+        limiter._token_bucket.assert_not_called()
+        limiter._acquire_slot_script.assert_not_called()
+        redis_client.zrem.assert_not_called()
+
+    def test_async_redis_failure_fails_open(self, redis_client, async_redis_client):
+        """Test para no bloquear el scraping asíncrono si Redis no responde"""
+        limiter = HostRateLimiter(
+            redis_client, default=HostLimit(rate=5, burst=10, max_concurrent=2),
+            async_client_factory=lambda: async_redis_client
+        )
+        token_bucket, acquire_slot = async_redis_client.token_bucket, async_redis_client.acquire_slot
+        token_bucket.side_effect = redis.ConnectionError("down")
+        acquire_slot.side_effect = redis.ConnectionError("down")
+
+        async def run():
+            return await limiter.acquire_async("example.org"), await limiter.acquire_slot_async("example.org", "token")
+
+        assert asyncio.run(run()) == (0.0, True)
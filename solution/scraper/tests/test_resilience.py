@@ -0,0 +1,174 @@
+import pytest
+import httpx
+import requests
+from unittest.mock import Mock, patch
+
+from src.apps.async_scraper import AsyncWebScraper
+from src.apps.download import ERROR_CIRCUIT_OPEN, ERROR_HTTP_STATUS
+from src.apps.resilience import CircuitBreaker, ResilienceCounters, RetryPolicy, parse_retry_after, resilience_counters
+from src.apps.scraper import WebScraper
+
+
+ARTICLE_HTML = b"<html><head><title>Nota</title></head><body><p>Hola</p></body></html>"
+
+
+def scrape_async(handler, url="https://example.com/nota", **kwargs):
+    """Scrapea una URL con AsyncWebScraper sobre un transporte simulado"""
+    scraper = AsyncWebScraper(transport=httpx.MockTransport(handler), **kwargs)
+    return dict(scraper.scrape_iter([url]))[url]
+
+
+class TestRetryPolicy:
+    """Tests para el cálculo de la espera entre reintentos"""
+
+    def test_delay_with_jitter(self):
+        """Test para que la espera quede entre 0 y el backoff exponencial limitado"""
+        policy = RetryPolicy(max_attempts=5, base_delay=1, max_delay=3)
+
+        for _ in range(50):
+            assert 0 <= policy.delay(0) <= 1
+            assert 0 <= policy.delay(1) <= 2
+            assert 0 <= policy.delay(4) <= 3
+
+    def test_retry_after(self):
+        """Test para respetar Retry-After en segundos, limitado por max_delay"""
+        policy = RetryPolicy(max_delay=10)
+
+        assert policy.delay(0, "4") == 4
+        assert policy.delay(0, "120") == 10
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("mañana") is None
+
+    def test_should_retry(self):
+        """Test para limitar los intentos totales"""
+        policy = RetryPolicy(max_attempts=3)
+
+        assert policy.should_retry(0) is True
+        assert policy.should_retry(1) is True
+        assert policy.should_retry(2) is False
+
+
+class TestCircuitBreaker:
+    """Tests para el circuit breaker por host"""
+
+    def test_opens_on_error_rate(self):
+        """Test para abrir el circuito al superar la proporción de fallos"""
+        counters = ResilienceCounters()
+        breaker = CircuitBreaker(window_size=4, min_requests=4, failure_ratio=0.5, counters=counters)
+        url = "https://caido.com/a"
+
+        for failed in (False, True, False):
+            breaker.record(url, failed)
+        assert breaker.allow(url) is True
+
+        breaker.record(url, True)
+
+        assert breaker.state(url) == "open"
+        assert breaker.allow(url) is False
+        assert breaker.allow("https://otro.com/a") is True
+        assert counters.snapshot() == {"circuit.opened": 1, "circuit.rejected": 1}
+
+    def test_half_open_probe(self):
+        """Test para dejar pasar una sola petición de prueba tras open_seconds"""
+        breaker = CircuitBreaker(min_requests=1, failure_ratio=1, open_seconds=30, counters=ResilienceCounters())
+        url = "https://caido.com/a"
+        breaker.record(url, True)
+
+        with patch('src.apps.resilience.time.monotonic', return_value=10 ** 9):
+            assert breaker.allow(url) is True
+            assert breaker.allow(url) is False
+            breaker.record(url, False)
+
+        assert breaker.state(url) == "closed"
+        assert breaker.allow(url) is True
+
+
+class TestScraperRetries:
+    """Tests para los reintentos de WebScraper y AsyncWebScraper"""
+
+    def setup_method(self):
+        resilience_counters.reset()
+
+    def test_async_retries_503(self):
+        """Test para reintentar un 503 hasta obtener la página"""
+        responses = iter([httpx.Response(503), httpx.Response(200, content=ARTICLE_HTML)])
+
+        result = scrape_async(lambda request: next(responses), retry_policy=RetryPolicy(base_delay=0))
+
+        assert result["success"] is True
+        assert resilience_counters.snapshot() == {"retry.http_503": 1}
+
+    def test_async_does_not_retry_404(self):
+        """Test para no reintentar los errores HTTP definitivos"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        result = scrape_async(handler, retry_policy=RetryPolicy(base_delay=0))
+
+        assert result["error_category"] == ERROR_HTTP_STATUS
+        assert len(calls) == 1
+
+    @patch('src.apps.async_scraper.asyncio.sleep')
+    def test_async_honors_retry_after(self, mock_sleep):
+        """Test para esperar lo que indica Retry-After en un 429"""
+        responses = iter([httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200, content=ARTICLE_HTML)])
+
+        result = scrape_async(lambda request: next(responses), retry_policy=RetryPolicy())
+
+        assert result["success"] is True
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_async_exhausts_attempts(self):
+        """Test para registrar el fallo tras agotar los intentos"""
+        def handler(request):
+            raise httpx.ConnectTimeout("timeout", request=request)
+
+        result = scrape_async(handler, retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+
+        assert result["success"] is False
+        assert result["error"].startswith("Error de red: ")
+        assert resilience_counters.snapshot() == {"retry.network": 1, "retry.exhausted": 1}
+
+    def test_async_circuit_fails_fast(self):
+        """Test para no contactar un host cuyo circuito está abierto"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+
+        breaker = CircuitBreaker(min_requests=1, failure_ratio=1, counters=ResilienceCounters())
+        first = scrape_async(handler, circuit_breaker=breaker)
+        second = scrape_async(handler, url="https://example.com/otra", circuit_breaker=breaker)
+
+        assert first["error_category"] == ERROR_HTTP_STATUS
+        assert second["error_category"] == ERROR_CIRCUIT_OPEN
+        assert second["error"] == "Host no disponible (circuito abierto): example.com"
+        assert len(calls) == 1
+
+    @patch('src.apps.scraper.time.sleep')
+    @patch('src.apps.scraper.requests.Session.get')
+    def test_sync_retries_timeout(self, mock_get, mock_sleep):
+        """Test para reintentar un timeout en WebScraper"""
+        mock_response = Mock(status_code=200, headers={"Content-Type": "text/html"})
+        mock_response.iter_content.return_value = [ARTICLE_HTML]
+        mock_get.side_effect = [requests.exceptions.ReadTimeout("timeout"), mock_response]
+
+        result = WebScraper(retry_policy=RetryPolicy(base_delay=0)).scrape_website("https://example.com/nota")
+
+        assert result["success"] is True
+        assert mock_get.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch('src.apps.scraper.requests.Session.get')
+    def test_sync_does_not_retry_invalid_url(self, mock_get):
+        """Test para no reintentar los errores de red definitivos"""
+        mock_get.side_effect = requests.exceptions.InvalidURL("url inválida")
+
+        result = WebScraper(retry_policy=RetryPolicy(base_delay=0)).scrape_website("https://example.com/nota")
+
+        assert result["success"] is False
+        assert mock_get.call_count == 1
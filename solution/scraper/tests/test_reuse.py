@@ -0,0 +1,105 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.apps.reuse import normalize_url, find_reusable_results
+from src.models import File, Link
+from src.tasks import process_urls
+
+
+@pytest.fixture
+def previous_links(test_db, sample_file_record):
+    """Links scrapeados previamente desde otro archivo"""
+    links = [
+        Link(file_id=sample_file_record.id, url="https://example.com/nota-1/",
+             title="Nota 1", post_date=datetime(2024, 1, 1, 12), content="Contenido 1",
+             page_exists=True, success=True, processed_date=datetime.utcnow() - timedelta(hours=1)),
+        Link(file_id=sample_file_record.id, url="https://example.com/nota-2",
+             title="Nota 2", page_exists=True, success=True,
+             processed_date=datetime.utcnow() - timedelta(days=3)),
+        Link(file_id=sample_file_record.id, url="https://example.com/nota-3",
+             page_exists=False, success=False, error_description="Error de red",
+             processed_date=datetime.utcnow())
+    ]
+    test_db.add_all(links)
+    test_db.commit()
+    return links
+
+
+class TestReuse:
+    """Tests para la reutilización de resultados entre archivos"""
+
+    def test_normalize_url(self):
+        """Test para identificar la misma URL escrita de distintas formas"""
+        expected = "https://example.com/nota?a=1&b=2"
+
+        assert normalize_url("HTTPS://Example.com:443/nota/?b=2&a=1#top") == expected
+        assert normalize_url("https://example.com/nota?a=1&utm_source=mail&b=2") == expected
+        assert normalize_url("https://example.com") == "https://example.com/"
+        assert normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+    def test_find_reusable_results(self, test_db, previous_links):
+        """Test para reutilizar solo scrapes exitosos dentro de la ventana de frescura"""
+        urls = [
+            "https://example.com/nota-1",
+            "https://example.com/nota-2",
+            "https://example.com/nota-3"
+        ]
+
+        reusable = find_reusable_results(test_db, urls, freshness_hours=24)
+
+        assert list(reusable) == ["https://example.com/nota-1"]
+        result = reusable["https://example.com/nota-1"]
+        assert result["success"] is True
+        assert result["title"] == "Nota 1"
+        assert result["date"] == "2024-01-01T12:00:00"
+        assert result["reused_link_id"] == previous_links[0].id
+
+    def test_find_reusable_results_disabled(self, test_db, previous_links):
+        """Test para deshabilitar la reutilización con una ventana de 0 horas"""
+        assert find_reusable_results(test_db, ["https://example.com/nota-1"], freshness_hours=0) == {}
+
+    @patch('src.tasks.AsyncWebScraper')
+    def test_process_urls_skips_network_for_reused(self, mock_scraper, test_db, sample_file_record, previous_links):
+        """Test para copiar el resultado reutilizado y descargar solo el resto"""
+        mock_scraper.return_value.scrape_iter.side_effect = lambda urls: (
+            (url, {"success": True, "page_exists": True, "title": "Nueva"}) for url in urls
+        )
+        new_file = File(total_links=2, file_path="/tmp/otro.txt", file_name="otro.txt",
+                        status="PENDING", uploaded_at=datetime.now(), user_id=1)
+        test_db.add(new_file)
+        test_db.commit()
+
+        processed, failed = process_urls(
+            test_db, new_file.id,
+            [(0, "https://example.com/nota-1"), (27, "https://example.com/nueva")]
+        )
+
+        assert (processed, failed) == (2, 0)
+        mock_scraper.return_value.scrape_iter.assert_called_once_with(["https://example.com/nueva"])
+        copied = test_db.query(Link).filter(Link.file_id == new_file.id, Link.url == "https://example.com/nota-1").one()
+        assert copied.title == "Nota 1"
+        assert copied.content == "Contenido 1"
+        assert copied.post_date == datetime(2024, 1, 1, 12)
+        assert copied.success is True
+        assert copied.processed_date == previous_links[0].processed_date
+        fresh = test_db.query(Link).filter(Link.file_id == new_file.id, Link.url == "https://example.com/nueva").one()
+        assert fresh.processed_date > previous_links[0].processed_date
+
+    def test_reused_copy_does_not_renew_freshness(self, test_db, sample_file_record):
+        """Test para no volver a reutilizar una copia cuyo scrape original ya no es reciente"""
+        scraped_at = datetime.utcnow() - timedelta(hours=23)
+        original = Link(file_id=sample_file_record.id, url="https://example.com/nota-vieja", title="Vieja",
+                        page_exists=True, success=True, processed_date=scraped_at)
+        test_db.add(original)
+        test_db.commit()
+
+        with patch('src.tasks.AsyncWebScraper'):
+            process_urls(test_db, sample_file_record.id, [(0, "https://example.com/nota-vieja?utm_source=x")])
+
+        copy = test_db.query(Link).filter(Link.url == "https://example.com/nota-vieja?utm_source=x").one()
+        assert copy.processed_date == scraped_at
+        # Dos horas después el original y su copia quedan fuera de la ventana de 24 horas
+        with patch('src.apps.reuse.datetime') as mock_datetime:
+            mock_datetime.utcnow.return_value = datetime.utcnow() + timedelta(hours=2)
+            assert find_reusable_results(test_db, ["https://example.com/nota-vieja"], freshness_hours=24) == {}
@@ -27,6 +27,8 @@ class TestWebScraper:
             </body>
         </html>
         """
+        mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        mock_response.iter_content.return_value = [mock_response.content]
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         
@@ -42,7 +44,7 @@ class TestWebScraper:
         assert 'content' in result
         assert 'meta_description' in result
         
-        mock_get.assert_called_once_with("https://example.com/test", timeout=30)
+        mock_get.assert_called_once_with("https://example.com/test", timeout=(5.0, 30.0), stream=True)
     
     
     @patch('src.apps.scraper.requests.Session.get')
@@ -59,6 +61,8 @@ class TestWebScraper:
             </body>
         </html>
         """.encode('utf-8')
+        mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        mock_response.iter_content.return_value = [mock_response.content]
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         
@@ -71,68 +75,56 @@ class TestWebScraper:
     
     def test_get_title_with_title_tag(self):
         """Test para extraer título cuando existe tag title"""
-        from bs4 import BeautifulSoup
-        
         html = "<html><head><title>  Test Title  </title></head></html>"
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         title = scraper._get_title(soup)
         
         assert title == "Test Title"
     
     def test_get_title_without_title_tag(self):
         """Test para extraer título cuando no existe tag title"""
-        from bs4 import BeautifulSoup
-        
         html = "<html><head></head><body><h1>Header</h1></body></html>"
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         title = scraper._get_title(soup)
         
         assert title is None
     
     def test_get_date_with_time_tag(self):
         """Test para extraer fecha cuando existe tag time con datetime"""
-        from bs4 import BeautifulSoup
-        
         html = '<html><body><time datetime="2024-01-01T12:00:00Z">Jan 1, 2024</time></body></html>'
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         date = scraper._get_date(soup)
         
         assert date == "2024-01-01T12:00:00Z"
     
     def test_get_date_without_time_tag(self):
         """Test para extraer fecha cuando no existe tag time"""
-        from bs4 import BeautifulSoup
-        
         html = "<html><body><p>Some content</p></body></html>"
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         date = scraper._get_date(soup)
         
         assert date is None
     
     def test_get_meta_description(self):
         """Test para extraer meta description"""
-        from bs4 import BeautifulSoup
-        
         html = '<html><head><meta name="description" content="Test description"></head></html>'
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         description = scraper._get_meta_description(soup)
         
         assert description == "Test description"
     
     def test_get_content_extraction(self):
         """Test para extraer contenido del body"""
-        from bs4 import BeautifulSoup
-        
         html = """
         <html>
             <body>
@@ -146,17 +138,15 @@ class TestWebScraper:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         content = scraper._get_content(soup)
         
         assert content == "First paragraph"  # La función retorna el primer párrafo
     
     def test_get_content_no_article_div(self):
         """Test para extraer contenido cuando no existe article-content"""
-        from bs4 import BeautifulSoup
-        
         html = """
         <html>
             <body>
@@ -166,9 +156,46 @@ class TestWebScraper:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
         scraper = WebScraper()
+        soup = scraper.parser.parse(html)
+        
         content = scraper._get_content(soup)
         
         assert content is None  # Debería retornar None si no hay div article-content
+
+
+class TestHtmlContentModes:
+    """Tests para los modos de conservación del HTML en html_content"""
+
+    HTML = b"<html><head><title>Modo</title></head><body><p>Hola</p></body></html>"
+
+    def test_off_by_default(self):
+        """Test para no conservar el HTML por defecto"""
+        result = WebScraper().parse_response("https://example.com", 200, self.HTML)
+
+        assert result['html_content'] is None
+        assert result['content_length'] == len(self.HTML)
+
+    def test_raw_keeps_response_bytes(self):
+        """Test para conservar los bytes originales de la respuesta"""
+        result = WebScraper(html_content_mode='raw').parse_response("https://example.com", 200, self.HTML)
+
+        assert result['html_content'] is self.HTML
+
+    def test_lazy_serializes_on_demand(self):
+        """Test para serializar el HTML solo cuando se lee"""
+        scraper = WebScraper(html_content_mode='lazy')
+        with patch.object(scraper.parser, 'serialize', wraps=scraper.parser.serialize) as serialize:
+            result = scraper.parse_response("https://example.com", 200, self.HTML)
+            serialize.assert_not_called()
+
+            html = str(result['html_content'])
+            str(result['html_content'])
+
+        serialize.assert_called_once()
+        assert "<title>Modo</title>" in html
+
+    def test_invalid_mode(self):
+        """Test para rechazar un modo desconocido"""
+        with pytest.raises(ValueError):
+            WebScraper(html_content_mode='completo')
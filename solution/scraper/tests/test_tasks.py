@@ -210,3 +210,171 @@ class TestTasks:
         
         # Verificar que el resultado fue exitoso
         assert result["success"] is True
+
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_process_file_task_writes_links(self, mock_publish, mock_session, mock_scraper, test_db, sample_file_record, temp_file):
+        """Test para verificar que cada resultado del motor asíncrono genera un Link"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+
+        def fake_scrape_iter(urls):
+            for url in urls:
+                success = not url.endswith("page2")
+                yield url, {
+                    "title": "Test" if success else None,
+                    "date": "2024-01-01T12:00:00Z" if success else None,
+                    "content": "Contenido" if success else None,
+                    "page_exists": success,
+                    "success": success,
+                    "error": None if success else "Error de red: timeout"
+                }
+
+        mock_scraper.return_value.scrape_iter.side_effect = fake_scrape_iter
+
+        with patch.object(process_file_task, 'update_state'):
+            result = process_file_task(file_id, "test@example.com")
+
+        assert result["success"] is True
+        assert result["processed"] == 2
+        assert result["failed"] == 1
+
+        links = test_db.query(Link).filter(Link.file_id == file_id).all()
+        assert len(links) == 3
+        failed = [link for link in links if not link.success]
+        assert failed[0].url == "https://example.com/page2"
+        assert failed[0].error_description == "Error de red: timeout"
+
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.status == "PROCESSED"
+        assert file_record.total_processed == 2
+        assert file_record.total_failed == 1
+        mock_publish.assert_called_once()
+
+    @patch('src.tasks.chord')
+    @patch('src.tasks.FILE_CHUNK_SIZE', 2)
+    @patch('src.tasks.SessionLocal')
+    def test_process_file_task_dispatches_chunks(self, mock_session, mock_chord, test_db, sample_file_record, temp_file):
+        """Test para verificar que un archivo grande se divide en un chord de bloques"""
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        mock_chord.return_value.return_value = Mock(id="callback-123")
+
+        result = process_file_task(file_id, "test@example.com")
+
+        assert result["success"] is True
+        assert result["status"] == "DISPATCHED"
+        assert result["chunks"] == 2
+        assert result["callback_task_id"] == "callback-123"
+
+        # Cada bloque viaja como un rango de bytes del archivo, no como lista de URLs
+        line_length = len("https://example.com/page1\n")
+        signatures = list(mock_chord.call_args[0][0])
+        assert [sig.args for sig in signatures] == [
+            (file_id, 0, 0, 2 * line_length, 2),
+            (file_id, 1, 2 * line_length, 3 * line_length, 1)
+        ]
+        callback = mock_chord.return_value.call_args[0][0]
+        assert callback.args == (file_id, "test@example.com", 3)
+
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_chunk_tasks_and_finalize(self, mock_publish, mock_session, mock_scraper, test_db, sample_file_record, temp_file):
+        """Test para procesar bloques y consolidarlos en el callback del chord"""
+        from src.tasks import process_chunk_task, finalize_file_task
+
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+        mock_scraper.return_value.scrape_iter.side_effect = lambda urls: (
+            (url, {"success": "page2" not in url, "page_exists": "page2" not in url,
+                   "error": "Error de red" if "page2" in url else None})
+            for url in urls
+        )
+
+        line_length = len("https://example.com/page1\n")
+        first = process_chunk_task(file_id, 0, 0, 2 * line_length, 2)
+        second = process_chunk_task(file_id, 1, 2 * line_length, 3 * line_length, 1)
+
+        assert first == {"chunk": 0, "processed": 1, "failed": 1}
+        assert second == {"chunk": 1, "processed": 1, "failed": 0}
+
+        # Los contadores se acumulan a medida que terminan los bloques
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.total_processed == 2
+        assert file_record.total_failed == 1
+
+        summary = finalize_file_task([first, second], file_id, "test@example.com", 3)
+
+        assert summary["success"] is True
+        assert summary["processed"] == 2
+        assert summary["failed"] == 1
+        assert summary["total_urls"] == 3
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.status == "PROCESSED"
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 3
+        mock_publish.assert_called_once_with(file_id, "test@example.com", summary)
+
+    @patch('src.tasks.AsyncWebScraper')
+    @patch('src.tasks.SessionLocal')
+    @patch('src.tasks.publish_processing_complete')
+    def test_finalize_with_failed_chunk(self, mock_publish, mock_session, mock_scraper, test_db, sample_file_record, temp_file):
+        """Test para dejar el archivo en ERROR si un bloque falló en lugar de marcarlo PROCESSED"""
+        from src.tasks import process_chunk_task, finalize_file_task
+
+        mock_session.return_value = test_db
+        sample_file_record.file_path = temp_file
+        test_db.commit()
+        file_id = sample_file_record.id
+
+        def scrape(urls):
+            if any("page3" in url for url in urls):
+                raise RuntimeError("worker sin memoria")
+            return ((url, {"success": True, "page_exists": True}) for url in urls)
+        mock_scraper.return_value.scrape_iter.side_effect = scrape
+
+        line_length = len("https://example.com/page1\n")
+        first = process_chunk_task(file_id, 0, 0, 2 * line_length, 2)
+        second = process_chunk_task(file_id, 1, 2 * line_length, 3 * line_length, 1)
+        assert "worker sin memoria" in second["error"]
+
+        summary = finalize_file_task([first, second], file_id, "test@example.com", 3)
+
+        assert summary["success"] is False
+        assert summary["status"] == "ERROR"
+        assert summary["failed_chunks"] == [1]
+        file_record = test_db.query(File).filter(File.id == file_id).first()
+        assert file_record.status == "ERROR"
+        assert test_db.query(Link).filter(Link.file_id == file_id).count() == 2
+        mock_publish.assert_not_called()
+
+    @patch('src.tasks.get_progress_publisher')
+    def test_mark_file_error_logs_db_failure(self, mock_publisher, caplog):
+        """Test para registrar el error si no se puede marcar el archivo como ERROR"""
+        from sqlalchemy.exc import OperationalError
+        from src.tasks import _mark_file_error
+
+        db = Mock()
+        db.query.side_effect = OperationalError("SELECT", {}, Exception("conexión perdida"))
+
+        _mark_file_error(db, 1, "falla")
+
+        assert "No se pudo marcar el archivo 1 como ERROR" in caplog.text
+        mock_publisher.return_value.publish.assert_called_once_with("ERROR", error="falla")
+
+    def test_mark_file_error_propagates_interrupts(self):
+        """Test para no ocultar KeyboardInterrupt al marcar el archivo como ERROR"""
+        from src.tasks import _mark_file_error
+
+        db = Mock()
+        db.rollback.side_effect = KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            _mark_file_error(db, 1)
@@ -0,0 +1,156 @@
+import json
+from datetime import datetime
+import pytest
+import httpx
+from unittest.mock import Mock, patch
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from src import tracing
+from src.apps.async_scraper import AsyncWebScraper
+from src.apps.link_writer import LinkBatchWriter
+from src.models import File
+from src.tasks import propagate_trace_context
+
+
+ARTICLE_HTML = (
+    b"<html><head><title>Nota</title></head><body><time datetime='2024-03-15'>15</time>"
+    b"<div class='article-content'><p>Hola</p></div></body></html>"
+)
+
+# El TracerProvider global solo se puede configurar una vez por proceso
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans():
+    """Exporter en memoria con los spans terminados durante el test"""
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        trace.set_tracer_provider(provider)
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def by_name(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+class TestTracing:
+    """Tests para los spans por fase del procesamiento"""
+
+    def test_scrape_phases(self, spans):
+        """Test para registrar descarga, parseo y cada extractor como hijos del span de la URL"""
+        scraper = AsyncWebScraper(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=ARTICLE_HTML)))
+
+        dict(scraper.scrape_iter(["https://example.com/1"]))
+
+        found = by_name(spans)
+        url_span = found["scrape.url"]
+        assert url_span.attributes["url"] == "https://example.com/1"
+        assert found["http.get"].parent.span_id == url_span.context.span_id
+        assert found["http.get"].attributes["http.status_code"] == 200
+        assert found["parse"].parent.span_id == found["http.get"].parent.span_id
+        for name in ("parse.html", "extract.page_exists", "extract.title", "extract.date",
+                     "extract.content", "extract.meta_description"):
+            assert found[name].parent.span_id == found["parse"].context.span_id
+
+    def test_db_flush_span(self, spans):
+        """Test para registrar cada escritura de un lote de links"""
+        writer = LinkBatchWriter(Mock(), file_id=42, max_rows=10)
+        writer.add({"url": "https://example.com/1", "success": True})
+        writer.add({"url": "https://example.com/2", "success": False})
+
+        writer.flush()
+
+        flush_span = by_name(spans)["db.flush"]
+        assert flush_span.attributes["file_id"] == 42
+        assert flush_span.attributes["rows"] == 2
+
+    def test_propagation_to_task(self, spans):
+        """Test para continuar en la tarea la traza que la encoló"""
+        headers = {}
+        with tracing.start_span("celery.enqueue") as enqueue_span:
+            propagate_trace_context(headers=headers)
+        assert "traceparent" in headers
+
+        task = Mock()
+        task.name = "src.tasks.process_file_task"
+        task.request = Mock(spec=[], **headers)
+        tracing.task_span_start("task-1", task, [42, "user@example.com"])
+        tracing.set_attributes(file_id=42)
+        tracing.task_span_end("task-1", "SUCCESS")
+
+        task_span = by_name(spans)["celery.task src.tasks.process_file_task"]
+        assert task_span.context.trace_id == enqueue_span.get_span_context().trace_id
+        assert task_span.parent.span_id == enqueue_span.get_span_context().span_id
+        assert task_span.attributes["file_id"] == 42
+        assert task_span.attributes["celery.state"] == "SUCCESS"
+        # El contexto de la tarea ya no es el actual
+        assert not trace.get_current_span().is_recording()
+
+    def test_process_enqueue_span(self, spans, client, test_db, tmp_path):
+        """Test para encolar la tarea dentro del span de la petición a /process"""
+        urls_file = tmp_path / "urls.txt"
+        urls_file.write_text("https://example.com/1\n")
+        file_record = File(
+            total_links=1, file_name="urls.txt", file_path=str(urls_file), status="PENDING",
+            uploaded_at=datetime.utcnow(), user_id=1
+        )
+        test_db.add(file_record)
+        test_db.commit()
+        parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+        with patch("src.main.process_file_task") as mock_task:
+            mock_task.delay.return_value.id = "task-1"
+            response = client.post(
+                "/process", json={"file_id": file_record.id, "email": "user@example.com"},
+                headers={"traceparent": parent}
+            )
+
+        assert response.status_code == 200
+        found = by_name(spans)
+        server_span = found["POST /process"]
+        assert format(server_span.context.trace_id, "032x") == "0af7651916cd43dd8448eb211c80319c"
+        assert found["celery.enqueue"].parent.span_id == server_span.context.span_id
+        assert found["celery.enqueue"].attributes["celery.task_id"] == "task-1"
+
+    @pytest.mark.asyncio
+    async def test_httpx_trace_hook(self, spans):
+        """Test para registrar la conexión a partir de los eventos de httpx"""
+        assert tracing.httpx_trace_hook() is None
+
+        with tracing.start_span("http.get"):
+            hook = tracing.httpx_trace_hook()
+            await hook("connection.connect_tcp.started", {})
+            await hook("connection.connect_tcp.complete", {})
+            await hook("http11.send_request_headers.started", {})
+
+        found = by_name(spans)
+        assert found["http.connect"].parent.span_id == found["http.get"].context.span_id
+        assert "http11.send_request_headers" not in found
+
+    def test_file_exporter_and_summary(self, tmp_path):
+        """Test para exportar los spans en JSON lines y resumirlos por archivo"""
+        provider = TracerProvider()
+        path = str(tmp_path / "traces" / "scraper-worker.jsonl")
+        provider.add_span_processor(SimpleSpanProcessor(tracing.JsonLinesSpanExporter(path)))
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("celery.task", attributes={"file_id": 42}):
+            for _ in range(3):
+                with tracer.start_as_current_span("http.get"):
+                    pass
+        with tracer.start_as_current_span("celery.task", attributes={"file_id": 7}):
+            with tracer.start_as_current_span("http.get"):
+                pass
+
+        with open(path) as trace_file:
+            assert all(json.loads(line)["name"] for line in trace_file)
+        summary = tracing.summarize(path, file_id=42)
+        assert summary["http.get"]["count"] == 3
+        assert summary["celery.task"]["count"] == 1
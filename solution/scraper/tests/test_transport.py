@@ -0,0 +1,61 @@
+import pytest
+import httpx
+from unittest.mock import patch
+
+from src.apps import transport as transport_module
+from src.apps.async_scraper import AsyncWebScraper
+from src.apps.scraper import WebScraper
+from src.apps.transport import SharedTransport, TransportConfig, create_session
+
+
+ARTICLE_HTML = b"<html><head><title>Nota</title></head><body><p>Hola</p></body></html>"
+
+
+class TestTransport:
+    """Tests para las conexiones HTTP compartidas por proceso"""
+
+    def test_session_pool_and_timeouts(self):
+        """Test para configurar el pool por host y los timeouts separados"""
+        config = TransportConfig(pool_connections=3, pool_maxsize=7, connect_timeout=2, read_timeout=15)
+
+        session = create_session(config)
+
+        adapter = session.get_adapter("https://example.com")
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        assert config.requests_timeout == (2, 15)
+        assert config.httpx_timeout.connect == 2
+        assert config.httpx_timeout.read == 15
+
+    def test_scrapers_share_session(self):
+        """Test para reutilizar la misma sesión entre instancias de WebScraper"""
+        assert WebScraper().session is WebScraper().session
+
+    def test_reset_after_fork(self):
+        """Test para descartar la sesión heredada cuando cambia el PID"""
+        shared = SharedTransport(TransportConfig())
+        session = shared.session()
+
+        shared._pid = -1
+        assert shared.session() is not session
+
+    def test_async_client_shared_across_runs(self):
+        """Test para reutilizar el cliente y el event loop entre ejecuciones de scrape_iter"""
+        shared = SharedTransport(TransportConfig())
+        mock_transport = httpx.MockTransport(lambda request: httpx.Response(200, content=ARTICLE_HTML))
+        real_create = transport_module.create_async_client
+        created = []
+
+        def create_client(config, max_connections=None, transport=None):
+            created.append(config)
+            return real_create(config, max_connections, transport=mock_transport)
+
+        with patch('src.apps.async_scraper.get_transport', return_value=shared), \
+                patch('src.apps.transport.create_async_client', side_effect=create_client):
+            first = dict(AsyncWebScraper().scrape_iter(["https://example.com/1"]))
+            second = dict(AsyncWebScraper().scrape_iter(["https://example.com/2"]))
+
+        assert first["https://example.com/1"]["success"] is True
+        assert second["https://example.com/2"]["success"] is True
+        assert len(created) == 1
+        shared.close()
@@ -0,0 +1,71 @@
+import pytest
+
+from src.apps.url_reader import UrlFileReader
+
+
+@pytest.fixture
+def url_file(tmp_path):
+    """Archivo de URLs con líneas vacías, comentarios y finales de línea mixtos"""
+    path = tmp_path / "urls.txt"
+    path.write_bytes(
+        b"https://example.com/1\n"
+        b"\n"
+        b"no es una url\n"
+        b"  https://example.com/2  \r\n"
+        b"https://example.com/3\n"
+        b"https://example.com/4"
+    )
+    return str(path)
+
+
+class TestUrlFileReader:
+    """Tests para el lector de URLs en streaming"""
+
+    def test_count(self, url_file):
+        """Test para contar solo las líneas con URLs válidas"""
+        assert UrlFileReader(url_file).count() == 4
+
+    def test_iter_urls(self, url_file):
+        """Test para entregar las URLs limpias junto al offset de su línea"""
+        entries = list(UrlFileReader(url_file).iter_urls())
+
+        assert [url for _, url in entries] == [
+            "https://example.com/1",
+            "https://example.com/2",
+            "https://example.com/3",
+            "https://example.com/4"
+        ]
+        with open(url_file, 'rb') as file:
+            content = file.read()
+        for offset, url in entries:
+            assert content[offset:].lstrip().startswith(url.encode())
+
+    def test_resume_from_offset(self, url_file):
+        """Test para retomar la lectura desde el offset de una URL"""
+        reader = UrlFileReader(url_file)
+        offsets = {url: offset for offset, url in reader.iter_urls()}
+
+        resumed = [url for _, url in reader.iter_urls(start=offsets["https://example.com/3"])]
+
+        assert resumed == ["https://example.com/3", "https://example.com/4"]
+
+    def test_scan_chunk_ranges(self, url_file):
+        """Test para dividir el archivo en rangos de bytes con la misma cantidad de URLs"""
+        reader = UrlFileReader(url_file)
+
+        total, ranges = reader.scan(chunk_size=3)
+
+        assert total == 4
+        assert len(ranges) == 2
+        chunks = [[url for _, url in reader.iter_urls(start, end)] for start, end in ranges]
+        assert chunks == [
+            ["https://example.com/1", "https://example.com/2", "https://example.com/3"],
+            ["https://example.com/4"]
+        ]
+
+    def test_empty_file(self, tmp_path):
+        """Test para un archivo sin URLs"""
+        path = tmp_path / "empty.txt"
+        path.write_text("\n\n")
+
+        assert UrlFileReader(str(path)).scan(chunk_size=10) == (0, [])